@@ -0,0 +1,80 @@
+# app/changes.py
+# 把一天任务列表修改前后的差异整理成逐条变更，界面只需要处理变化的行
+#
+# 变更按顺序逐条应用，row / dest 都是应用这一条时的行号：
+#   removed  (row)        删除第 row 行
+#   inserted (row)        在第 row 行插入
+#   moved    (row, dest)  第 row 行移走后插到 dest (dest 是移走之后的行号)
+#   updated  (row)        第 row 行内容变化 (最终行号，结构变更之后再应用)
+from bisect import bisect_left
+from collections import namedtuple
+
+TaskChange = namedtuple("TaskChange", "kind task_id row dest")
+
+
+def snapshot(tasks):
+    # 修改前的状态：[(id, completed), ...]
+    return [(t.id, t.completed) for t in tasks]
+
+
+def _stable_ids(old_ids, new_pos):
+    # 旧顺序中按新位置递增的最长子序列 (LIS)：这些行不用动，其余的才需要移动
+    tails = []
+    tail_ids = []
+    prev = {}
+    for task_id in old_ids:
+        pos = new_pos[task_id]
+        i = bisect_left(tails, pos)
+        prev[task_id] = tail_ids[i - 1] if i else None
+        if i == len(tails):
+            tails.append(pos)
+            tail_ids.append(task_id)
+        else:
+            tails[i] = pos
+            tail_ids[i] = task_id
+    stable = set()
+    task_id = tail_ids[-1] if tail_ids else None
+    while task_id is not None:
+        stable.add(task_id)
+        task_id = prev[task_id]
+    return stable
+
+
+def diff_tasks(before, tasks):
+    # before 是 snapshot() 的结果，tasks 是修改后的 Task 列表
+    new_ids = [t.id for t in tasks]
+    new_pos = {task_id: i for i, task_id in enumerate(new_ids)}
+    old_state = dict(before)
+    changes = []
+
+    # 1. 删除 (从后往前，前面的行号不受影响)
+    work = [task_id for task_id, _ in before]
+    for row in range(len(work) - 1, -1, -1):
+        if work[row] not in new_pos:
+            changes.append(TaskChange("removed", work[row], row, None))
+            del work[row]
+
+    # 2. 插入与移动：不在 LIS 里的行依次放到新顺序中前一个任务的后面
+    stable = _stable_ids(work, new_pos)
+    for i, task_id in enumerate(new_ids):
+        if task_id in stable:
+            continue
+        dest = work.index(new_ids[i - 1]) + 1 if i else 0
+        if task_id in old_state:
+            row = work.index(task_id)
+            if row < dest:
+                dest -= 1
+            if row == dest:
+                continue
+            work.insert(dest, work.pop(row))
+            changes.append(TaskChange("moved", task_id, row, dest))
+        else:
+            work.insert(dest, task_id)
+            changes.append(TaskChange("inserted", task_id, dest, None))
+
+    # 3. 内容变化 (目前只有完成状态)
+    for task in tasks:
+        state = old_state.get(task.id)
+        if state is not None and state != task.completed:
+            changes.append(TaskChange("updated", task.id, new_pos[task.id], None))
+    return changes
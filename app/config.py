@@ -8,4 +8,85 @@ TEXT_PRIMARY = "#2D3748"
 TEXT_SECONDARY = "#A0AEC0"
 ACCENT_COLOR = "#667eea"
 DANGER_COLOR = "#e53e3e"
-CARD_BG = "#F7FAFC"
\ No newline at end of file
+CARD_BG = "#F7FAFC"
+
+# --- 主题 ---
+# 界面颜色统一从这里取；浅色主题就是上面这组颜色。
+# 可以仿照 "dark" 再加自定义主题，运行时在悬浮球菜单里切换
+THEMES = {
+    "light": {
+        "gradient_start": THEME_GRADIENT_START,
+        "gradient_end": THEME_GRADIENT_END,
+        "bg": BG_COLOR,
+        "text_primary": TEXT_PRIMARY,
+        "text_secondary": TEXT_SECONDARY,
+        "accent": ACCENT_COLOR,
+        "accent_hover": "#5A67D8",
+        "danger": DANGER_COLOR,
+        "card_bg": CARD_BG,
+        "border": "#E2E8F0",
+        "muted": "#CBD5E0",
+        "hover_bg": "#EDF2F7",
+        "menu_bg": "#FFFFFF",
+        "menu_text": "#4A5568",
+        "work_text": "#FF9966",
+        "track": "#EEF2FF",
+        "delete": "#E53E3E",
+        "delete_hover": "#C53030",
+    },
+    "dark": {
+        "gradient_start": "#667eea",
+        "gradient_end": "#764ba2",
+        "bg": "#1A202C",
+        "text_primary": "#E2E8F0",
+        "text_secondary": "#718096",
+        "accent": "#7F9CF5",
+        "accent_hover": "#667EEA",
+        "danger": "#FC8181",
+        "card_bg": "#2D3748",
+        "border": "#4A5568",
+        "muted": "#4A5568",
+        "hover_bg": "#2D3748",
+        "menu_bg": "#2D3748",
+        "menu_text": "#E2E8F0",
+        "work_text": "#FBB07A",
+        "track": "#EEF2FF",
+        "delete": "#E53E3E",
+        "delete_hover": "#C53030",
+    },
+}
+THEME = "light"
+THEME_LABELS = {"light": "浅色", "dark": "深色"}
+
+# --- 数据存储 ---
+# "sharded": tasks/2026-10.json 按月分片 (默认)；"json": tasks.json + 追加日志；
+# "sqlite": tasks.db。切换到分片或 SQLite 时会自动从 tasks.json 迁移一次
+STORAGE_BACKEND = "sharded"
+# 内存中最多缓存多少个月的数据 (日历一页最多显示 3 个月)
+MONTH_CACHE_SIZE = 6
+# 日历翻页停下多久之后 (毫秒) 在后台预取前后两页用到的月份
+PREFETCH_IDLE_MS = 200
+
+# 任务列表行高测量缓存的条目数 (按 文本/宽度/字体 缓存自动换行后的高度)
+TEXT_MEASURE_CACHE_SIZE = 4096
+
+# --- 动画调度 ---
+# WORK 模式光环的目标帧率 (原来固定 30ms 一帧)
+ANIMATION_FPS = 33
+# 窗口被遮挡/最小化/隐藏，或系统空闲时降到的帧率
+IDLE_ANIMATION_FPS = 2
+# 系统多久没有键鼠输入算作空闲 (秒)
+IDLE_AFTER_SECONDS = 300
+# 每帧绘制的时间预算 (毫秒)，持续超出时自动降低光环细节
+FRAME_BUDGET_MS = 8.0
+# WORK 模式光环在后台线程预渲染 (False 则在 GUI 线程同步绘制)
+HALO_RENDER_THREAD = True
+
+# 进行中的专注/工作片段每隔多少秒写一次断点 (另外在开始和退出时各写一次)
+SESSION_CHECKPOINT_SECONDS = 30
+# WORK 模式下程序在这么多秒内重新启动，视为没有中断，继续计时
+SESSION_RESUME_GRACE = 600
+
+# 性能计数 (app/perf.py)：导出时最多保留的逐条记录数，以及计算分位数用的最近次数
+PERF_TRACE_SIZE = 100000
+PERF_WINDOW = 120
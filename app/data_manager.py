@@ -1,10 +1,22 @@
 # app/data_manager.py
-import json
+import datetime
 import os
-from PyQt6.QtCore import Qt
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+
+from app.changes import diff_tasks, snapshot
+from app.config import STORAGE_BACKEND, MONTH_CACHE_SIZE
+from app.models import Session
+from app.search import SearchIndex
+from app.sessions import SessionIndex, split_at_midnight
+from app.stats import WorkTimeIndex
+from app.storage import create_storage
+from app.storage.ops import apply_record, sort_tasks
 
 class TaskManager:
-    def __init__(self, filename="tasks.json"):
+    def __init__(self, filename="tasks.json", backend=STORAGE_BACKEND,
+                 cache_months=MONTH_CACHE_SIZE, **storage_options):
         # 1. 获取当前系统用户的家目录 
         # (Windows下通常是 C:\Users\你的用户名, Linux/Mac下是 /home/你的用户名)
         user_home = os.path.expanduser("~")
@@ -22,93 +34,328 @@ class TaskManager:
                 app_data_dir = "."
 
         # 4. 拼接完整的绝对路径
+        self.data_dir = app_data_dir
         self.filename = os.path.join(app_data_dir, filename)
 
+        # 5. 存储后端 (sharded / json / sqlite)，下面的公开方法都只通过它读写
+        self.storage = create_storage(backend, app_data_dir, filename, **storage_options)
 
-        self.data = self.load_data()
+        # 按月缓存的数据 {"2026-10": {date_str: DayRecord}}，超过上限按 LRU 淘汰
+        self.cache_months = cache_months
+        self.months = OrderedDict()
 
-    def load_data(self):
-        if os.path.exists(self.filename):
-            try:
-                with open(self.filename, "r", encoding="utf-8") as f:
-                    return json.load(f)
-            except:
-                return {}
-        return {}
+        # 每个缓存月份的任务占用位图：第 d 天有任务则第 (d-1) 位为 1
+        # 以及每天的 (未完成数, 已完成数)，修改时只重算被改的那一天
+        self.occupancy = {}
+        self.day_counts = {}
+
+        # 任务 id -> 所在日期 (仅限缓存中的月份)
+        self.task_dates = {}
+
+        # batch() 期间收集的操作记录，退出时一次执行、一次排序、一次保存
+        self._batch = None
+
+        # 全文搜索索引，第一次搜索时才建立，之后随修改增量更新
+        self.search_index = None
+        # 工作时长区间索引 (树状数组)，第一次查询统计时建立
+        self.work_index = None
+        # 专注/工作片段的区间索引，第一次区间查询时建立
+        self.session_index = None
+
+        # 任务变更监听：callback(date_str, [TaskChange, ...])，界面据此只更新变化的行
+        self._listeners = []
+
+    def _month(self, month_key):
+        # 加锁：preload() 会在后台线程里读入月份
+        with self.storage.lock:
+            days = self.months.get(month_key)
+            if days is None:
+                days = self.storage.load_month(month_key)
+                # 界面线程不加锁读这几个字典：先建好位图和计数再整体放进去，
+                # 月份最后才出现在 months 里，is_month_cached 为真时索引一定已经完整
+                key = (int(month_key[:4]), int(month_key[5:7]))
+                self.occupancy[key], self.day_counts[key] = self._index_month(days)
+                self.months[month_key] = days
+                while len(self.months) > self.cache_months:
+                    evicted, evicted_days = self.months.popitem(last=False)
+                    key = (int(evicted[:4]), int(evicted[5:7]))
+                    self.occupancy.pop(key, None)
+                    self.day_counts.pop(key, None)
+                    for day in evicted_days.values():
+                        for task in day.tasks:
+                            self.task_dates.pop(task.id, None)
+            else:
+                self.months.move_to_end(month_key)
+            return days
+
+    def _index_month(self, days):
+        # 返回 (占用位图, {日: (未完成数, 已完成数)})，在局部变量里建好
+        mask = 0
+        counts = {}
+        for date_str, day in days.items():
+            tasks = day.tasks
+            if not tasks:
+                continue
+            for task in tasks:
+                self.task_dates[task.id] = date_str
+            bit = int(date_str[8:10]) - 1
+            done = sum(1 for t in tasks if t.completed)
+            counts[bit + 1] = (len(tasks) - done, done)
+            mask |= 1 << bit
+        return mask, counts
+
+    def _index_day(self, date_str, day):
+        key = (int(date_str[:4]), int(date_str[5:7]))
+        counts = self.day_counts.get(key)
+        if counts is None:
+            # 批量修改过程中这个月已经被淘汰出缓存，下次加载时会重新建索引
+            return
+        bit = int(date_str[8:10]) - 1
+        tasks = day.tasks
+        for task in tasks:
+            self.task_dates[task.id] = date_str
+        if tasks:
+            done = sum(1 for t in tasks if t.completed)
+            counts[bit + 1] = (len(tasks) - done, done)
+            self.occupancy[key] |= 1 << bit
+        else:
+            counts.pop(bit + 1, None)
+            self.occupancy[key] &= ~(1 << bit)
+
+    def _load_day(self, date_str):
+        return self._month(date_str[:7]).get(date_str)
+
+    def _days_for(self, date_str):
+        return self._month(date_str[:7])
+
+    def load_month(self, year, month):
+        # 日历翻页时调用，提前把这一页的月份读进缓存
+        self._month(f"{year:04d}-{month:02d}")
+
+    def is_month_cached(self, year, month):
+        return f"{year:04d}-{month:02d}" in self.months
+
+    def get_month_tasks(self, year, month):
+        # {date_str: [Task]}，只包含有任务的日期 (预取时用来预先测量行高)
+        days = self._month(f"{year:04d}-{month:02d}")
+        return {date_str: day.tasks for date_str, day in days.items() if day.tasks}
+
+    def preload(self, month_keys, callback=None):
+        # 在后台线程把这些月份 ("2026-10") 读进缓存，启动时不必等数据就能先显示界面；
+        # callback 在后台线程里调用，不能直接操作控件
+        def run():
+            for month_key in month_keys:
+                self._month(month_key)
+            if callback is not None:
+                callback()
+
+        thread = threading.Thread(target=run, name="TaskPreload", daemon=True)
+        thread.start()
+        return thread
+
+    def _commit(self, record):
+        # 所有修改都走这里：先改内存，再交给后端持久化
+        if self._batch is not None:
+            self._batch.append(record)
+            return True
+        with self.storage.lock:
+            before = self._snapshot_days(record) if self._listeners else None
+            days = apply_record(self._days_for, record)
+            if not days:
+                return False
+            # 被删除的任务不在任何一天里了，从 id 查找表中去掉
+            for sub in record.get("records", (record,)):
+                if sub.get("op") == "remove":
+                    self.task_dates.pop(sub.get("id"), None)
+            for date_str, day in days.items():
+                self._index_day(date_str, day)
+                if self.search_index is not None:
+                    self.search_index.update_day(date_str, day)
+                if self.work_index is not None:
+                    self.work_index.set(date_str, day.work_seconds)
+            if self.session_index is not None:
+                for sub in record.get("records", (record,)):
+                    if sub.get("op") == "session":
+                        self.session_index.add(sub["date"], Session(sub["start"], sub["end"], sub["mode"]))
+            self.storage.apply(record, days)
+        if before:
+            self._notify(before, days)
+        return True
+
+    def _snapshot_days(self, record):
+        # 记录被任务操作涉及的日期修改前的状态，用来计算变更
+        before = {}
+        for sub in record.get("records", (record,)):
+            date_str = sub.get("date")
+            if sub.get("op") in ("add", "remove", "toggle") and date_str not in before:
+                day = self._load_day(date_str)
+                before[date_str] = snapshot(day.tasks) if day is not None else []
+        return before
+
+    def _notify(self, before, days):
+        for date_str, old in before.items():
+            day = days.get(date_str)
+            if day is None:
+                continue
+            changes = diff_tasks(old, day.tasks)
+            if changes:
+                for callback in list(self._listeners):
+                    callback(date_str, changes)
+
+    def add_listener(self, callback):
+        self._listeners.append(callback)
+
+    def remove_listener(self, callback):
+        if callback in self._listeners:
+            self._listeners.remove(callback)
+
+    @contextmanager
+    def batch(self):
+        # 批量修改：with manager.batch(): ... 里的所有修改在退出时一起生效，
+        # 每个受影响的日期只排序一次，后端只保存一次；中途抛出异常则全部放弃
+        if self._batch is not None:
+            yield
+            return
+        self._batch = []
+        try:
+            yield
+        except BaseException:
+            self._batch = None
+            raise
+        records, self._batch = self._batch, None
+        if records:
+            self._commit({"op": "batch", "records": records})
 
     def save_data(self):
-        with open(self.filename, "w", encoding="utf-8") as f:
-            json.dump(self.data, f, ensure_ascii=False, indent=4)
+        self.storage.save()
+
+    def flush(self):
+        # 阻塞等待所有修改落盘
+        return self.storage.flush()
+
+    def close(self):
+        # 程序退出时调用 (QApplication.aboutToQuit)
+        self.storage.close()
 
     # --- 任务相关 ---
     def add_task(self, date_str, text):
-        if date_str not in self.data:
-            self.data[date_str] = {"tasks": [], "work_seconds": 0}
-        # 兼容旧数据结构：如果某个日期下是列表，转化为字典
-        if isinstance(self.data[date_str], list):
-             self.data[date_str] = {"tasks": self.data[date_str], "work_seconds": 0}
-             
-        self.data[date_str]["tasks"].append({"text": text, "completed": False})
-        self.sort_tasks(date_str)
-        self.save_data()
+        task_id = self.storage.allocate_id()
+        self._commit({"op": "add", "date": date_str, "id": task_id, "text": text})
+        return task_id
 
     def get_tasks(self, date_str):
-        day_data = self.data.get(date_str, {})
-        # 兼容旧数据
-        if isinstance(day_data, list): return day_data
-        return day_data.get("tasks", [])
-
-    def remove_task(self, date_str, index):
-        day_data = self.data.get(date_str)
-        if day_data and isinstance(day_data, dict):
-            tasks = day_data.get("tasks", [])
-            if 0 <= index < len(tasks):
-                tasks.pop(index)
-                self.save_data()
-                return True
-        elif isinstance(day_data, list): # 旧数据兼容
-            if 0 <= index < len(day_data):
-                day_data.pop(index)
-                self.save_data()
-                return True
-        return False
+        # 返回 Task 对象列表 (旧格式已在加载时统一转换)
+        day = self._load_day(date_str)
+        return day.tasks if day is not None else []
+
+    def remove_task(self, date_str, task_id):
+        return self._commit({"op": "remove", "date": date_str, "id": task_id})
     
-    def toggle_task_status(self, date_str, index):
-        day_data = self.data.get(date_str)
-        if day_data:
-            tasks = day_data.get("tasks", []) if isinstance(day_data, dict) else day_data
-            if 0 <= index < len(tasks):
-                tasks[index]['completed'] = not tasks[index]['completed']
-                self.sort_tasks(date_str)
-                self.save_data()
+    def toggle_task_status(self, date_str, task_id):
+        self._commit({"op": "toggle", "date": date_str, "id": task_id})
+
+    def locate_task(self, task_id):
+        # 已缓存月份内按 id 找日期，找不到返回 None
+        return self.task_dates.get(task_id)
+
+    def clear_completed_tasks(self, date_str):
+        with self.batch():
+            for task in self.get_tasks(date_str):
+                if task.completed:
+                    self.remove_task(date_str, task.id)
 
     def sort_tasks(self, date_str):
-        day_data = self.data.get(date_str)
-        if day_data:
-            tasks = day_data.get("tasks", []) if isinstance(day_data, dict) else day_data
-            tasks.sort(key=lambda x: x['completed'])
+        day = self._load_day(date_str)
+        if day is not None:
+            sort_tasks(day.tasks)
 
     def has_tasks(self, qdate):
-        date_str = qdate.toString(Qt.DateFormat.ISODate)
-        if date_str in self.data:
-            tasks = self.get_tasks(date_str)
-            return len(tasks) > 0
-        return False
+        return bool(self.month_occupancy(qdate.year(), qdate.month()) >> (qdate.day() - 1) & 1)
+
+    def month_occupancy(self, year, month):
+        # 日历绘制用：一个整数就能回答这个月每一天有没有任务
+        mask = self.occupancy.get((year, month))
+        if mask is None:
+            # 读入和取值放在同一把锁里，中间不会被后台预取淘汰掉
+            with self.storage.lock:
+                self._month(f"{year:04d}-{month:02d}")
+                mask = self.occupancy[(year, month)]
+        return mask
+
+    def get_day_counts(self, year, month, day):
+        # 返回 (未完成数, 已完成数)
+        counts = self.day_counts.get((year, month))
+        if counts is None:
+            with self.storage.lock:
+                self._month(f"{year:04d}-{month:02d}")
+                counts = self.day_counts[(year, month)]
+        return counts.get(day, (0, 0))
+
+    # --- 搜索 ---
+    def build_search_index(self):
+        if self.search_index is not None:
+            return self.search_index
+        with self.storage.lock:
+            if self.search_index is None:
+                index = SearchIndex()
+                index.build(self.storage.iter_days())
+                self.search_index = index
+        return self.search_index
+
+    def search(self, query, limit=20):
+        # 返回 SearchHit 列表 (按相关度排序)，包含任务所在日期
+        return self.build_search_index().search(query, limit)
 
     # --- 新增：工作时长统计 ---
     def add_work_time(self, date_str, seconds):
-        if date_str not in self.data:
-            self.data[date_str] = {"tasks": [], "work_seconds": 0}
-        
-        if isinstance(self.data[date_str], list):
-             self.data[date_str] = {"tasks": self.data[date_str], "work_seconds": 0}
-             
-        current = self.data[date_str].get("work_seconds", 0)
-        self.data[date_str]["work_seconds"] = current + seconds
-        self.save_data()
+        self._commit({"op": "work", "date": date_str, "seconds": seconds})
 
     def get_work_time(self, date_str):
-        day_data = self.data.get(date_str, {})
-        if isinstance(day_data, dict):
-            return day_data.get("work_seconds", 0)
-        return 0
\ No newline at end of file
+        day = self._load_day(date_str)
+        return day.work_seconds if day is not None else 0
+
+    def build_work_index(self):
+        if self.work_index is not None:
+            return self.work_index
+        with self.storage.lock:
+            if self.work_index is None:
+                index = WorkTimeIndex()
+                index.build(self.storage.iter_work_times())
+                self.work_index = index
+        return self.work_index
+
+    def get_work_time_range(self, start_str, end_str):
+        # 闭区间 [start, end] 内的总工作时长 (秒)
+        return self.build_work_index().range_sum(
+            datetime.date.fromisoformat(start_str), datetime.date.fromisoformat(end_str))
+
+    def get_work_summary(self, date_str):
+        # {"week", "month", "year", "avg_7", "avg_30"}，均为秒
+        return self.build_work_index().summary(datetime.date.fromisoformat(date_str))
+
+    # --- 专注/工作时间段 ---
+    def add_session(self, start, end, mode):
+        # start / end 为时间戳；跨午夜的记录拆到各自的日期，工作时长随之累加到对应日期
+        fragments = split_at_midnight(start, end)
+        with self.batch():
+            for date_str, frag_start, frag_end in fragments:
+                self._commit({"op": "session", "date": date_str,
+                              "start": frag_start, "end": frag_end, "mode": mode})
+
+    def get_sessions(self, date_str):
+        day = self._load_day(date_str)
+        return day.sessions if day is not None else []
+
+    def build_session_index(self):
+        if self.session_index is not None:
+            return self.session_index
+        with self.storage.lock:
+            if self.session_index is None:
+                index = SessionIndex()
+                index.build(self.storage.iter_sessions())
+                self.session_index = index
+        return self.session_index
+
+    def get_sessions_between(self, start, end):
+        # "这段时间我在做什么"：与 [start, end) 重叠的所有片段 [(date_str, Session), ...]
+        return self.build_session_index().overlapping(start, end)
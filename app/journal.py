@@ -0,0 +1,52 @@
+# app/journal.py
+import json
+import os
+
+from app.perf import get_perf
+
+_perf = get_perf()
+
+
+class TaskJournal:
+    """追加式操作日志：每次修改只往 tasks.json 旁边的日志里追加一行 JSON 记录"""
+
+    def __init__(self, filename):
+        self.filename = filename
+        self.size = os.path.getsize(filename) if os.path.exists(filename) else 0
+
+    def read(self):
+        records = []
+        if not os.path.exists(self.filename):
+            return records
+        with open(self.filename, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    records.append(json.loads(line))
+                except ValueError:
+                    # 程序崩溃时最后一行可能只写了一半，直接丢弃
+                    break
+        return records
+
+    def append(self, record):
+        self.append_many([record])
+
+    def append_many(self, records, fsync=False):
+        # 一批记录合成一次写入
+        lines = [json.dumps(r, ensure_ascii=False, separators=(",", ":")) + "\n" for r in records]
+        payload = "".join(lines).encode("utf-8")
+        with open(self.filename, "ab") as f:
+            f.write(payload)
+            if fsync:
+                f.flush()
+                os.fsync(f.fileno())
+        self.size += len(payload)
+        if _perf.enabled:
+            _perf.count("disk.bytes", len(payload))
+
+    def truncate(self):
+        with open(self.filename, "wb"):
+            pass
+        self.size = 0
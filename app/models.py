@@ -0,0 +1,84 @@
+# app/models.py
+# 内存中的数据模型：用 __slots__ 的紧凑对象代替嵌套字典
+# 旧格式 (某天直接是任务列表) 只在加载时转换一次，之后的热路径不再做类型判断
+
+# 数据格式版本：1 = 原始 tasks.json (可能混有列表格式的日期)，2 = 统一为 DayRecord 格式，
+# 3 = 每个任务带持久 id
+SCHEMA_VERSION = 3
+
+
+class Task:
+    __slots__ = ("id", "text", "completed")
+
+    def __init__(self, text, completed=False, task_id=None):
+        self.id = task_id
+        self.text = text
+        self.completed = completed
+
+    @classmethod
+    def from_json(cls, raw):
+        return cls(raw.get('text', ''), bool(raw.get('completed', False)), raw.get('id'))
+
+    def to_json(self):
+        return {"id": self.id, "text": self.text, "completed": self.completed}
+
+
+class Session:
+    """一段专注/工作记录 (时间戳，秒)；跨午夜的记录已拆分到各自的日期"""
+    __slots__ = ("start", "end", "mode")
+
+    def __init__(self, start, end, mode):
+        self.start = start
+        self.end = end
+        self.mode = mode
+
+    @property
+    def duration(self):
+        return self.end - self.start
+
+    @classmethod
+    def from_json(cls, raw):
+        return cls(raw[0], raw[1], raw[2])
+
+    def to_json(self):
+        return [self.start, self.end, self.mode]
+
+
+class DayRecord:
+    __slots__ = ("tasks", "work_seconds", "sessions", "by_id")
+
+    def __init__(self, tasks=None, work_seconds=0, sessions=None):
+        self.tasks = tasks if tasks is not None else []
+        self.work_seconds = work_seconds
+        self.sessions = sessions if sessions is not None else []
+        # 任务 id -> Task，第一次按 id 查找时建立；建立之后任务的增删都要经过 apply_record，
+        # 由它同步维护
+        self.by_id = None
+
+    def find_task(self, task_id):
+        if self.by_id is None:
+            self.by_id = {task.id: task for task in self.tasks}
+        return self.by_id.get(task_id)
+
+    @classmethod
+    def from_json(cls, raw):
+        # 兼容旧数据：某个日期下直接是任务列表
+        if isinstance(raw, list):
+            return cls([Task.from_json(t) for t in raw], 0)
+        return cls([Task.from_json(t) for t in raw.get("tasks", [])], raw.get("work_seconds", 0),
+                   [Session.from_json(s) for s in raw.get("sessions", [])])
+
+    def to_json(self):
+        raw = {"tasks": [t.to_json() for t in self.tasks], "work_seconds": self.work_seconds}
+        if self.sessions:
+            raw["sessions"] = [s.to_json() for s in self.sessions]
+        return raw
+
+    def is_empty(self):
+        return not self.tasks and not self.work_seconds and not self.sessions
+
+
+def normalize_days(raw_days):
+    # 加载时的一次性规范化："_" 开头的是元数据键，不是日期
+    return {date_str: DayRecord.from_json(raw)
+            for date_str, raw in raw_days.items() if not date_str.startswith("_")}
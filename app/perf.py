@@ -0,0 +1,121 @@
+# app/perf.py
+# 性能计数：热路径里的计时/计数都先判断 enabled，关闭时只多一次属性读取。
+# 打开后 (悬浮球右键 -> 更多设置 -> 性能浮层) 收集耗时与计数，
+# 性能浮层实时显示，也可以导出成 CSV / JSON 做离线分析。
+#
+# 用法:
+#     perf = get_perf()
+#     if perf.enabled:
+#         start = time.perf_counter()
+#     ...
+#     if perf.enabled:
+#         perf.record("task_list.update", time.perf_counter() - start, rows=n)
+import csv
+import json
+import threading
+import time
+from collections import deque
+
+from app.config import PERF_TRACE_SIZE, PERF_WINDOW
+
+
+class Metric:
+    """一项计时：总体统计 + 最近 PERF_WINDOW 次的耗时 (用于分位数)，以及附带数值的最近值与累计值"""
+    __slots__ = ("count", "total", "max", "last", "recent", "values", "sums")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.last = 0.0
+        self.recent = deque(maxlen=PERF_WINDOW)
+        self.values = {}
+        self.sums = {}
+
+    def summary(self):
+        recent = sorted(self.recent)
+        result = {"count": self.count, "mean_ms": self.total / self.count * 1000 if self.count else 0.0,
+                  "last_ms": self.last * 1000, "max_ms": self.max * 1000,
+                  "p50_ms": recent[len(recent) // 2] * 1000 if recent else 0.0,
+                  "p95_ms": recent[min(len(recent) - 1, int(len(recent) * 0.95))] * 1000 if recent else 0.0}
+        result.update(self.values)
+        result.update({f"{key}_total": value for key, value in self.sums.items()})
+        return result
+
+
+class PerfRegistry:
+    def __init__(self):
+        self.enabled = False
+        self.metrics = {}
+        self.counters = {}
+        # 逐条记录 (时间戳, 名称, 耗时秒, 附带数值)，导出用；超过上限丢弃最旧的
+        self.trace = deque(maxlen=PERF_TRACE_SIZE)
+        # 写盘线程也会记录
+        self._lock = threading.Lock()
+
+    def record(self, name, seconds, **values):
+        if not self.enabled:
+            return
+        with self._lock:
+            metric = self.metrics.get(name)
+            if metric is None:
+                metric = self.metrics[name] = Metric()
+            metric.count += 1
+            metric.total += seconds
+            metric.last = seconds
+            metric.recent.append(seconds)
+            if seconds > metric.max:
+                metric.max = seconds
+            for key, value in values.items():
+                metric.values[key] = value
+                if isinstance(value, (int, float)):
+                    metric.sums[key] = metric.sums.get(key, 0) + value
+            self.trace.append((time.time(), name, seconds, values))
+
+    def count(self, name, n=1):
+        if not self.enabled:
+            return
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def metric(self, name):
+        # 浮层读取用，没有记录过返回 None
+        return self.metrics.get(name)
+
+    def snapshot(self):
+        with self._lock:
+            return {"metrics": {name: metric.summary() for name, metric in self.metrics.items()},
+                    "counters": dict(self.counters)}
+
+    def reset(self):
+        with self._lock:
+            self.metrics.clear()
+            self.counters.clear()
+            self.trace.clear()
+
+    def export(self, filename):
+        # 按扩展名导出：.json 为汇总 + 全部记录，其它为 CSV (每条记录一行)
+        with self._lock:
+            trace = list(self.trace)
+        if filename.lower().endswith(".json"):
+            data = self.snapshot()
+            data["trace"] = [dict(values, timestamp=ts, name=name, ms=seconds * 1000)
+                             for ts, name, seconds, values in trace]
+            with open(filename, "w", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=False, indent=2)
+        else:
+            keys = sorted({key for _, _, _, values in trace for key in values})
+            with open(filename, "w", encoding="utf-8", newline="") as f:
+                writer = csv.writer(f)
+                writer.writerow(["timestamp", "name", "ms"] + keys)
+                for ts, name, seconds, values in trace:
+                    writer.writerow([f"{ts:.6f}", name, f"{seconds * 1000:.4f}"] +
+                                    [values.get(key, "") for key in keys])
+        return len(trace)
+
+
+_perf = PerfRegistry()
+
+
+def get_perf():
+    return _perf
@@ -0,0 +1,134 @@
+# app/persistence.py
+import os
+import threading
+import time
+import traceback
+
+from app.perf import get_perf
+
+_perf = get_perf()
+
+# 防抖窗口：窗口期内的连续修改只落盘一次
+SAVE_DEBOUNCE_SECONDS = 0.5
+
+
+def atomic_write(filename, text):
+    # 先写临时文件并 fsync，再原子替换，断电或崩溃时不会留下写了一半的文件
+    tmp_name = filename + ".tmp"
+    with open(tmp_name, "w", encoding="utf-8") as f:
+        f.write(text)
+        f.flush()
+        os.fsync(f.fileno())
+        if _perf.enabled:
+            _perf.count("disk.bytes", os.fstat(f.fileno()).st_size)
+    os.replace(tmp_name, filename)
+
+
+class PersistenceWorker:
+    """后台写盘线程：接收存储后端的脏通知，按防抖窗口合并成一次写入"""
+
+    def __init__(self, storage, debounce=SAVE_DEBOUNCE_SECONDS):
+        self.storage = storage
+        self.debounce = debounce
+
+        self._cond = threading.Condition()
+        self._records = []
+        self._snapshot = False
+        self._dirty = False
+        self._busy = False
+        self._flush_requested = False
+        self._closing = False
+
+        # 统计：收到的通知数、实际写入次数、被合并掉的保存次数
+        self.notifications = 0
+        self.writes = 0
+        self.coalesced = 0
+        self.last_error = None
+
+        self._thread = threading.Thread(target=self._run, name="TaskPersistence", daemon=True)
+        self._thread.start()
+
+    def submit(self, record):
+        with self._cond:
+            self._records.append(record)
+            self._notify()
+
+    def request_snapshot(self):
+        with self._cond:
+            self._snapshot = True
+            self._notify()
+
+    def _notify(self):
+        self.notifications += 1
+        if self._dirty:
+            self.coalesced += 1
+        self._dirty = True
+        self._cond.notify_all()
+
+    def flush(self, timeout=5.0):
+        # 阻塞直到所有待写内容落盘 (退出程序时调用)
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            self._flush_requested = True
+            self._cond.notify_all()
+            while (self._dirty or self._busy) and self._thread.is_alive():
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+            self._flush_requested = False
+            return not (self._dirty or self._busy)
+
+    def close(self, timeout=5.0):
+        self.flush(timeout)
+        with self._cond:
+            self._closing = True
+            self._cond.notify_all()
+        self._thread.join(timeout)
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._dirty and not self._closing:
+                    self._cond.wait()
+                if not self._dirty:
+                    return
+
+                # 防抖：等待窗口结束，期间的通知都会合并进这一次写入
+                deadline = time.monotonic() + self.debounce
+                while not self._flush_requested and not self._closing:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+
+                records, self._records = self._records, []
+                snapshot, self._snapshot = self._snapshot, False
+                self._dirty = False
+                self._busy = True
+
+            try:
+                if _perf.enabled:
+                    start = time.perf_counter()
+                    written = _perf.counters.get("disk.bytes", 0)
+                self.storage.persist(records, snapshot)
+                self.writes += 1
+                if _perf.enabled:
+                    _perf.record("save_data", time.perf_counter() - start, records=len(records),
+                                 bytes=_perf.counters.get("disk.bytes", 0) - written)
+            except Exception as e:
+                # 不只是磁盘错误：序列化或后端的异常也不能让写线程退出，否则之后的修改都不会落盘
+                # 同样的错误只打印一次，重试时不刷屏
+                if repr(e) != repr(self.last_error):
+                    print(f"Error saving data: {e}")
+                    traceback.print_exc()
+                self.last_error = e
+                # 写失败时放回队列，下个窗口重试
+                with self._cond:
+                    self._records = records + self._records
+                    self._snapshot = self._snapshot or snapshot
+                    self._dirty = not self._closing
+            finally:
+                with self._cond:
+                    self._busy = False
+                    self._cond.notify_all()
@@ -0,0 +1,127 @@
+# app/search.py
+# 任务全文搜索：字符二元组 (bigram) 倒排索引，中文不需要分词也能搜
+import heapq
+import math
+import re
+from collections import namedtuple
+
+SearchHit = namedtuple("SearchHit", "task_id date_str text completed score")
+
+# 按空白和标点切成若干段，每段内部再切二元组
+_SPLIT_RE = re.compile(r"[\s\.,;:!?'\"()\[\]{}<>/\\|，。；：！？、“”‘’（）【】《》]+")
+
+
+def tokenize(text):
+    # 建索引用：每个字符的一元组 + 二元组，单字查询 ("周") 也能命中 "写周报"
+    tokens = set()
+    for run in _SPLIT_RE.split(text.lower()):
+        tokens.update(run)
+        for i in range(len(run) - 1):
+            tokens.add(run[i:i + 2])
+    return tokens
+
+
+def query_tokens(query):
+    # 查询用：两个字以上的段只用二元组 (比一元组稀有得多)，单字的段用一元组
+    tokens = set()
+    for run in _SPLIT_RE.split(query.lower()):
+        if len(run) == 1:
+            tokens.add(run)
+        for i in range(len(run) - 1):
+            tokens.add(run[i:i + 2])
+    return tokens
+
+
+class SearchIndex:
+    def __init__(self):
+        # token -> {task_id}
+        self.postings = {}
+        # task_id -> [date_str, text, completed, 小写文本]
+        self.docs = {}
+        # date_str -> {task_id}，增量更新时按天比对
+        self.by_date = {}
+
+    def build(self, days):
+        for date_str, day in days:
+            self.update_day(date_str, day)
+
+    def update_day(self, date_str, day):
+        # 只处理这一天的增删，代价与当天任务数成正比
+        old_ids = self.by_date.get(date_str, set())
+        new_ids = set()
+        for task in day.tasks:
+            new_ids.add(task.id)
+            doc = self.docs.get(task.id)
+            if doc is None:
+                self._add(task.id, date_str, task.text, task.completed)
+            else:
+                doc[2] = task.completed
+        for task_id in old_ids - new_ids:
+            self._remove(task_id)
+        if new_ids:
+            self.by_date[date_str] = new_ids
+        else:
+            self.by_date.pop(date_str, None)
+
+    def _add(self, task_id, date_str, text, completed):
+        self.docs[task_id] = [date_str, text, completed, text.lower()]
+        for token in tokenize(text):
+            self.postings.setdefault(token, set()).add(task_id)
+
+    def _remove(self, task_id):
+        doc = self.docs.pop(task_id, None)
+        if doc is None:
+            return
+        for token in tokenize(doc[1]):
+            ids = self.postings.get(token)
+            if ids is not None:
+                ids.discard(task_id)
+                if not ids:
+                    del self.postings[token]
+
+    def search(self, query, limit=20):
+        tokens = query_tokens(query)
+        if not tokens:
+            return []
+        lists = sorted((self.postings.get(token, set()) for token in tokens), key=len)
+
+        # 先求交集 (包含所有二元组)，从最短的倒排表开始
+        candidates = set(lists[0])
+        for ids in lists[1:]:
+            if not candidates:
+                break
+            candidates &= ids
+        matched_all = bool(candidates)
+        if not matched_all:
+            # 没有完全匹配时退回到部分匹配，只看最稀有的几个二元组
+            for ids in lists[:3]:
+                candidates |= ids
+
+        total = len(self.docs) or 1
+        weights = [(self.postings.get(token, ()), math.log(1 + total / (1 + len(self.postings.get(token, ())))))
+                   for token in tokens]
+        full_score = sum(w for ids, w in weights)
+        needle = query.strip().lower()
+        docs = self.docs
+
+        def rank(task_id):
+            date_str, text, completed, lowered = docs[task_id]
+            if matched_all:
+                score = full_score
+            else:
+                score = sum(w for ids, w in weights if task_id in ids)
+            # 原文连续出现加分，未完成的任务稍微靠前
+            if needle in lowered:
+                score *= 2
+            if not completed:
+                score += 0.1
+            # 分数相同时日期新的排前面
+            return score, date_str
+
+        top = heapq.nlargest(limit, candidates, key=rank)
+        hits = []
+        for task_id in top:
+            score, date_str = rank(task_id)
+            doc = docs[task_id]
+            hits.append(SearchHit(task_id, date_str, doc[1], doc[2], score))
+        return hits
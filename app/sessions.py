@@ -0,0 +1,145 @@
+# app/sessions.py
+# 专注/工作时间段：按午夜拆分、区间查询索引，以及正在进行的片段的计时与断点保存
+import bisect
+import datetime
+import json
+import os
+import time
+
+from app.persistence import atomic_write
+# 拆分后每个片段都不超过一天，区间查询只需往前多看这么长
+_MAX_FRAGMENT = 86400 + 3600
+
+
+def split_at_midnight(start, end):
+    # 把 [start, end) 按本地时间的午夜拆开，返回 [(date_str, start, end), ...]
+    fragments = []
+    while start < end:
+        day = datetime.datetime.fromtimestamp(start).date()
+        midnight = datetime.datetime.combine(day + datetime.timedelta(days=1), datetime.time.min).timestamp()
+        stop = min(end, midnight)
+        fragments.append((day.isoformat(), start, stop))
+        start = stop
+    return fragments
+
+
+class SessionIndex:
+    """按开始时间排序的片段列表；片段长度有上限，所以重叠查询是一次二分 + 输出结果"""
+
+    def __init__(self):
+        self.starts = []
+        self.entries = []
+
+    def build(self, items):
+        entries = sorted(((session.start, date_str, session) for date_str, session in items),
+                         key=lambda e: e[0])
+        self.starts = [e[0] for e in entries]
+        self.entries = [(date_str, session) for _, date_str, session in entries]
+
+    def add(self, date_str, session):
+        pos = bisect.bisect_right(self.starts, session.start)
+        self.starts.insert(pos, session.start)
+        self.entries.insert(pos, (date_str, session))
+
+    def overlapping(self, start, end):
+        # 与 [start, end) 有重叠的所有片段，返回 [(date_str, Session), ...]
+        lo = bisect.bisect_left(self.starts, start - _MAX_FRAGMENT)
+        hi = bisect.bisect_left(self.starts, end)
+        return [(date_str, session) for date_str, session in self.entries[lo:hi]
+                if session.end > start]
+
+
+class ActiveSession:
+    """正在进行的专注/工作
+
+    计时只看单调时钟：FOCUS 的剩余时间由截止时间算出，不再每秒减 1，
+    定时器抖动、事件循环卡顿都不会累积误差，改系统时间也不影响。
+    start 是挂钟时间戳，只用于记录片段和断点恢复。
+    """
+    __slots__ = ("mode", "start", "duration", "_mono_start")
+
+    def __init__(self, mode, duration=None, start=None):
+        now, mono = time.time(), time.monotonic()
+        self.mode = mode
+        # FOCUS 的总时长 (秒)；WORK 没有上限，为 None
+        self.duration = duration
+        self.start = now if start is None else start
+        # 恢复的片段 (start 在过去) 把已经过去的时间算进去
+        self._mono_start = mono - max(0.0, now - self.start)
+
+    def elapsed(self):
+        elapsed = time.monotonic() - self._mono_start
+        return elapsed if self.duration is None else min(elapsed, self.duration)
+
+    def remaining(self):
+        if self.duration is None:
+            return None
+        return max(0.0, self._mono_start + self.duration - time.monotonic())
+
+    def end_time(self):
+        # 记录片段用的结束时间戳 (FOCUS 不会超过截止时间)
+        return self.start + self.elapsed()
+
+    def to_json(self):
+        return {"mode": self.mode, "start": self.start, "duration": self.duration,
+                "checkpoint": time.time()}
+
+
+class SessionCheckpoint:
+    """正在进行的片段的断点文件：开始时、每隔一段时间、退出时写一次，片段正常结束时删除
+
+    文件只有几十个字节，用原子替换写入；程序崩溃或被关掉后，下次启动据此恢复或补记。
+    """
+
+    def __init__(self, filename):
+        self.filename = filename
+        self.writes = 0
+
+    def save(self, session):
+        atomic_write(self.filename, json.dumps(session.to_json()))
+        self.writes += 1
+
+    def load(self):
+        # 文件不存在或内容不完整 (写坏、手动改过) 都返回 None，不会把错误的片段记进数据
+        try:
+            with open(self.filename, "r", encoding="utf-8") as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if not isinstance(state, dict) or state.get("mode") not in ("FOCUS", "WORK"):
+            return None
+        number = (int, float)
+        if not isinstance(state.get("start"), number) or not isinstance(state.get("checkpoint", 0), number):
+            return None
+        duration = state.get("duration")
+        if state["mode"] == "FOCUS" and not (isinstance(duration, number) and duration > 0):
+            return None
+        return state
+
+    def clear(self):
+        try:
+            os.remove(self.filename)
+        except OSError:
+            pass
+
+
+def recover_session(state, grace, now=None):
+    """根据断点决定怎么处理上次没结束的片段
+
+    返回 ("resume", ActiveSession) 继续计时，或 ("credit", (start, end, mode)) 补记一段；
+    - FOCUS 还没到截止时间：继续倒计时 (关掉程序期间时间照走，和厨房定时器一样)
+    - FOCUS 已过截止时间：补记到最后一次确认程序还在运行的时刻 (不超过截止时间)
+    - WORK 在 grace 秒内重新启动：当作没有中断，继续计时
+    - WORK 中断太久：补记到最后一次断点，不再继续
+    """
+    now = time.time() if now is None else now
+    mode, start, duration = state["mode"], state["start"], state.get("duration")
+    checkpoint = max(start, min(state.get("checkpoint", start), now))
+    if mode == "FOCUS":
+        deadline = start + duration
+        if now < deadline:
+            return "resume", ActiveSession(mode, duration, start)
+        return "credit", (start, min(checkpoint, deadline), mode)
+    if now - checkpoint <= grace:
+        return "resume", ActiveSession(mode, None, start)
+    return "credit", (start, checkpoint, mode)
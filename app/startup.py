@@ -0,0 +1,67 @@
+# app/startup.py
+# 启动耗时分析：python main.py --startup-profile 时按阶段打印耗时，
+# 平时 enabled 为 False，mark()/span() 什么也不做
+import threading
+import time
+from contextlib import contextmanager
+
+
+class StartupProfile:
+    def __init__(self):
+        self.enabled = False
+        self.origin = time.perf_counter()
+        self._last = self.origin
+        # [(阶段名, 开始, 结束, 线程名)]，时间相对 origin (秒)
+        self.phases = []
+        self.reported = False
+
+    def mark(self, name):
+        # 主线程的顺序阶段：从上一个 mark 到现在
+        now = time.perf_counter()
+        if self.enabled:
+            self.record(name, self._last, now)
+        self._last = now
+
+    @contextmanager
+    def span(self, name):
+        # 独立的阶段 (后台加载、第一次打开日历等)，可以和其它阶段重叠
+        if not self.enabled:
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, start)
+
+    def record(self, name, start, end=None):
+        # start/end 为 time.perf_counter() 的值；end 省略表示到现在为止，可以在任何线程调用
+        if not self.enabled:
+            return
+        if end is None:
+            end = time.perf_counter()
+        phase = (name, start - self.origin, end - self.origin, threading.current_thread().name)
+        self.phases.append(phase)
+        # 汇总表已经打印过了，之后的阶段 (例如第一次打开日历) 单独补一行
+        if self.reported:
+            print(self._format(phase), flush=True)
+
+    @staticmethod
+    def _format(phase):
+        name, start, end, thread = phase
+        return f"{name:<28}{start * 1000:>9.1f}{(end - start) * 1000:>9.1f}  {thread}"
+
+    def report(self):
+        if not self.enabled or self.reported:
+            return
+        self.reported = True
+        print(f"{'phase':<28}{'at ms':>9}{'took ms':>9}  thread", flush=True)
+        for phase in self.phases:
+            print(self._format(phase), flush=True)
+
+
+_profile = StartupProfile()
+
+
+def get_profile():
+    return _profile
@@ -0,0 +1,88 @@
+# app/stats.py
+# 工作时长区间统计：按"天序号" (date.toordinal) 建树状数组 (Fenwick Tree)
+# 单日更新 O(log n)，任意日期区间求和 O(log n)
+import datetime
+
+# 索引覆盖的起始日期；超出当前范围时自动扩容重建
+_BASE_DATE = datetime.date(2000, 1, 1)
+_INITIAL_DAYS = 366 * 60
+
+
+class FenwickTree:
+    def __init__(self, size):
+        self.size = size
+        self.tree = [0] * (size + 1)
+
+    def add(self, index, delta):
+        i = index + 1
+        while i <= self.size:
+            self.tree[i] += delta
+            i += i & -i
+
+    def prefix_sum(self, index):
+        # [0, index] 的和
+        total = 0
+        i = min(index, self.size - 1) + 1
+        while i > 0:
+            total += self.tree[i]
+            i -= i & -i
+        return total
+
+
+class WorkTimeIndex:
+    def __init__(self):
+        self.base = _BASE_DATE.toordinal()
+        self.tree = FenwickTree(_INITIAL_DAYS)
+        # ordinal -> seconds，单日读取和扩容重建用
+        self.values = {}
+
+    def build(self, items):
+        for date_str, seconds in items:
+            self.set(date_str, seconds)
+
+    def set(self, date_str, seconds):
+        ordinal = datetime.date.fromisoformat(date_str).toordinal()
+        delta = seconds - self.values.get(ordinal, 0)
+        if not delta:
+            return
+        self._ensure_range(ordinal)
+        if seconds:
+            self.values[ordinal] = seconds
+        else:
+            self.values.pop(ordinal, None)
+        self.tree.add(ordinal - self.base, delta)
+
+    def _ensure_range(self, ordinal):
+        if self.base <= ordinal < self.base + self.tree.size:
+            return
+        # 很少发生：把范围扩到能覆盖新日期，并重建整棵树
+        low = min(self.base, ordinal - 366)
+        high = max(self.base + self.tree.size, ordinal + 366 * 10)
+        self.base = low
+        self.tree = FenwickTree(high - low)
+        for day, seconds in self.values.items():
+            self.tree.add(day - low, seconds)
+
+    def _prefix(self, ordinal):
+        if ordinal < self.base:
+            return 0
+        return self.tree.prefix_sum(ordinal - self.base)
+
+    def range_sum(self, start, end):
+        # start / end 为 datetime.date，闭区间
+        if end < start:
+            return 0
+        return self._prefix(end.toordinal()) - self._prefix(start.toordinal() - 1)
+
+    def summary(self, date):
+        # 以 date 所在的周/月/年为范围的合计，以及截至 date 的滚动日均
+        week_start = date - datetime.timedelta(days=date.weekday())
+        month_start = date.replace(day=1)
+        next_month = (month_start + datetime.timedelta(days=32)).replace(day=1)
+        return {
+            "week": self.range_sum(week_start, week_start + datetime.timedelta(days=6)),
+            "month": self.range_sum(month_start, next_month - datetime.timedelta(days=1)),
+            "year": self.range_sum(date.replace(month=1, day=1), date.replace(month=12, day=31)),
+            "avg_7": self.range_sum(date - datetime.timedelta(days=6), date) / 7,
+            "avg_30": self.range_sum(date - datetime.timedelta(days=29), date) / 30,
+        }
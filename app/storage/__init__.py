@@ -0,0 +1,23 @@
+# app/storage/__init__.py
+import os
+
+from app.storage.base import StorageBackend
+from app.storage.json_backend import JsonStorage
+from app.storage.sharded_backend import ShardedStorage, MonthShard
+from app.storage.sqlite_backend import SqliteStorage
+from app.storage.migrate import migrate_json_to_sqlite, migrate_json_to_shards
+
+
+def create_storage(kind, data_dir, filename="tasks.json", **options):
+    json_path = os.path.join(data_dir, filename)
+    if kind == "sqlite":
+        db_path = os.path.splitext(json_path)[0] + ".db"
+        if not os.path.exists(db_path) and os.path.exists(json_path):
+            return migrate_json_to_sqlite(json_path, db_path)
+        return SqliteStorage(db_path)
+    if kind == "sharded":
+        shard_dir = os.path.splitext(json_path)[0]
+        if not os.path.isdir(shard_dir) and os.path.exists(json_path):
+            return migrate_json_to_shards(json_path, shard_dir, **options)
+        return ShardedStorage(shard_dir, **options)
+    return JsonStorage(json_path, **options)
@@ -0,0 +1,83 @@
+# app/storage/base.py
+import calendar
+import threading
+
+
+class StorageBackend:
+    """存储后端接口：TaskManager 的公开方法都建立在这几个操作之上
+
+    - load_day(date_str)      读取一天的 DayRecord，没有返回 None
+    - load_month(month_key)   读取一个月 ("2026-10") 的全部日期 {date_str: DayRecord}
+    - apply(record, days)     持久化一次修改；days 是被修改日期的完整数据 {date_str: DayRecord}
+    - allocate_id()           分配一个新的持久任务 id
+    - iter_days()             遍历全部历史 (迁移/统计用)，产出 (date_str, DayRecord)
+    - iter_work_times()       遍历有工作时长的日期，产出 (date_str, seconds)
+    - iter_sessions()         遍历全部专注/工作片段，产出 (date_str, Session)
+    """
+
+    def __init__(self):
+        # TaskManager 修改数据、后端序列化都在这把锁里进行
+        self.lock = threading.RLock()
+        # 下一个可用的任务 id，各后端在打开时恢复
+        self.next_id = 1
+
+    def allocate_id(self):
+        with self.lock:
+            task_id = self.next_id
+            self.next_id += 1
+            return task_id
+
+    def claim_ids(self, days):
+        # 给还没有 id 的 (旧) 任务分配 id，并保证计数器大于所有已有 id
+        # 返回是否有任务被分配了新 id (需要写回)
+        missing = []
+        with self.lock:
+            for day in days:
+                for task in day.tasks:
+                    if task.id is None:
+                        missing.append(task)
+                    elif task.id >= self.next_id:
+                        self.next_id = task.id + 1
+            for task in missing:
+                task.id = self.allocate_id()
+        return bool(missing)
+
+    def load_day(self, date_str):
+        raise NotImplementedError
+
+    def load_month(self, month_key):
+        # 默认实现：逐天读取，后端可以用更高效的方式覆盖
+        year, month = int(month_key[:4]), int(month_key[5:7])
+        days = {}
+        for day in range(1, calendar.monthrange(year, month)[1] + 1):
+            date_str = f"{month_key}-{day:02d}"
+            day = self.load_day(date_str)
+            if day is not None:
+                days[date_str] = day
+        return days
+
+    def apply(self, record, days):
+        raise NotImplementedError
+
+    def iter_days(self):
+        raise NotImplementedError
+
+    def iter_work_times(self):
+        for date_str, day in self.iter_days():
+            if day.work_seconds:
+                yield date_str, day.work_seconds
+
+    def iter_sessions(self):
+        for date_str, day in self.iter_days():
+            for session in day.sessions:
+                yield date_str, session
+
+    def save(self):
+        # 请求一次完整落盘，默认什么都不用做
+        pass
+
+    def flush(self):
+        return True
+
+    def close(self):
+        pass
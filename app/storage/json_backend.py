@@ -0,0 +1,135 @@
+# app/storage/json_backend.py
+import json
+import os
+
+from app.journal import TaskJournal
+from app.models import SCHEMA_VERSION, normalize_days
+from app.persistence import PersistenceWorker, atomic_write, SAVE_DEBOUNCE_SECONDS
+from app.storage.base import StorageBackend
+from app.storage.ops import apply_record
+
+# 日志超过这个大小就合并回 tasks.json 快照
+JOURNAL_COMPACT_BYTES = 256 * 1024
+# 快照里记录已合并到的日志序号，"_" 开头的键不是日期
+META_JOURNAL_SEQ = "_journal_seq"
+META_SCHEMA = "_schema"
+
+
+class JsonStorage(StorageBackend):
+    """原来的 tasks.json 存储：整份读入内存，修改写追加日志，由后台线程合并快照"""
+
+    def __init__(self, filename, journal=True, background=True, debounce=SAVE_DEBOUNCE_SECONDS, read_only=False):
+        super().__init__()
+        self.filename = filename
+        # 只读模式 (迁移的数据源)：只读入快照和日志，不写回、不创建任何文件
+        self.read_only = read_only
+
+        # 日志模式：修改只追加到 tasks.json.journal，攒够了再合并成快照
+        self.journal = TaskJournal(filename + ".journal") if journal else None
+        self.journal_seq = 0
+        # 已写进快照的日志序号，写线程据此跳过已合并的记录
+        self.snapshot_seq = 0
+
+        self.schema = SCHEMA_VERSION
+        self.data = self.load_data()
+        self.snapshot_seq = self.journal_seq
+        if self.claim_ids(self.data.values()):
+            self.schema = min(self.schema, SCHEMA_VERSION - 1)
+
+        # 后台写盘线程：点击复选框的槽函数里不再做任何磁盘 IO
+        self.writer = PersistenceWorker(self, debounce) if background and not read_only else None
+
+        # 旧格式文件：规范化后立即写回一份带版本号的快照
+        if self.schema < SCHEMA_VERSION and self.data and not read_only:
+            self.save()
+
+    def load_data(self):
+        data = {}
+        if os.path.exists(self.filename):
+            try:
+                with open(self.filename, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+            except:
+                data = {}
+        if not isinstance(data, dict):
+            data = {}
+        self.journal_seq = data.pop(META_JOURNAL_SEQ, 0)
+        self.schema = data.pop(META_SCHEMA, 1)
+        data = normalize_days(data)
+
+        # 回放快照之后追加的日志
+        if self.journal:
+            for record in self.journal.read():
+                seq = record.get("seq", 0)
+                if seq <= self.journal_seq:
+                    continue
+                apply_record(lambda date_str: data, record)
+                self.journal_seq = seq
+        return data
+
+    def load_day(self, date_str):
+        return self.data.get(date_str)
+
+    def iter_days(self):
+        with self.lock:
+            items = list(self.data.items())
+        return iter(items)
+
+    def apply(self, record, days):
+        if self.read_only:
+            raise IOError(f"{self.filename} is opened read-only")
+        with self.lock:
+            self.data.update(days)
+            self.journal_seq += 1
+            record["seq"] = self.journal_seq
+            if self.writer:
+                self.writer.submit(record)
+                return
+        self.persist([record])
+
+    def save(self):
+        # 请求一次完整快照：后台模式下只是标记为脏，由写线程合并后落盘
+        if self.read_only:
+            return
+        if self.writer:
+            self.writer.request_snapshot()
+        else:
+            self.write_snapshot()
+
+    def flush(self):
+        # 阻塞等待所有修改落盘
+        if self.writer:
+            return self.writer.flush()
+        return True
+
+    def close(self):
+        if self.writer:
+            self.writer.close()
+            self.writer = None
+
+    def write_snapshot(self):
+        # 在锁内序列化，锁外写盘；随后清空已合并进快照的日志
+        with self.lock:
+            snapshot = {date_str: day.to_json() for date_str, day in self.data.items()}
+            snapshot[META_JOURNAL_SEQ] = self.journal_seq
+            snapshot[META_SCHEMA] = SCHEMA_VERSION
+            text = json.dumps(snapshot, ensure_ascii=False, indent=4)
+            seq = self.journal_seq
+        atomic_write(self.filename, text)
+        self.snapshot_seq = seq
+        self.schema = SCHEMA_VERSION
+        if self.journal:
+            self.journal.truncate()
+
+    def persist(self, records, snapshot=False):
+        # 由写线程调用：一批日志记录一次追加，必要时合并成快照
+        if self.journal is None:
+            snapshot = snapshot or bool(records)
+        else:
+            records = [r for r in records if r["seq"] > self.snapshot_seq]
+            if records:
+                self.journal.append_many(records, fsync=True)
+            if self.journal.size > JOURNAL_COMPACT_BYTES:
+                snapshot = True
+        if snapshot:
+            self.write_snapshot()
@@ -0,0 +1,24 @@
+# app/storage/migrate.py
+import os
+
+from app.storage.json_backend import JsonStorage
+from app.storage.sharded_backend import ShardedStorage
+from app.storage.sqlite_backend import SqliteStorage
+
+
+def migrate_json_to_sqlite(json_filename, db_filename):
+    # 一次性迁移：把 tasks.json (含未合并的日志) 导入新的 SQLite 库
+    # 原 JSON 文件保留不动 (只读打开，不会被升级写回)，作为备份
+    source = JsonStorage(json_filename, background=False, read_only=True)
+    target = SqliteStorage(db_filename)
+    target.import_days(source.iter_days())
+    target.set_meta("migrated_from", os.path.basename(json_filename))
+    return target
+
+
+def migrate_json_to_shards(json_filename, directory, **options):
+    # 一次性迁移：把 tasks.json 拆成按月分片，原文件同样保留
+    source = JsonStorage(json_filename, background=False, read_only=True)
+    target = ShardedStorage(directory, **options)
+    target.import_days(source.iter_days())
+    return target
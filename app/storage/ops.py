@@ -0,0 +1,128 @@
+# app/storage/ops.py
+# 操作记录 (add / remove / toggle / work / session / batch) 的统一执行逻辑
+# TaskManager 修改内存、JSON 后端回放日志都用这一份代码，保证结果一致
+#
+# days_for(date_str) 返回存放该日期的字典 {date_str: DayRecord}
+# (TaskManager 传入对应月份的缓存，JSON 后端传入整份数据)
+from operator import attrgetter
+
+from app.models import DayRecord, Session, Task
+
+_completed = attrgetter("completed")
+
+
+def ensure_day(days, date_str):
+    day = days.get(date_str)
+    if day is None:
+        day = days[date_str] = DayRecord()
+    return day
+
+
+def sort_tasks(tasks):
+    tasks.sort(key=_completed)
+
+
+def _locate(day, record):
+    # 按 id 查找 (DayRecord 的查找表，O(1))，找不到返回 None
+    if day is None:
+        return None
+    if "id" in record:
+        return day.find_task(record["id"])
+    # 旧版本的日志按下标记录
+    index = record.get("index", -1)
+    return day.tasks[index] if 0 <= index < len(day.tasks) else None
+
+
+def _add_task(day, task):
+    day.tasks.append(task)
+    if day.by_id is not None:
+        day.by_id[task.id] = task
+
+
+def _forget_task(day, task):
+    if day.by_id is not None:
+        day.by_id.pop(task.id, None)
+
+
+def apply_record(days_for, record):
+    # 返回被修改的日期 {date_str: DayRecord}，没有修改则为空
+    op = record.get("op")
+    if op == "batch":
+        return _apply_batch(days_for, record["records"])
+
+    date_str = record["date"]
+    days = days_for(date_str)
+    if op == "add":
+        day = ensure_day(days, date_str)
+        _add_task(day, Task(record["text"], False, record.get("id")))
+        sort_tasks(day.tasks)
+    elif op == "remove":
+        day = days.get(date_str)
+        task = _locate(day, record)
+        if task is None:
+            return {}
+        day.tasks.remove(task)
+        _forget_task(day, task)
+    elif op == "toggle":
+        day = days.get(date_str)
+        task = _locate(day, record)
+        if task is None:
+            return {}
+        task.completed = not task.completed
+        sort_tasks(day.tasks)
+    elif op == "work":
+        day = ensure_day(days, date_str)
+        day.work_seconds += record["seconds"]
+    elif op == "session":
+        day = _add_session(ensure_day(days, date_str), record)
+    else:
+        return {}
+    return {date_str: day}
+
+
+def _add_session(day, record):
+    # 当天的工作时长由工作片段累加得到 (专注片段只记录，不计入)
+    session = Session(record["start"], record["end"], record["mode"])
+    day.sessions.append(session)
+    if session.mode == "WORK":
+        day.work_seconds += int(round(session.duration))
+    return day
+
+
+def _apply_batch(days_for, records):
+    # 批量执行：每天只过滤一次删除、只排序一次
+    touched = {}
+    removed = {}
+    for record in records:
+        op = record.get("op")
+        date_str = record["date"]
+        days = days_for(date_str)
+        if op == "add":
+            day = ensure_day(days, date_str)
+            _add_task(day, Task(record["text"], False, record.get("id")))
+        elif op in ("remove", "toggle"):
+            day = days.get(date_str)
+            task = _locate(day, record)
+            if task is None:
+                continue
+            if op == "remove":
+                # 先从查找表里去掉，列表在最后一次性过滤
+                _forget_task(day, task)
+                removed.setdefault(date_str, set()).add(task.id)
+            else:
+                task.completed = not task.completed
+        elif op == "work":
+            day = ensure_day(days, date_str)
+            day.work_seconds += record["seconds"]
+        elif op == "session":
+            day = _add_session(ensure_day(days, date_str), record)
+        else:
+            continue
+        touched[date_str] = day
+
+    for date_str, ids in removed.items():
+        day = touched[date_str]
+        day.tasks[:] = [t for t in day.tasks if t.id not in ids]
+    for day in touched.values():
+        sort_tasks(day.tasks)
+    return touched
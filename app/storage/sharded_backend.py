@@ -0,0 +1,234 @@
+# app/storage/sharded_backend.py
+import json
+import os
+import weakref
+
+from app.models import SCHEMA_VERSION, normalize_days
+from app.persistence import PersistenceWorker, atomic_write, SAVE_DEBOUNCE_SECONDS
+from app.storage.base import StorageBackend
+
+MANIFEST_NAME = "manifest.json"
+WORK_NAME = "work.json"
+
+
+class MonthShard(dict):
+    """一个月的数据 {date_str: DayRecord}，对应一个 2026-10.json 分片文件"""
+
+
+def _month_work(shard):
+    # 一个月里有工作时长的日期 {date_str: seconds}
+    return {date_str: day.work_seconds for date_str, day in shard.items() if day.work_seconds}
+
+
+class ShardedStorage(StorageBackend):
+    """按月分片存储：只在用到某个月时才读它的分片，修改后只回写这个分片"""
+
+    def __init__(self, directory, background=True, debounce=SAVE_DEBOUNCE_SECONDS):
+        super().__init__()
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self.manifest_path = os.path.join(directory, MANIFEST_NAME)
+        # manifest 只记录有数据的月份和计数，启动时只读这一个小文件
+        self.manifest = self._read_manifest()
+        self.next_id = self.manifest.get("next_id", 1)
+        # 每天的工作时长 {month_key: {date_str: seconds}}，统计时不用读分片；
+        # 单独存在 work.json 里，只有工作时长变化时才重写。旧数据没有这个文件时为 None
+        self.work_path = os.path.join(directory, WORK_NAME)
+        self.work = self._read_work()
+
+        # TaskManager 手里正在用的分片 (弱引用)，修改直接作用在同一个对象上
+        self._live = weakref.WeakValueDictionary()
+        # 等待回写的分片，写完之前一直持有，防止被淘汰后从旧文件重新读入
+        self._dirty = {}
+        self._versions = {}
+        self._work_dirty = False
+        self.shard_loads = 0
+
+        # 旧版本的分片：一次性把所有分片规范化并写回，再记录新的版本号
+        if self.manifest["schema"] < SCHEMA_VERSION:
+            self._upgrade()
+
+        self.writer = PersistenceWorker(self, debounce) if background else None
+
+    def _upgrade(self):
+        with self.lock:
+            for month_key in self.months():
+                self._mark_dirty(month_key, self.load_month(month_key))
+            self.manifest["schema"] = SCHEMA_VERSION
+        self.persist([], True)
+
+    def _mark_dirty(self, month_key, shard):
+        self._dirty[month_key] = shard
+        self._versions[month_key] = self._versions.get(month_key, 0) + 1
+
+    def _read_manifest(self):
+        try:
+            with open(self.manifest_path, "r", encoding="utf-8") as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            manifest = {}
+        manifest.setdefault("months", {})
+        # 新建的目录直接是最新版本；只有已有数据、没有版本号的才需要升级
+        manifest.setdefault("schema", 1 if manifest["months"] else SCHEMA_VERSION)
+        return manifest
+
+    def _read_work(self):
+        try:
+            with open(self.work_path, "r", encoding="utf-8") as f:
+                work = json.load(f)
+        except FileNotFoundError:
+            return None if self.manifest["months"] else {}
+        except (OSError, ValueError):
+            return None
+        return work if isinstance(work, dict) else None
+
+    def _shard_path(self, month_key):
+        return os.path.join(self.directory, f"{month_key}.json")
+
+    def months(self):
+        # 包括还没写进 manifest 的待回写分片
+        with self.lock:
+            return sorted(set(self.manifest["months"]) | set(self._dirty))
+
+    def load_month(self, month_key):
+        with self.lock:
+            shard = self._live.get(month_key)
+            if shard is None:
+                shard = self._dirty.get(month_key)
+            if shard is not None:
+                return shard
+            shard = MonthShard()
+            if month_key in self.manifest["months"]:
+                try:
+                    with open(self._shard_path(month_key), "r", encoding="utf-8") as f:
+                        shard.update(normalize_days(json.load(f)))
+                except FileNotFoundError:
+                    pass
+                except (OSError, ValueError) as e:
+                    print(f"Error loading shard {month_key}: {e}")
+                self.shard_loads += 1
+                # 旧分片里没有 id 的任务补上 id，并写回
+                if self.claim_ids(shard.values()):
+                    self._mark_dirty(month_key, shard)
+            self._live[month_key] = shard
+            return shard
+
+    def load_day(self, date_str):
+        return self.load_month(date_str[:7]).get(date_str)
+
+    def iter_days(self):
+        for month_key in self.months():
+            shard = self.load_month(month_key)
+            with self.lock:
+                items = sorted(shard.items())
+            yield from items
+
+    def iter_work_times(self):
+        # 工作时长统计读 work.json 的内容，不用读入任何分片；
+        # 待回写的月份 (已在内存中) 直接从分片取最新值
+        with self.lock:
+            if self.work is None:
+                self._rebuild_work()
+            months = self.months()
+            work = {key: self.work.get(key, {}) for key in months if key not in self._dirty}
+        for month_key in months:
+            seconds = work.get(month_key)
+            if seconds is None:
+                shard = self.load_month(month_key)
+                with self.lock:
+                    seconds = _month_work(shard)
+            yield from sorted(seconds.items())
+
+    def _rebuild_work(self):
+        # 旧数据没有 work.json：一次性从分片统计出来并保存
+        self.work = {}
+        for month_key in self.months():
+            seconds = _month_work(self.load_month(month_key))
+            if seconds:
+                self.work[month_key] = seconds
+        self._work_dirty = True
+        self.save()
+
+    def apply(self, record, days):
+        with self.lock:
+            for date_str, day in days.items():
+                month_key = date_str[:7]
+                shard = self.load_month(month_key)
+                shard[date_str] = day
+                self._mark_dirty(month_key, shard)
+            if self.writer:
+                self.writer.request_snapshot()
+                return
+        self.persist([], True)
+
+    def import_days(self, days):
+        # 批量导入 (迁移用)：按月分组后逐个写分片
+        days = list(days)
+        self.claim_ids(day for _, day in days)
+        with self.lock:
+            for date_str, day in days:
+                month_key = date_str[:7]
+                shard = self.load_month(month_key)
+                shard[date_str] = day
+                self._mark_dirty(month_key, shard)
+        self.persist([], True)
+
+    def save(self):
+        if self.writer:
+            self.writer.request_snapshot()
+        else:
+            self.persist([], True)
+
+    def flush(self):
+        if self.writer:
+            return self.writer.flush()
+        return True
+
+    def close(self):
+        if self.writer:
+            self.writer.close()
+            self.writer = None
+
+    def persist(self, records, snapshot=False):
+        # 由写线程调用：锁内序列化脏分片，锁外逐个原子写入，最后更新 manifest；
+        # work.json 只在某个月的工作时长真的变了时才重写
+        with self.lock:
+            pending = []
+            for month_key, shard in self._dirty.items():
+                tasks = sum(len(day.tasks) for day in shard.values())
+                days = sum(1 for day in shard.values() if not day.is_empty())
+                raw = {date_str: day.to_json() for date_str, day in shard.items()}
+                text = json.dumps(raw, ensure_ascii=False, indent=4, sort_keys=True)
+                pending.append((month_key, text, days, tasks, _month_work(shard), self._versions[month_key]))
+            if not pending and not self._work_dirty:
+                return
+            for month_key, text, days, tasks, work, version in pending:
+                if days:
+                    self.manifest["months"][month_key] = {"days": days, "tasks": tasks}
+                else:
+                    self.manifest["months"].pop(month_key, None)
+                if self.work is not None and self.work.get(month_key, {}) != work:
+                    if work:
+                        self.work[month_key] = work
+                    else:
+                        self.work.pop(month_key, None)
+                    self._work_dirty = True
+            self.manifest["next_id"] = self.next_id
+            manifest_text = json.dumps(self.manifest, separators=(",", ":"), sort_keys=True) if pending else None
+            work_text = None
+            if self._work_dirty:
+                work_text = json.dumps(self.work, separators=(",", ":"), sort_keys=True)
+                self._work_dirty = False
+
+        # 先写 manifest (其中的 next_id 保证崩溃后不会重复分配分片里已用过的 id)，再写分片
+        if manifest_text is not None:
+            atomic_write(self.manifest_path, manifest_text)
+        for month_key, text, days, tasks, work, version in pending:
+            atomic_write(self._shard_path(month_key), text)
+        if work_text is not None:
+            atomic_write(self.work_path, work_text)
+
+        with self.lock:
+            for month_key, text, days, tasks, work, version in pending:
+                if self._versions.get(month_key) == version:
+                    del self._dirty[month_key]
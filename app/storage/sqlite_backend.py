@@ -0,0 +1,166 @@
+# app/storage/sqlite_backend.py
+import sqlite3
+import time
+
+from app.models import SCHEMA_VERSION, DayRecord, Session, Task
+from app.perf import get_perf
+from app.storage.base import StorageBackend
+
+_perf = get_perf()
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS days (
+    date TEXT PRIMARY KEY,
+    work_seconds INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS tasks (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    date TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    text TEXT NOT NULL,
+    completed INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_tasks_date ON tasks(date, position);
+CREATE INDEX IF NOT EXISTS idx_tasks_completed ON tasks(completed, date);
+CREATE TABLE IF NOT EXISTS sessions (
+    date TEXT NOT NULL,
+    start REAL NOT NULL,
+    end REAL NOT NULL,
+    mode TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_sessions_date ON sessions(date);
+CREATE INDEX IF NOT EXISTS idx_sessions_start ON sessions(start);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+
+class SqliteStorage(StorageBackend):
+    """SQLite 存储：按日期走索引读写，启动和单次操作的开销与历史长度无关"""
+
+    def __init__(self, filename):
+        super().__init__()
+        self.filename = filename
+        # 所有读写都在 self.lock 里进行，允许 TaskManager.preload() 从后台线程读取
+        self.conn = sqlite3.connect(filename, check_same_thread=False)
+        # WAL 模式下提交只追加到 -wal 文件，读写互不阻塞；NORMAL 同步级别不在每次提交时 fsync
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+        self.conn.commit()
+        if self.get_meta("schema") is None:
+            self.set_meta("schema", SCHEMA_VERSION)
+        # tasks.id 就是持久任务 id
+        self.next_id = (self.conn.execute("SELECT MAX(id) FROM tasks").fetchone()[0] or 0) + 1
+
+    def load_day(self, date_str):
+        rows = self.conn.execute(
+            "SELECT id, text, completed FROM tasks WHERE date = ? ORDER BY position",
+            (date_str,)).fetchall()
+        work = self.conn.execute(
+            "SELECT work_seconds FROM days WHERE date = ?", (date_str,)).fetchone()
+        sessions = self.conn.execute(
+            "SELECT start, end, mode FROM sessions WHERE date = ? ORDER BY start", (date_str,)).fetchall()
+        if not rows and work is None and not sessions:
+            return None
+        return DayRecord([Task(text, bool(completed), task_id) for task_id, text, completed in rows],
+                         work[0] if work else 0,
+                         [Session(start, end, mode) for start, end, mode in sessions])
+
+    def load_month(self, month_key):
+        # 按日期范围走索引，一次查询拿到整月
+        first, last = f"{month_key}-01", f"{month_key}-32"
+        days = {}
+        for date_str, work_seconds in self.conn.execute(
+                "SELECT date, work_seconds FROM days WHERE date >= ? AND date < ?", (first, last)):
+            days[date_str] = DayRecord([], work_seconds)
+        for date_str, task_id, text, completed in self.conn.execute(
+                "SELECT date, id, text, completed FROM tasks WHERE date >= ? AND date < ? "
+                "ORDER BY date, position", (first, last)):
+            day = days.get(date_str)
+            if day is None:
+                day = days[date_str] = DayRecord()
+            day.tasks.append(Task(text, bool(completed), task_id))
+        for date_str, start, end, mode in self.conn.execute(
+                "SELECT date, start, end, mode FROM sessions WHERE date >= ? AND date < ? "
+                "ORDER BY start", (first, last)):
+            day = days.get(date_str)
+            if day is None:
+                day = days[date_str] = DayRecord()
+            day.sessions.append(Session(start, end, mode))
+        return days
+
+    def iter_days(self):
+        days = {}
+        for date_str, work_seconds in self.conn.execute("SELECT date, work_seconds FROM days"):
+            days[date_str] = DayRecord([], work_seconds)
+        for date_str, task_id, text, completed in self.conn.execute(
+                "SELECT date, id, text, completed FROM tasks ORDER BY date, position"):
+            day = days.get(date_str)
+            if day is None:
+                day = days[date_str] = DayRecord()
+            day.tasks.append(Task(text, bool(completed), task_id))
+        for date_str, session in self.iter_sessions():
+            day = days.get(date_str)
+            if day is None:
+                day = days[date_str] = DayRecord()
+            day.sessions.append(session)
+        return iter(sorted(days.items()))
+
+    def iter_sessions(self):
+        return iter([(date_str, Session(start, end, mode)) for date_str, start, end, mode in
+                     self.conn.execute("SELECT date, start, end, mode FROM sessions ORDER BY start")])
+
+    def iter_work_times(self):
+        return iter(self.conn.execute(
+            "SELECT date, work_seconds FROM days WHERE work_seconds > 0").fetchall())
+
+    def apply(self, record, days):
+        # 整天替换：代价只和被修改那几天的任务数有关，批量修改在同一个事务里提交
+        if _perf.enabled:
+            start = time.perf_counter()
+        with self.lock, self.conn:
+            for date_str, day in days.items():
+                self._write_day(date_str, day)
+        if _perf.enabled:
+            # SQLite 没有后台写线程，提交耗时就是保存耗时 (写入字节数取不到)
+            _perf.record("save_data", time.perf_counter() - start, records=1)
+
+    def import_days(self, days):
+        # 批量导入 (迁移用)，一个事务提交
+        days = list(days)
+        self.claim_ids(day for _, day in days)
+        with self.lock, self.conn:
+            for date_str, day in days:
+                self._write_day(date_str, day)
+
+    def _write_day(self, date_str, day):
+        self.conn.execute("DELETE FROM tasks WHERE date = ?", (date_str,))
+        self.conn.executemany(
+            "INSERT INTO tasks (id, date, position, text, completed) VALUES (?, ?, ?, ?, ?)",
+            [(t.id, date_str, pos, t.text, int(t.completed)) for pos, t in enumerate(day.tasks)])
+        self.conn.execute("DELETE FROM sessions WHERE date = ?", (date_str,))
+        self.conn.executemany(
+            "INSERT INTO sessions (date, start, end, mode) VALUES (?, ?, ?, ?)",
+            [(date_str, s.start, s.end, s.mode) for s in day.sessions])
+        self.conn.execute(
+            "INSERT INTO days (date, work_seconds) VALUES (?, ?) "
+            "ON CONFLICT(date) DO UPDATE SET work_seconds = excluded.work_seconds",
+            (date_str, day.work_seconds))
+
+    def get_meta(self, key, default=None):
+        row = self.conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else default
+
+    def set_meta(self, key, value):
+        with self.lock, self.conn:
+            self.conn.execute(
+                "INSERT INTO meta (key, value) VALUES (?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET value = excluded.value", (key, str(value)))
+
+    def close(self):
+        if self.conn:
+            self.conn.close()
+            self.conn = None
@@ -1,12 +1,20 @@
 # app/ui/ball_body.py
-from PyQt6.QtWidgets import (QWidget, QGraphicsDropShadowEffect)
-from PyQt6.QtCore import Qt, QTimer, QDate, QRect, QPointF
-from PyQt6.QtGui import QColor, QPainter, QBrush, QFont, QLinearGradient, QPen, QPainterPath
+from PyQt6.QtWidgets import (QWidget, QGraphicsScene, QGraphicsBlurEffect, QApplication)
+from PyQt6.QtCore import Qt, QDate, QRect, QRectF, QPointF, QEvent
+from PyQt6.QtGui import QColor, QPainter, QBrush, QFont, QLinearGradient, QPen, QPixmap
 from app.config import *
-import time
+from app.perf import get_perf
+from app.sessions import ActiveSession, SessionCheckpoint, recover_session
+from app.ui.halo import HaloGeometry, paint_halos
+from app.ui.scheduler import get_scheduler
+from app.ui.theme import get_theme
 import math
+import os
+import time
 import random
 
+_perf = get_perf()
+
 class BallBody(QWidget):
     def __init__(self, parent=None, data_manager=None):
         super().__init__(parent)
@@ -15,16 +23,29 @@ class BallBody(QWidget):
         self.setFixedSize(200, 200) 
         self.setCursor(Qt.CursorShape.PointingHandCursor)
         
-        shadow = QGraphicsDropShadowEffect(self)
-        shadow.setBlurRadius(20)
-        shadow.setColor(QColor(0, 0, 0, 80))
-        shadow.setOffset(0, 5)
-        self.setGraphicsEffect(shadow)
+        # 阴影不再用 QGraphicsDropShadowEffect (每帧都要对整个控件做一次离屏模糊)，
+        # 而是和其它静态图层一起烘焙成图片，见 _layer()
+        self._layers = {}
+
+        # 动态文字用到的字体和画笔只创建一次 (球体高度固定为 80)
+        self.font_focus_time = QFont("Arial", int(80 * 0.26), QFont.Weight.Bold)
+        self.font_work_label = QFont("Arial", int(80 * 0.13), QFont.Weight.DemiBold)
+        self.font_work_label.setLetterSpacing(QFont.SpacingType.AbsoluteSpacing, 1.5)
+        self.font_work_time = QFont("Arial", int(80 * 0.30), QFont.Weight.Bold)
+        self.progress_pen = QPen(get_theme().color("accent"))
+        self.progress_pen.setWidthF(3.0)
+        self.progress_pen.setCapStyle(Qt.PenCapStyle.RoundCap)
+        get_theme().changed.connect(self.invalidate_layers)
 
         self.mode = "NORMAL"
         self.total_seconds = 25 * 60
-        self.remaining_seconds = 0
-        self.work_start_time = 0
+        # 正在进行的专注/工作 (按单调时钟的截止时间计时)，以及它的断点文件
+        self.session = None
+        self.checkpoint = None
+        if data_manager is not None:
+            self.checkpoint = SessionCheckpoint(os.path.join(data_manager.data_dir, "active_session.json"))
+        # 下一次刷新倒计时文字的时间 (单调时钟)
+        self._clock_due = 0.0
         
         # --- 动画控制变量 ---
         self.anim_step = 0
@@ -32,46 +53,123 @@ class BallBody(QWidget):
         # [核心修改] 引入随机平滑呼吸变量
         self.current_intensity = 0.5 # 当前燃烧强度 (0.0 ~ 1.0)
         self.target_intensity = 0.8  # 下一个想要达到的强度
+
+        # 两层火焰光环的轮廓 (查表计算，每帧复用同一个多边形)
+        # 这里保留了上次你要求的“高度减半”参数 (9 和 4)
+        self.halos = [
+            ("#FF4500", 70, HaloGeometry(max_stretch=9, noise_speed_factor=0.2)),
+            ("#FF8C00", 100, HaloGeometry(max_stretch=4, noise_speed_factor=0.15)),
+        ]
         
-        self.timer = QTimer(self)
-        self.timer.timeout.connect(self.update_logic)
+        # 光环后台渲染线程 (第一次进入 WORK 模式时创建)；没赶上时同步绘制并计数
+        self.halo_renderer = None
+        self.sync_halo_frames = 0
+
+        # 倒计时和光环动画都交给统一的帧调度器，不再各自开定时器
+        self.scheduler = get_scheduler()
+
+        # 上次没结束的片段：继续计时或补记；退出时写断点，下次启动接着算
+        if self.checkpoint is not None:
+            self.restore_session()
+            QApplication.instance().aboutToQuit.connect(self.save_checkpoint)
 
-        self.anim_timer = QTimer(self)
-        self.anim_timer.timeout.connect(self.update_animation)
+    @property
+    def remaining_seconds(self):
+        # 显示用的整秒数：开始时显示满格，最后一秒显示 00:01
+        if self.session is None or self.session.duration is None:
+            return 0
+        return math.ceil(self.session.remaining())
 
     def start_focus(self, minutes):
         self.stop_all()
-        self.mode = "FOCUS"
-        self.total_seconds = minutes * 60
-        self.remaining_seconds = self.total_seconds
-        self.timer.start(1000)
-        self.update()
+        self._begin(ActiveSession("FOCUS", minutes * 60))
 
     def start_work(self):
         self.stop_all()
-        self.mode = "WORK"
-        self.work_start_time = time.time()
-        self.timer.start(1000)
-        self.anim_timer.start(30)
+        self._begin(ActiveSession("WORK"))
+
+    def _begin(self, session):
+        self.session = session
+        self.save_checkpoint()
+        if self.checkpoint is not None:
+            self.scheduler.add_interval("ball.checkpoint", self.save_checkpoint, SESSION_CHECKPOINT_SECONDS)
+        if session.mode == "FOCUS":
+            self.mode = "FOCUS"
+            self.total_seconds = session.duration
+            self.schedule_clock()
+        else:
+            self._enter_work()
         self.update()
 
+    def restore_session(self):
+        state = self.checkpoint.load()
+        if state is None:
+            # 没有断点，或者断点文件已损坏 (删掉，免得每次启动都读)
+            self.checkpoint.clear()
+            return
+        try:
+            action, value = recover_session(state, SESSION_RESUME_GRACE)
+        except (KeyError, TypeError, ValueError):
+            self.checkpoint.clear()
+            return
+        if action == "resume":
+            self._begin(value)
+        else:
+            start, end, mode = value
+            if end - start >= 1:
+                # add_session 会把 WORK 片段的时长累加进当天的工作时长 (跨午夜自动拆分)
+                self.data_manager.add_session(start, end, mode)
+            self.checkpoint.clear()
+
+    def save_checkpoint(self):
+        if self.checkpoint is not None and self.session is not None:
+            self.checkpoint.save(self.session)
+
+    def _enter_work(self):
+        self.mode = "WORK"
+        # 计时文字随动画帧一起刷新，不需要单独的 1 秒任务
+        self.scheduler.add_animation("ball.halo", self.update_animation, widget=self)
+        if HALO_RENDER_THREAD and self.halo_renderer is None:
+            from app.ui.halo_renderer import HaloRenderer
+            self.halo_renderer = HaloRenderer(self.halos)
+            QApplication.instance().aboutToQuit.connect(self.halo_renderer.close)
+        self.submit_next_halo()
+
     def stop_all(self):
-        if self.mode == "WORK":
-            duration = int(time.time() - self.work_start_time)
-            if self.data_manager and duration > 0:
-                date_str = QDate.currentDate().toString(Qt.DateFormat.ISODate)
-                self.data_manager.add_work_time(date_str, duration)
+        # 专注/工作都按 (开始, 结束, 模式) 记录成时间段，跨午夜会自动拆到两天
+        session, self.session = self.session, None
+        if session is not None:
+            end_time = session.end_time()
+            if self.data_manager and end_time - session.start >= 1:
+                self.data_manager.add_session(session.start, end_time, session.mode)
+            if self.checkpoint is not None:
+                self.checkpoint.clear()
         
         self.mode = "NORMAL"
-        self.timer.stop()
-        self.anim_timer.stop()
+        self.scheduler.remove("ball.clock")
+        self.scheduler.remove("ball.halo")
+        self.scheduler.remove("ball.checkpoint")
         self.update()
 
+    def schedule_clock(self):
+        # 倒计时文字只在整秒变化时刷新：正好在下一个整秒醒来；
+        # 悬浮球看不见时什么都不用画，只在专注结束的那一刻醒一次
+        remaining = self.session.remaining()
+        if self.scheduler.widget_hidden(self):
+            delay = remaining
+        else:
+            delay = min(remaining, remaining - math.ceil(remaining) + 1)
+        # 多等 2ms，避免定时器按毫秒取整后早醒，看到的还是上一秒
+        delay += 0.002
+        self._clock_due = time.monotonic() + delay
+        self.scheduler.call_after("ball.clock", delay, self.update_logic)
+
     def update_logic(self):
         if self.mode == "FOCUS":
-            self.remaining_seconds -= 1
-            if self.remaining_seconds <= 0:
+            if self.session.remaining() <= 0:
                 self.stop_all()
+                return
+            self.schedule_clock()
         self.update()
 
     def update_animation(self):
@@ -92,79 +190,91 @@ class BallBody(QWidget):
                 # 随机生成 0.3 到 1.0 之间的强度，保证火焰不会熄灭，也不会一直太弱
                 self.target_intensity = random.uniform(0.3, 1.0)
             
+            self.submit_next_halo()
             self.update()
 
-    def paintEvent(self, event):
-        painter = QPainter(self)
-        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
-        
-        full_rect = self.rect()
-        center = full_rect.center()
+    def submit_next_halo(self):
+        # 提前一帧让后台线程画下一帧的光环：下一帧的强度此时已经能确定
+        # (和 update_animation 下一次算出来的值完全一样)
+        if self.halo_renderer is None:
+            return
+        next_intensity = self.current_intensity + (self.target_intensity - self.current_intensity) * 0.05
+        center, ball_rect = self.ball_geometry()
+        self.halo_renderer.submit(self.anim_step + 1, center.x(), center.y(), ball_rect.width() / 2,
+                                  next_intensity, self.scheduler.detail("ball.halo"),
+                                  self.width(), self.height(), self.devicePixelRatioF())
+
+    # --- 静态图层缓存 ---
+    # 阴影、球体/圆角矩形、FOCUS 的底环、NORMAL 的日期文字都不随帧变化，
+    # 按 (模式, 图层, 设备像素比, 日期) 烘焙成 QPixmap，每帧只画光环、时间和进度弧
+    def ball_geometry(self):
+        center = self.rect().center()
         ball_size = 80
-        
         ball_rect = QRect(
             center.x() - ball_size // 2, 
             center.y() - ball_size // 2, 
             ball_size, 
             ball_size
         )
-        
+        return center, ball_rect
+
+    def invalidate_layers(self):
+        # 主题切换等情况下调用
+        self._layers.clear()
+        self.progress_pen.setColor(get_theme().color("accent"))
+        self.update()
+
+    def changeEvent(self, event):
+        if event.type() in (QEvent.Type.StyleChange, QEvent.Type.PaletteChange):
+            self._layers.clear()
+        super().changeEvent(event)
+
+    def _layer(self, name):
+        dpr = self.devicePixelRatioF()
+        date_key = QDate.currentDate().toJulianDay() if self.mode == "NORMAL" else None
+        key = (self.mode, name, dpr, date_key)
+        pixmap = self._layers.get(key)
+        if pixmap is None:
+            if len(self._layers) > 16:
+                # 过期的日期或旧 DPI 的图层
+                self._layers.clear()
+            if name == "shadow":
+                pixmap = bake_shadow(self._render_layer(self._paint_silhouette, dpr), self.rect())
+            else:
+                pixmap = self._render_layer(self._paint_body, dpr)
+            self._layers[key] = pixmap
+        return pixmap
+
+    def _render_layer(self, paint, dpr):
+        size = self.size()
+        pixmap = QPixmap(round(size.width() * dpr), round(size.height() * dpr))
+        pixmap.setDevicePixelRatio(dpr)
+        pixmap.fill(Qt.GlobalColor.transparent)
+        painter = QPainter(pixmap)
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        paint(painter)
+        painter.end()
+        return pixmap
+
+    def _paint_silhouette(self, painter):
+        # 阴影的形状：WORK 模式下光环每帧都在变，按它的平均半径画一个圆代替
+        self._paint_body(painter)
+        if self.mode == "WORK":
+            center, ball_rect = self.ball_geometry()
+            radius = ball_rect.width() / 2 + 7
+            painter.setPen(Qt.PenStyle.NoPen)
+            painter.setBrush(QColor("black"))
+            painter.drawEllipse(QPointF(center), radius, radius)
+
+    def _paint_body(self, painter):
+        center, ball_rect = self.ball_geometry()
         h = ball_rect.height()
         w = ball_rect.width()
-        base_radius = w / 2
-        
         start_point = ball_rect.topLeft().toPointF()
         end_point = ball_rect.bottomRight().toPointF()
-        
-        # ===========================
-        # 1. 绘制背景与特效
-        # ===========================
+
         if self.mode == "WORK":
             painter.setPen(Qt.PenStyle.NoPen)
-            
-            # 使用计算好的平滑随机变量替代 sin
-            pulse_base = self.current_intensity 
-
-            def draw_fire_halo(color_hex, max_stretch, alpha_base, noise_speed_factor):
-                path = QPainterPath()
-                # 保持 1度 的超精细粒度
-                angle_step = 1
-                
-                for angle in range(0, 360, angle_step):
-                    rad = math.radians(angle)
-                    
-                    # 基础波浪
-                    noise = math.sin(angle * 0.1 + self.anim_step * noise_speed_factor) * \
-                            math.cos(angle * 0.3 - self.anim_step * noise_speed_factor * 0.8)
-                    
-                    # 微抖动 (Micro-jitter)
-                    micro_jitter = random.uniform(-1.5, 1.5)
-                    
-                    # 延伸长度
-                    noise_stretch = (noise + 1) / 2 * 8
-                    
-                    # 计算最终半径
-                    # pulse_base * max_stretch: 决定了整体的呼吸幅度 (随机平滑)
-                    current_radius = base_radius + (pulse_base * max_stretch * 0.6) + noise_stretch + micro_jitter
-                    
-                    px = center.x() + current_radius * math.cos(rad)
-                    py = center.y() + current_radius * math.sin(rad)
-                    
-                    if angle == 0: path.moveTo(px, py)
-                    else: path.lineTo(px, py)
-                path.closeSubpath()
-                
-                color = QColor(color_hex)
-                # 透明度也跟随强度平滑变化
-                current_alpha = int(alpha_base - (pulse_base * 20))
-                color.setAlpha(max(20, current_alpha))
-                painter.setBrush(QBrush(color))
-                painter.drawPath(path)
-
-            # 这里保留了上次你要求的“高度减半”参数 (12 和 7)
-            draw_fire_halo("#FF4500", max_stretch=9, alpha_base=70, noise_speed_factor=0.2)
-            draw_fire_halo("#FF8C00", max_stretch=4, alpha_base=100, noise_speed_factor=0.15)
-
             fire_gradient = QLinearGradient(start_point, end_point)
             fire_gradient.setColorAt(0, QColor("#FF512F"))
             fire_gradient.setColorAt(1, QColor("#F09819"))
@@ -176,76 +286,136 @@ class BallBody(QWidget):
             painter.setPen(Qt.PenStyle.NoPen)
             painter.drawEllipse(ball_rect)
 
+            painter.setBrush(Qt.BrushStyle.NoBrush)
+            track_pen = QPen(get_theme().color("track")) 
+            track_pen.setWidthF(3.0)
+            painter.setPen(track_pen)
+            painter.drawEllipse(ball_rect.adjusted(4, 4, -4, -4)) 
+
         else:
             gradient = QLinearGradient(start_point, end_point)
-            gradient.setColorAt(0, QColor(THEME_GRADIENT_START))
-            gradient.setColorAt(1, QColor(THEME_GRADIENT_END))
+            gradient.setColorAt(0, get_theme().color("gradient_start"))
+            gradient.setColorAt(1, get_theme().color("gradient_end"))
             painter.setBrush(QBrush(gradient))
             painter.setPen(Qt.PenStyle.NoPen)
             rounded_r = int(h * 0.24)
             painter.drawRoundedRect(ball_rect, rounded_r, rounded_r)
 
-        painter.setPen(QColor("white"))
+            painter.setPen(QColor("white"))
+            today = QDate.currentDate()
+            month_str = today.toString("MMM").upper()
+            day_str = today.toString("d")
+            
+            font_month = QFont("Arial", int(h * 0.11), QFont.Weight.Bold)
+            painter.setFont(font_month)
+            month_rect = QRect(ball_rect.x(), ball_rect.y() + int(h * 0.1), w, int(h * 0.25))
+            painter.drawText(month_rect, Qt.AlignmentFlag.AlignCenter, month_str)
+
+            font_day = QFont("Arial", int(h * 0.32), QFont.Weight.Bold)
+            painter.setFont(font_day)
+            day_rect = QRect(ball_rect.x(), ball_rect.y() + int(h * 0.3), w, int(h * 0.5))
+            painter.drawText(day_rect, Qt.AlignmentFlag.AlignCenter, day_str)
+
+    def paintEvent(self, event):
+        frame_start = time.perf_counter()
+        painter = QPainter(self)
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+
+        center, ball_rect = self.ball_geometry()
+        h = ball_rect.height()
+        w = ball_rect.width()
+        base_radius = w / 2
+
+        # ===========================
+        # 1. 阴影 + 背景与特效
+        # ===========================
+        painter.drawPixmap(0, 0, self._layer("shadow"))
+
+        if self.mode == "WORK":
+            image = self.halo_renderer.frame(self.anim_step) if self.halo_renderer else None
+            if image is not None:
+                painter.drawImage(0, 0, image)
+            else:
+                # 后台线程没赶上 (或未启用)：同步绘制这一帧
+                self.sync_halo_frames += 1
+                # 使用计算好的平滑随机变量替代 sin
+                pulse_base = self.current_intensity 
+                # 帧时间超预算时调度器会调低细节 (光环取点变稀)
+                detail = self.scheduler.detail("ball.halo")
+                paint_halos(painter, self.halos, center.x(), center.y(), base_radius,
+                            pulse_base, self.anim_step, detail)
+
+        painter.drawPixmap(0, 0, self._layer("body"))
 
         # ===========================
-        # 2. 绘制文字内容
+        # 2. 绘制动态内容 (NORMAL 模式的日期已经在图层里)
         # ===========================
         if self.mode == "FOCUS":
             painter.setBrush(Qt.BrushStyle.NoBrush)
             ring_rect = ball_rect.adjusted(4, 4, -4, -4) 
-            
-            track_pen = QPen(QColor("#EEF2FF")) 
-            track_pen.setWidthF(3.0)
-            painter.setPen(track_pen)
-            painter.drawEllipse(ring_rect) 
+
+            # 刚从隐藏状态回来：之前只排了结束时的唤醒，恢复每秒刷新
+            if self._clock_due - time.monotonic() > 1.01:
+                self.schedule_clock()
 
             progress = self.remaining_seconds / self.total_seconds
             span_angle = int(-360 * 16 * progress)
-            prog_pen = QPen(QColor(ACCENT_COLOR)) 
-            prog_pen.setWidthF(3.0)
-            prog_pen.setCapStyle(Qt.PenCapStyle.RoundCap) 
-            painter.setPen(prog_pen)
+            painter.setPen(self.progress_pen)
             painter.drawArc(ring_rect, 90 * 16, span_angle)
             
-            painter.setPen(QColor(ACCENT_COLOR))
+            painter.setPen(get_theme().color("accent"))
             mins, secs = divmod(self.remaining_seconds, 60)
             time_str = f"{mins:02d}:{secs:02d}"
-            font_time = QFont("Arial", int(h * 0.26), QFont.Weight.Bold)
-            painter.setFont(font_time)
+            painter.setFont(self.font_focus_time)
             painter.drawText(ball_rect, Qt.AlignmentFlag.AlignCenter, time_str)
 
         elif self.mode == "WORK":
-            current_duration = int(time.time() - self.work_start_time)
+            current_duration = int(self.session.elapsed())
             mins, secs = divmod(current_duration, 60)
             hrs, mins = divmod(mins, 60)
             if hrs > 0: time_str = f"{hrs}:{mins:02d}"
             else: time_str = f"{mins}:{secs:02d}"
             
             painter.setPen(QColor("white"))
-            
-            font_label = QFont("Arial", int(h * 0.13), QFont.Weight.DemiBold)
-            font_label.setLetterSpacing(QFont.SpacingType.AbsoluteSpacing, 1.5)
-            painter.setFont(font_label)
-            
+            painter.setFont(self.font_work_label)
             label_rect = QRect(ball_rect.x(), ball_rect.y() + int(h * 0.22), w, int(h * 0.2))
             painter.drawText(label_rect, Qt.AlignmentFlag.AlignCenter, "WORK")
 
-            font_time = QFont("Arial", int(h * 0.30), QFont.Weight.Bold)
-            painter.setFont(font_time)
+            painter.setFont(self.font_work_time)
             time_rect = QRect(ball_rect.x(), ball_rect.y() + int(h * 0.42), w, int(h * 0.4))
             painter.drawText(time_rect, Qt.AlignmentFlag.AlignCenter, time_str)
 
-        else:
-            today = QDate.currentDate()
-            month_str = today.toString("MMM").upper()
-            day_str = today.toString("d")
-            
-            font_month = QFont("Arial", int(h * 0.11), QFont.Weight.Bold)
-            painter.setFont(font_month)
-            month_rect = QRect(ball_rect.x(), ball_rect.y() + int(h * 0.1), w, int(h * 0.25))
-            painter.drawText(month_rect, Qt.AlignmentFlag.AlignCenter, month_str)
+            painter.end()
+            self.scheduler.report_frame("ball.halo", time.perf_counter() - frame_start)
 
-            font_day = QFont("Arial", int(h * 0.32), QFont.Weight.Bold)
-            painter.setFont(font_day)
-            day_rect = QRect(ball_rect.x(), ball_rect.y() + int(h * 0.3), w, int(h * 0.5))
-            painter.drawText(day_rect, Qt.AlignmentFlag.AlignCenter, day_str)
\ No newline at end of file
+        if _perf.enabled:
+            _perf.record("ball.paint", time.perf_counter() - frame_start)
+
+
+def bake_shadow(silhouette, rect, blur_radius=20, color=QColor(0, 0, 0, 80), offset=5):
+    # 代替整个控件上的 QGraphicsDropShadowEffect：把形状染成阴影色、模糊、下移，
+    # 只在图层缓存重建时做一次
+    shadow = QPixmap(silhouette.size())
+    shadow.setDevicePixelRatio(silhouette.devicePixelRatio())
+    shadow.fill(Qt.GlobalColor.transparent)
+    painter = QPainter(shadow)
+    painter.drawPixmap(0, 0, silhouette)
+    painter.setCompositionMode(QPainter.CompositionMode.CompositionMode_SourceIn)
+    painter.fillRect(rect, color)
+    painter.end()
+
+    scene = QGraphicsScene()
+    scene.setSceneRect(QRectF(rect))
+    item = scene.addPixmap(shadow)
+    item.setOffset(0, offset)
+    blur = QGraphicsBlurEffect()
+    blur.setBlurRadius(blur_radius)
+    item.setGraphicsEffect(blur)
+
+    result = QPixmap(silhouette.size())
+    result.setDevicePixelRatio(silhouette.devicePixelRatio())
+    result.fill(Qt.GlobalColor.transparent)
+    painter = QPainter(result)
+    scene.render(painter, QRectF(rect), QRectF(rect))
+    painter.end()
+    return result
@@ -15,14 +15,9 @@ class CustomTimeDialog(QDialog):
         layout = QVBoxLayout(self)
         layout.setContentsMargins(10, 10, 10, 10)
 
+        # 样式见 app/ui/theme.py (QFrame#dialogContainer 等)
         self.container = QFrame()
-        self.container.setStyleSheet(f"""
-            QFrame {{
-                background-color: white;
-                border-radius: 16px;
-                border: 1px solid #E2E8F0;
-            }}
-        """)
+        self.container.setObjectName("dialogContainer")
         shadow = QGraphicsDropShadowEffect(self)
         shadow.setBlurRadius(20)
         shadow.setColor(QColor(0, 0, 0, 60))
@@ -37,7 +32,7 @@ class CustomTimeDialog(QDialog):
 
         title = QLabel("⏱️ 专注时长")
         title.setAlignment(Qt.AlignmentFlag.AlignCenter)
-        title.setStyleSheet(f"font-size: 16px; font-weight: bold; color: {TEXT_PRIMARY}; border: none;")
+        title.setObjectName("dialogTitle")
         content_layout.addWidget(title)
 
         input_row_layout = QHBoxLayout()
@@ -49,25 +44,10 @@ class CustomTimeDialog(QDialog):
         self.spin_box.setValue(25)     
         self.spin_box.setAlignment(Qt.AlignmentFlag.AlignCenter)
         self.spin_box.setButtonSymbols(QSpinBox.ButtonSymbols.NoButtons)
-        self.spin_box.setStyleSheet(f"""
-            QSpinBox {{
-                background-color: {CARD_BG};
-                border-radius: 12px;
-                height: 50px;
-                font-size: 32px;
-                font-family: Arial;
-                font-weight: bold;
-                color: {ACCENT_COLOR};
-                selection-background-color: {ACCENT_COLOR};
-            }}
-            QSpinBox:focus {{
-                background-color: white;
-                border: 2px solid {ACCENT_COLOR};
-            }}
-        """)
+        self.spin_box.setObjectName("durationSpin")
         
         unit = QLabel("分钟")
-        unit.setStyleSheet(f"color: {TEXT_SECONDARY}; font-size: 16px; font-weight: bold; border: none;")
+        unit.setObjectName("dialogUnit")
         
         input_row_layout.addWidget(self.spin_box, 1)
         input_row_layout.addWidget(unit)
@@ -79,32 +59,12 @@ class CustomTimeDialog(QDialog):
         btn_cancel = QPushButton("取消")
         btn_cancel.setCursor(Qt.CursorShape.PointingHandCursor)
         btn_cancel.clicked.connect(self.reject)
-        btn_cancel.setStyleSheet(f"""
-            QPushButton {{
-                background-color: transparent;
-                color: {TEXT_SECONDARY};
-                border: 1px solid #E2E8F0;
-                border-radius: 10px;
-                padding: 8px;
-                font-weight: bold;
-            }}
-            QPushButton:hover {{ background-color: #F7FAFC; color: {TEXT_PRIMARY}; }}
-        """)
+        btn_cancel.setProperty("role", "secondary")
         
         btn_ok = QPushButton("开始")
         btn_ok.setCursor(Qt.CursorShape.PointingHandCursor)
         btn_ok.clicked.connect(self.accept)
-        btn_ok.setStyleSheet(f"""
-            QPushButton {{
-                background-color: {ACCENT_COLOR};
-                color: white;
-                border-radius: 10px;
-                padding: 8px;
-                font-weight: bold;
-                border: none;
-            }}
-            QPushButton:hover {{ background-color: #5A67D8; }}
-        """)
+        btn_ok.setProperty("role", "primary")
 
         btn_layout.addWidget(btn_cancel)
         btn_layout.addWidget(btn_ok)
@@ -1,190 +1,52 @@
 # app/ui/components.py
-from PyQt6.QtWidgets import (QWidget, QHBoxLayout, QLabel, QCalendarWidget, QPushButton, QGraphicsOpacityEffect,QSizePolicy)
-from PyQt6.QtCore import Qt, QPoint, QPointF, QRect, QPropertyAnimation, QEasingCurve, QSize, pyqtProperty
-from PyQt6.QtGui import QColor, QPainter, QPen, QCursor, QFont
+from PyQt6.QtWidgets import (QCalendarWidget, QTableView)
+from PyQt6.QtCore import Qt, QPoint, QPointF, QRect, QEvent
+from PyQt6.QtGui import QColor, QPainter, QPen, QPixmap
 from app.config import *
-
-# --- 1. 纯手绘极简复选框 (保持不变) ---
-class CustomCheckButton(QWidget):
-    def __init__(self, checked=False, size=22, parent=None):
-        super().__init__(parent)
-        self.setFixedSize(size, size)
-        self.setCursor(Qt.CursorShape.PointingHandCursor)
-        self._checked = checked
-        self._hover = False
-
-    def isChecked(self):
-        return self._checked
-
-    def setChecked(self, checked):
-        self._checked = checked
-        self.update()
-
-    def enterEvent(self, event):
-        self._hover = True
-        self.update()
-
-    def leaveEvent(self, event):
-        self._hover = False
-        self.update()
-
-    def mouseReleaseEvent(self, event):
-        if event.button() == Qt.MouseButton.LeftButton:
-            self._checked = not self._checked
-            self.update()
-            if hasattr(self, 'clicked'): 
-                self.clicked()
-
-    def paintEvent(self, event):
-        painter = QPainter(self)
-        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
-        
-        rect = self.rect()
-        margin = 3
-        draw_rect = rect.adjusted(margin, margin, -margin, -margin)
-        
-        active_color = QColor(ACCENT_COLOR)
-        border_color = QColor("#CBD5E0")
-        
-        if self._checked:
-            adjust = margin - 1 
-            draw_rect = rect.adjusted(adjust, adjust, -adjust, -adjust)
-
-            painter.setPen(Qt.PenStyle.NoPen)
-            painter.setBrush(active_color)
-            painter.drawEllipse(draw_rect)
-            
-            c = draw_rect.center()
-            w = draw_rect.width()
-            p1 = QPointF(c.x() - w * 0.25, c.y() + 2)
-            p2 = QPointF(c.x() - w * 0.05, c.y() + w * 0.25)
-            p3 = QPointF(c.x() + w * 0.3, c.y() - w * 0.25)
-            
-            pen = QPen(QColor("white"))
-            pen.setWidthF(2.0)
-            pen.setCapStyle(Qt.PenCapStyle.RoundCap)
-            pen.setJoinStyle(Qt.PenJoinStyle.RoundJoin)
-            painter.setPen(pen)
-            painter.drawLine(p1, p2)
-            painter.drawLine(p2, p3)
-        else:
-            pen = QPen(active_color if self._hover else border_color)
-            pen.setWidthF(2.0)
-            painter.setPen(pen)
-            painter.setBrush(Qt.BrushStyle.NoBrush)
-            painter.drawEllipse(draw_rect)
-
-# --- 2. 任务列表项组件 (修复版) ---
-class TaskItemWidget(QWidget):
-    def __init__(self, task_data, on_toggle_callback, on_delete_callback):
-        super().__init__()
-        self.task_data = task_data
-        self.on_toggle_callback = on_toggle_callback
-        self.on_delete_callback = on_delete_callback
-
-        # 整体圆角
-        self.setStyleSheet(f"""
-            TaskItemWidget {{
-                background-color: transparent;
-                border-radius: 8px; 
-            }}
-            TaskItemWidget:hover {{
-                 background-color: #F7FAFC;
-            }}
-        """)
+from app.perf import get_perf
+from app.ui.theme import get_theme
+import time
+
+_perf = get_perf()
+
+# --- 1. 纯手绘极简复选框 ---
+def paint_check_circle(painter, rect, checked, hover=False):
+    # 复选框的绘制逻辑，任务列表的委托 (app/ui/task_list.py) 逐行调用
+    margin = 3
+    draw_rect = rect.adjusted(margin, margin, -margin, -margin)
+    
+    active_color = get_theme().color("accent")
+    border_color = get_theme().color("muted")
+    
+    if checked:
+        adjust = margin - 1 
+        draw_rect = rect.adjusted(adjust, adjust, -adjust, -adjust)
+
+        painter.setPen(Qt.PenStyle.NoPen)
+        painter.setBrush(active_color)
+        painter.drawEllipse(draw_rect)
         
-        main_layout = QHBoxLayout(self)
-        main_layout.setContentsMargins(0, 0, 0, 0)
-        main_layout.setSpacing(0)
-
-        # --- 左侧内容 ---
-        content_widget = QWidget()
-        content_widget.setStyleSheet("background: transparent; border-radius: 8px;")
-        content_layout = QHBoxLayout(content_widget)
-        content_layout.setContentsMargins(10, 5, 10, 5) 
-        content_layout.setSpacing(12)
-
-        self.checkbox = CustomCheckButton(checked=task_data.get('completed', False))
-        self.checkbox.clicked = self.on_checkbox_clicked
+        c = draw_rect.center()
+        w = draw_rect.width()
+        p1 = QPointF(c.x() - w * 0.25, c.y() + 2)
+        p2 = QPointF(c.x() - w * 0.05, c.y() + w * 0.25)
+        p3 = QPointF(c.x() + w * 0.3, c.y() - w * 0.25)
         
-        self.lbl = QLabel(task_data.get('text', ''))
-        self.lbl.setWordWrap(True)
-        self.lbl.setStyleSheet("background: transparent; border: none;")
-        
-        content_layout.addWidget(self.checkbox, 0, Qt.AlignmentFlag.AlignVCenter)
-        content_layout.addWidget(self.lbl, 1, Qt.AlignmentFlag.AlignVCenter)
-
-        # --- 右侧删除按钮 ---
-        self.del_btn = QPushButton("🗑 删除") # 加了文字，看起来更正式，如果不想要文字可以删掉
-        self.del_btn.setCursor(QCursor(Qt.CursorShape.PointingHandCursor))
-        
-        # 【核心修复】：水平 Fixed (听指挥)，垂直 Expanding (填满高度)
-        self.del_btn.setSizePolicy(QSizePolicy.Policy.Fixed, QSizePolicy.Policy.Expanding)
-        
-        self.del_btn.setMaximumWidth(0) # 初始隐藏
-        
-        # 样式优化：文字居中，图标和文字有间隔
-        self.del_btn.setStyleSheet("""
-            QPushButton {
-                background-color: #E53E3E; 
-                color: white; 
-                border: none; 
-                border-top-right-radius: 8px;     
-                border-bottom-right-radius: 8px;  
-                margin-left: 10px;
-                font-size: 14px;
-                font-weight: bold;
-                padding-left: 5px;
-                padding-right: 5px;
-            }
-            QPushButton:hover {
-                background-color: #C53030;
-            }
-        """)
-        self.del_btn.clicked.connect(self.on_delete_callback)
-
-        self.update_style()
-
-        main_layout.addWidget(content_widget, 1)
-        main_layout.addWidget(self.del_btn) # 这里不需要再设 AlignStretch 了，SizePolicy 会搞定
-
-        # --- 动画设置 ---
-        
-        # 飞入
-        self.anim_in = QPropertyAnimation(self.del_btn, b"maximumWidth")
-        self.anim_in.setDuration(400)  # 400ms 比较丝滑
-        self.anim_in.setStartValue(0)
-        self.anim_in.setEndValue(90)   # 90px 宽度，足够放下图标和文字
-        self.anim_in.setEasingCurve(QEasingCurve.Type.OutCubic) # 使用 OutCubic 曲线
-
-        # 飞出
-        self.anim_out = QPropertyAnimation(self.del_btn, b"maximumWidth")
-        self.anim_out.setDuration(300)
-        self.anim_out.setEndValue(0)
-        self.anim_out.setEasingCurve(QEasingCurve.Type.InCubic)
-
-    def update_style(self):
-        is_completed = self.checkbox.isChecked()
-        base_style = "background: transparent; border: none; font-family: 'Microsoft YaHei UI', sans-serif;"
-        if is_completed:
-            self.lbl.setStyleSheet(base_style + f"color: {TEXT_SECONDARY}; font-size: 15px; text-decoration: line-through;")
-        else:
-            self.lbl.setStyleSheet(base_style + f"color: {TEXT_PRIMARY}; font-size: 15px; font-weight: 500; line-height: 1.2;")
-
-    def on_checkbox_clicked(self):
-        self.update_style()
-        self.on_toggle_callback()
-
-    def enterEvent(self, event):
-        self.anim_out.stop()
-        self.anim_in.start()
-        super().enterEvent(event)
-
-    def leaveEvent(self, event):
-        self.anim_in.stop()
-        self.anim_out.setStartValue(self.del_btn.width())
-        self.anim_out.start()
-        super().leaveEvent(event)
+        pen = QPen(QColor("white"))
+        pen.setWidthF(2.0)
+        pen.setCapStyle(Qt.PenCapStyle.RoundCap)
+        pen.setJoinStyle(Qt.PenJoinStyle.RoundJoin)
+        painter.setPen(pen)
+        painter.drawLine(p1, p2)
+        painter.drawLine(p2, p3)
+    else:
+        pen = QPen(active_color if hover else border_color)
+        pen.setWidthF(2.0)
+        painter.setPen(pen)
+        painter.setBrush(Qt.BrushStyle.NoBrush)
+        painter.drawEllipse(draw_rect)
+
+# --- 2. 任务列表见 app/ui/task_list.py (模型/视图 + 自绘委托) ---
 
 # --- 3. 极简日历 (保持不变) ---
 class CleanCalendar(QCalendarWidget):
@@ -192,49 +54,107 @@ class CleanCalendar(QCalendarWidget):
     def __init__(self, task_manager):
         super().__init__()
         self.task_manager = task_manager
+        # 格子图片缓存：(日, 选中, 本月, 有任务, 设备像素比, 宽, 高) -> QPixmap
+        # 预热之后重绘一整页只是 42 次贴图；主题/字体/DPI 变化时重建
+        self._cell_cache = {}
+        self.cell_cache_hits = 0
+        self.cell_cache_misses = 0
+        # 最近一次绘制中的命中/未命中数 (调试用)，表格每次绘制前清零
+        self.last_paint_hits = 0
+        self.last_paint_misses = 0
+        # 性能计数打开时：当前这次绘制里 paintCell 的累计耗时与格子数
+        self._paint_time = 0.0
+        self._paint_cells = 0
+        table = self.findChild(QTableView)
+        if table is not None:
+            table.viewport().installEventFilter(self)
+
         self.setVerticalHeaderFormat(QCalendarWidget.VerticalHeaderFormat.NoVerticalHeader)
         self.setGridVisible(False)
         self.setNavigationBarVisible(False)
-        
-        self.setStyleSheet(f"""
-            QCalendarWidget QWidget {{ alternate-background-color: {BG_COLOR}; background-color: {BG_COLOR}; }}
-            QCalendarWidget QToolButton::menu-indicator {{ image: none; }}
-            QCalendarWidget QToolButton {{ 
-                color: {TEXT_PRIMARY}; font-weight: bold; icon-size: 20px; border: none;
-                background-color: transparent; padding: 5px;
-            }}
-            QCalendarWidget QToolButton:hover {{ background-color: {CARD_BG}; border-radius: 5px; }}
-            QCalendarWidget QMenu {{ color: white; background-color: {TEXT_PRIMARY}; }}
-            QCalendarWidget QSpinBox {{ 
-                color: {TEXT_PRIMARY}; background: transparent; selection-background-color: {ACCENT_COLOR};
-            }}
-            QCalendarWidget QTableView QHeaderView::section {{
-                background-color: white; color: {TEXT_SECONDARY}; border: none; font-weight: bold; padding-bottom: 5px;
-            }}
-            QCalendarWidget QAbstractItemView {{
-                font-size: 14px; color: {TEXT_PRIMARY}; 
-                selection-background-color: transparent; 
-                selection-color: white; outline: none; border: none;
-            }}
-        """)
+        # 月份数据在绘制时按需读取；翻页预取见 app/ui/prefetch.py
+        # 样式见 theme.py 的应用级样式表；主题切换时重新生成格子图片
+        get_theme().changed.connect(self.invalidate_cell_cache)
+
+    def invalidate_cell_cache(self):
+        self._cell_cache.clear()
+        self.update()
+
+    def changeEvent(self, event):
+        if event.type() in (QEvent.Type.StyleChange, QEvent.Type.FontChange, QEvent.Type.PaletteChange):
+            self._cell_cache.clear()
+        super().changeEvent(event)
+
+    def eventFilter(self, obj, event):
+        if event.type() == QEvent.Type.Paint:
+            self.last_paint_hits = self.last_paint_misses = 0
+            # 拿不到绘制结束的时机，上一次绘制的累计值在下一次绘制开始时提交
+            if self._paint_cells:
+                _perf.record("calendar.paint", self._paint_time, cells=self._paint_cells)
+                self._paint_time = 0.0
+                self._paint_cells = 0
+        return super().eventFilter(obj, event)
+
+    def cell_cache_stats(self):
+        return {"size": len(self._cell_cache), "hits": self.cell_cache_hits,
+                "misses": self.cell_cache_misses, "last_paint_hits": self.last_paint_hits,
+                "last_paint_misses": self.last_paint_misses}
 
     def paintCell(self, painter, rect, date):
+        if _perf.enabled:
+            start = time.perf_counter()
+            self._paint_cell(painter, rect, date)
+            self._paint_time += time.perf_counter() - start
+            self._paint_cells += 1
+        else:
+            self._paint_cell(painter, rect, date)
+
+    def _paint_cell(self, painter, rect, date):
+        year, month, day = date.year(), date.month(), date.day()
+        # 每个月一个占用位图，不再对每个格子格式化日期字符串再查字典
+        has_dot = bool(self.task_manager.month_occupancy(year, month) >> (day - 1) & 1)
+        dpr = painter.device().devicePixelRatioF()
+        key = (day, date == self.selectedDate(), month == self.monthShown(), has_dot,
+               dpr, rect.width(), rect.height())
+
+        pixmap = self._cell_cache.get(key)
+        if pixmap is None:
+            self.cell_cache_misses += 1
+            self.last_paint_misses += 1
+            if len(self._cell_cache) > 512:
+                # 尺寸变化留下的旧图片
+                self._cell_cache.clear()
+            pixmap = self._cell_cache[key] = self._render_cell(key, painter.font())
+        else:
+            self.cell_cache_hits += 1
+            self.last_paint_hits += 1
+        painter.drawPixmap(rect.topLeft(), pixmap)
+
+    def _render_cell(self, key, font):
+        day, is_selected, in_month, has_dot, dpr, width, height = key
+        pixmap = QPixmap(round(width * dpr), round(height * dpr))
+        pixmap.setDevicePixelRatio(dpr)
+        pixmap.fill(Qt.GlobalColor.transparent)
+        rect = QRect(0, 0, width, height)
+
+        theme = get_theme()
+        painter = QPainter(pixmap)
         painter.setRenderHint(QPainter.RenderHint.Antialiasing)
-        is_selected = (date == self.selectedDate())
-        
+        painter.setFont(font)
         if is_selected:
             painter.setPen(Qt.PenStyle.NoPen)
-            painter.setBrush(QColor(ACCENT_COLOR))
+            painter.setBrush(theme.color("accent"))
             painter.drawRoundedRect(rect.adjusted(6, 6, -6, -6), 12, 12)
-        
-        painter.setPen(QColor("white") if is_selected else QColor(TEXT_PRIMARY))
-        if date.month() != self.monthShown():
-             painter.setPen(QColor("#CBD5E0"))
-             
-        painter.drawText(rect, Qt.AlignmentFlag.AlignCenter, str(date.day()))
-
-        if self.task_manager.has_tasks(date):
-            dot_color = QColor("white") if is_selected else QColor(DANGER_COLOR)
+
+        painter.setPen(QColor("white") if is_selected else theme.color("text_primary"))
+        if not in_month:
+            painter.setPen(theme.color("muted"))
+        painter.drawText(rect, Qt.AlignmentFlag.AlignCenter, str(day))
+
+        if has_dot:
+            dot_color = QColor("white") if is_selected else theme.color("danger")
             painter.setPen(Qt.PenStyle.NoPen)
             painter.setBrush(dot_color)
-            painter.drawEllipse(QPoint(int(rect.center().x()), int(rect.bottom() - 8)), 2, 2)
\ No newline at end of file
+            painter.drawEllipse(QPoint(int(rect.center().x()), int(rect.bottom() - 8)), 2, 2)
+        painter.end()
+        return pixmap
@@ -1,18 +1,28 @@
 # app/ui/floating_ball.py
-from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QMenu, QApplication )
-from PyQt6.QtCore import Qt, QTimer, QUrl
+from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QMenu, QApplication, QFileDialog)
+from PyQt6.QtCore import Qt, QUrl, pyqtSignal
 from PyQt6.QtGui import QDesktopServices, QAction
 from app.config import *
 import time
 import os
 
+from app.startup import get_profile
 from app.ui.ball_body import BallBody
-from app.ui.ball_dialogs import CustomTimeDialog
+from app.ui.scheduler import get_scheduler
+from app.ui.theme import get_theme
 
 class LiveDateBall(QWidget):
-    def __init__(self, parent_window):
+    # 启动时后台预读完月份 [(year, month), ...] 后发出 (跨线程，自动排队到 GUI 线程)
+    months_loaded = pyqtSignal(object)
+
+    def __init__(self, data_manager):
         super().__init__()
-        self.parent_window = parent_window
+        self.data_manager = data_manager
+        # 日历窗口第一次点击悬浮球时才创建 (见 calendar_window)，多数时候只需要悬浮球
+        self.parent_window = None
+        self.calendar_opacity = 1.0
+        # 性能浮层，第一次打开时创建
+        self.perf_overlay = None
         
         self.setWindowFlags(Qt.WindowType.FramelessWindowHint | 
                             Qt.WindowType.WindowStaysOnTopHint | 
@@ -27,7 +37,7 @@ class LiveDateBall(QWidget):
         layout.setContentsMargins(0, 0, 0, 0)
         layout.setAlignment(Qt.AlignmentFlag.AlignCenter)
         
-        self.body = BallBody(data_manager=parent_window.data_manager)
+        self.body = BallBody(data_manager=data_manager)
         layout.addWidget(self.body)
 
         self.old_pos = None
@@ -35,9 +45,9 @@ class LiveDateBall(QWidget):
         self.click_start_time = 0
         self.is_locked = False
         
-        self.timer = QTimer(self)
-        self.timer.timeout.connect(self.check_date_update)
-        self.timer.start(60000) 
+        # 不再每分钟轮询一次，而是正好在每天 0 点唤醒刷新日期
+        get_scheduler().call_at_midnight("ball.date", self.check_date_update)
+        self.months_loaded.connect(self.on_months_loaded)
 
     def check_date_update(self):
         if self.body.mode == "NORMAL":
@@ -73,15 +83,12 @@ class LiveDateBall(QWidget):
             delta = event.globalPosition().toPoint() - self.old_pos
             self.move(self.x() + delta.x(), self.y() + delta.y())
             self.old_pos = event.globalPosition().toPoint()
+            if self.perf_overlay is not None and self.perf_overlay.isVisible():
+                self.perf_overlay.refresh()
 
     def show_context_menu(self, pos):
         menu = QMenu(self)
-        menu.setStyleSheet(f"""
-            QMenu {{ background-color: white; border: 1px solid #E2E8F0; border-radius: 6px; padding: 4px; }}
-            QMenu::item {{ padding: 6px 25px; margin: 2px; border-radius: 4px; color: #4A5568; font-family: "Microsoft YaHei UI"; font-size: 13px; }}
-            QMenu::item:selected {{ background-color: {ACCENT_COLOR}; color: white; }}
-            QMenu::separator {{ height: 1px; background: #E2E8F0; margin: 4px 10px; }}
-        """)
+        menu.setProperty("role", "context")
         
         if self.body.mode == "FOCUS":
              menu.addAction("⏹ 停止专注").triggered.connect(self.body.stop_all)
@@ -107,6 +114,15 @@ class LiveDateBall(QWidget):
         opacity_menu.addAction("90%").triggered.connect(lambda: self.set_calendar_opacity(0.9))
         opacity_menu.addAction("80%").triggered.connect(lambda: self.set_calendar_opacity(0.8))
 
+        # 主题：只重新生成一份应用级样式表，不重建任何控件
+        theme_menu = menu.addMenu("🎨 主题")
+        theme = get_theme()
+        for name in THEMES:
+            action = theme_menu.addAction(THEME_LABELS.get(name, name))
+            action.setCheckable(True)
+            action.setChecked(name == theme.name)
+            action.triggered.connect(lambda checked=False, n=name: theme.set_theme(n))
+
         lock_action = QAction("🔒 锁定位置", menu)
         lock_action.setCheckable(True)
         lock_action.setChecked(self.is_locked)
@@ -116,6 +132,13 @@ class LiveDateBall(QWidget):
         settings_menu = menu.addMenu("⚙️ 更多设置")
         settings_menu.addAction("📂 打开数据文件夹").triggered.connect(self.open_data_folder)
         settings_menu.addAction("📍 重置悬浮球位置").triggered.connect(lambda: self.move(100, 100))
+        settings_menu.addSeparator()
+        perf_action = QAction("📊 性能浮层", settings_menu)
+        perf_action.setCheckable(True)
+        perf_action.setChecked(self.perf_overlay is not None and self.perf_overlay.isVisible())
+        perf_action.triggered.connect(self.toggle_perf_overlay)
+        settings_menu.addAction(perf_action)
+        settings_menu.addAction("💾 导出性能数据...").triggered.connect(self.export_perf_trace)
         
         menu.addSeparator()
         menu.addAction("🚪 退出程序").triggered.connect(QApplication.instance().quit)
@@ -123,6 +146,8 @@ class LiveDateBall(QWidget):
         menu.exec(pos)
 
     def set_custom_focus(self):
+        # 对话框模块用到时才导入
+        from app.ui.ball_dialogs import CustomTimeDialog
         dialog = CustomTimeDialog(self)
         geo = self.geometry()
         screen_geo = self.screen().geometry()
@@ -136,19 +161,52 @@ class LiveDateBall(QWidget):
             self.body.start_focus(minutes)
 
     def set_calendar_opacity(self, opacity):
-        self.parent_window.setWindowOpacity(opacity)
+        self.calendar_opacity = opacity
+        if self.parent_window is not None:
+            self.parent_window.setWindowOpacity(opacity)
+
+    def toggle_perf_overlay(self, checked):
+        if checked:
+            if self.perf_overlay is None:
+                from app.ui.perf_overlay import PerfOverlay
+                self.perf_overlay = PerfOverlay(self)
+            self.perf_overlay.start()
+        elif self.perf_overlay is not None:
+            self.perf_overlay.stop()
+
+    def export_perf_trace(self):
+        from app.perf import get_perf
+        default = os.path.join(self.data_manager.data_dir, "perf_trace.csv")
+        filename, _ = QFileDialog.getSaveFileName(self, "导出性能数据", default, "CSV (*.csv);;JSON (*.json)")
+        if filename:
+            get_perf().export(filename)
 
     def toggle_lock(self, checked):
         self.is_locked = checked
 
     def open_data_folder(self):
-        path = os.getcwd()
+        # 任务数据所在的目录 (~/.calendar_app_data)，而不是程序的工作目录
+        path = os.path.abspath(self.data_manager.data_dir)
         QDesktopServices.openUrl(QUrl.fromLocalFile(path))
 
+    def on_months_loaded(self, months):
+        # 日历窗口还没创建时不用处理，创建后绘制时会直接命中缓存
+        if self.parent_window is not None:
+            self.parent_window.prefetcher.on_months_loaded(months)
+
+    def calendar_window(self):
+        if self.parent_window is None:
+            with get_profile().span("calendar window (lazy)"):
+                from app.ui.main_window import ModernCalendarWindow
+                self.parent_window = ModernCalendarWindow(self.data_manager)
+                self.parent_window.setWindowOpacity(self.calendar_opacity)
+        return self.parent_window
+
     def toggle_calendar(self):
-        if self.parent_window.isVisible():
+        if self.parent_window is not None and self.parent_window.isVisible():
             self.parent_window.hide()
         else:
+            self.calendar_window()
             geo = self.geometry()
             win_w = self.parent_window.width()
             screen_w = self.screen().geometry().width()
@@ -0,0 +1,97 @@
+# app/ui/halo.py
+# WORK 模式火焰光环的几何计算：查表代替逐点三角函数
+#
+# 原来每一帧、每个光环都要在 360 个角度上各算一次 radians/sin/cos/random.uniform，
+# 再一个点一个点地往 QPainterPath 里加。这里：
+#   - 每个角度的 cos/sin 以及波浪项里的 sin(0.1a)/cos(0.1a)/sin(0.3a)/cos(0.3a) 预先算好
+#   - 随时间变化的相位用和角公式展开，每帧只需要 4 次三角函数
+#   - 微抖动从一张预生成的随机数表里按帧偏移取值
+#   - 坐标直接写进复用的 QPolygonF 内存，每帧不再创建 QPointF 对象
+import math
+import random
+from array import array
+
+from PyQt6.QtCore import Qt, QPointF
+from PyQt6.QtGui import QBrush, QColor, QPolygonF
+
+ANGLE_COUNT = 360
+_JITTER_SIZE = 4096
+
+_COS = [math.cos(math.radians(a)) for a in range(ANGLE_COUNT)]
+_SIN = [math.sin(math.radians(a)) for a in range(ANGLE_COUNT)]
+# 波浪项 sin(0.1a + p) * cos(0.3a - q) 的角度部分
+_SIN_A = [math.sin(a * 0.1) for a in range(ANGLE_COUNT)]
+_COS_A = [math.cos(a * 0.1) for a in range(ANGLE_COUNT)]
+_SIN_B = [math.sin(a * 0.3) for a in range(ANGLE_COUNT)]
+_COS_B = [math.cos(a * 0.3) for a in range(ANGLE_COUNT)]
+
+# 微抖动 (Micro-jitter)：与原来一样是 [-1.5, 1.5] 的均匀分布；
+# 表比一圈长得多，再按帧随机偏移，看不出重复
+_JITTER = [random.uniform(-1.5, 1.5) for _ in range(_JITTER_SIZE + ANGLE_COUNT)]
+
+
+# 细节等级 -> 取点间隔 (度)：0 为原始的 1 度精度，帧时间超预算时逐级降低
+DETAIL_STRIDES = (1, 2, 4)
+
+
+class _Tables:
+    # 按取点间隔抽样后的查表数据，以及复用的多边形缓冲区
+    def __init__(self, stride):
+        self.count = ANGLE_COUNT // stride
+        self.cos = _COS[::stride]
+        self.sin = _SIN[::stride]
+        self.sin_a = _SIN_A[::stride]
+        self.cos_a = _COS_A[::stride]
+        self.sin_b = _SIN_B[::stride]
+        self.cos_b = _COS_B[::stride]
+        self.polygon = QPolygonF([QPointF()] * self.count)
+        ptr = self.polygon.data()
+        ptr.setsize(self.count * 2 * 8)
+        self.coords = memoryview(ptr).cast("B").cast("d")
+
+
+class HaloGeometry:
+    """一层光环的轮廓，polygon() 每次返回同一个 QPolygonF (内容已更新)"""
+
+    def __init__(self, max_stretch, noise_speed_factor):
+        self.max_stretch = max_stretch
+        self.noise_speed_factor = noise_speed_factor
+        self._tables = {}
+
+    def polygon(self, cx, cy, base_radius, pulse_base, anim_step, detail=0):
+        stride = DETAIL_STRIDES[min(detail, len(DETAIL_STRIDES) - 1)]
+        t = self._tables.get(stride)
+        if t is None:
+            t = self._tables[stride] = _Tables(stride)
+
+        p = anim_step * self.noise_speed_factor
+        q = p * 0.8
+        sp, cp = math.sin(p), math.cos(p)
+        sq, cq = math.sin(q), math.cos(q)
+
+        # 半径 = 基础半径 + 整体呼吸幅度 + 波浪延伸 (0 ~ 8) + 微抖动
+        # (noise + 1) / 2 * 8 化简为 4 * noise + 4
+        radius0 = base_radius + pulse_base * self.max_stretch * 0.6 + 4
+        offset = random.randrange(_JITTER_SIZE)
+        jitter = _JITTER[offset:offset + t.count]
+        radii = [radius0 + 4 * (sa * cp + ca * sp) * (cb * cq + sb * sq) + j
+                 for sa, ca, sb, cb, j in zip(t.sin_a, t.cos_a, t.sin_b, t.cos_b, jitter)]
+
+        coords = array("d", bytes(t.count * 2 * 8))
+        coords[0::2] = array("d", [cx + r * c for r, c in zip(radii, t.cos)])
+        coords[1::2] = array("d", [cy + r * s for r, s in zip(radii, t.sin)])
+        t.coords[:] = coords
+        return t.polygon
+
+
+def paint_halos(painter, halos, cx, cy, base_radius, pulse_base, anim_step, detail=0):
+    # halos: [(颜色, alpha_base, HaloGeometry), ...]，GUI 线程和后台渲染线程共用
+    painter.setPen(Qt.PenStyle.NoPen)
+    for color_hex, alpha_base, halo in halos:
+        polygon = halo.polygon(cx, cy, base_radius, pulse_base, anim_step, detail)
+        color = QColor(color_hex)
+        # 透明度也跟随强度平滑变化
+        current_alpha = int(alpha_base - (pulse_base * 20))
+        color.setAlpha(max(20, current_alpha))
+        painter.setBrush(QBrush(color))
+        painter.drawPolygon(polygon)
@@ -0,0 +1,89 @@
+# app/ui/halo_renderer.py
+# WORK 模式光环的后台渲染：在独立线程里提前一帧把光环画进 QImage，
+# GUI 线程的 paintEvent 只需要贴图，拖动悬浮球、操作日历时不再和光环抢时间
+import threading
+
+from PyQt6.QtCore import Qt
+from PyQt6.QtGui import QImage, QPainter
+
+from app.ui.halo import HaloGeometry, paint_halos
+
+
+class HaloRenderer:
+    """光环预渲染线程
+
+    submit() 提交下一帧的参数 (只保留最新的一个请求)；后台线程画好后把
+    (帧号, 图像) 通过一次引用赋值发布出来，frame() 读取时不需要加锁。
+    两块缓冲区按帧号奇偶轮流使用：正在被 GUI 贴图的那一帧不会被覆盖，
+    因为下一帧的请求要等 GUI 处理完这一帧之后才会提交。
+    """
+
+    def __init__(self, halos):
+        # 线程自己的几何对象 (内部缓冲区不能和 GUI 线程共用)
+        self._halos = [(color_hex, alpha_base, HaloGeometry(h.max_stretch, h.noise_speed_factor))
+                       for color_hex, alpha_base, h in halos]
+        self._cond = threading.Condition()
+        self._request = None
+        self._closing = False
+        self._buffers = [None, None]
+        # 最近发布的两帧 ((帧号, QImage), ...)
+        self._published = ()
+
+        # 统计：画好的帧数、被新请求覆盖而没画的帧数
+        self.rendered = 0
+        self.dropped = 0
+
+        self._thread = threading.Thread(target=self._run, name="HaloRenderer", daemon=True)
+        self._thread.start()
+
+    def submit(self, step, cx, cy, base_radius, pulse_base, detail, width, height, dpr):
+        with self._cond:
+            if self._request is not None:
+                self.dropped += 1
+            self._request = (step, cx, cy, base_radius, pulse_base, detail, width, height, dpr)
+            self._cond.notify()
+
+    def frame(self, step):
+        # 返回帧号为 step 的图像，还没画好则返回 None (调用方改为同步绘制)
+        for frame_step, image in self._published:
+            if frame_step == step:
+                return image
+        return None
+
+    def close(self):
+        with self._cond:
+            self._closing = True
+            self._cond.notify()
+        self._thread.join(1.0)
+
+    def _buffer(self, step, width, height, dpr):
+        index = step % 2
+        image = self._buffers[index]
+        size = (round(width * dpr), round(height * dpr))
+        if image is None or (image.width(), image.height()) != size or image.devicePixelRatio() != dpr:
+            image = QImage(size[0], size[1], QImage.Format.Format_ARGB32_Premultiplied)
+            image.setDevicePixelRatio(dpr)
+            self._buffers[index] = image
+        return image
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while self._request is None and not self._closing:
+                    self._cond.wait()
+                if self._closing:
+                    return
+                request, self._request = self._request, None
+
+            step, cx, cy, base_radius, pulse_base, detail, width, height, dpr = request
+            image = self._buffer(step, width, height, dpr)
+            image.fill(Qt.GlobalColor.transparent)
+            painter = QPainter(image)
+            painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+            paint_halos(painter, self._halos, cx, cy, base_radius, pulse_base, step, detail)
+            painter.end()
+
+            # 发布：单次引用赋值，读的一方要么看到旧的元组，要么看到新的
+            previous = self._published[:1]
+            self._published = ((step, image),) + previous
+            self.rendered += 1
@@ -1,11 +1,17 @@
 # app/ui/main_window.py
-from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QListWidget, 
+from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, 
                              QLineEdit, QPushButton, QLabel, QGraphicsDropShadowEffect, 
-                             QFrame, QListWidgetItem, QAbstractItemView, QComboBox)
-from PyQt6.QtCore import Qt, QSize, QRect, QDate
-from PyQt6.QtGui import QColor, QFont, QFontMetrics, QIcon
+                             QFrame, QComboBox, QMenu)
+from PyQt6.QtCore import Qt, QDate
+from PyQt6.QtGui import QColor
 from app.config import *
-from app.ui.components import CleanCalendar, TaskItemWidget
+from app.perf import get_perf
+from app.ui.components import CleanCalendar
+from app.ui.prefetch import MonthPrefetcher
+from app.ui.task_list import TaskListModel, TaskListView
+import time
+
+_perf = get_perf()
 
 class ModernCalendarWindow(QWidget):
     def __init__(self, data_manager):
@@ -21,13 +27,9 @@ class ModernCalendarWindow(QWidget):
         self.setLayout(root_layout)
 
         # 主容器（带阴影圆角）
+        # 样式统一在 app/ui/theme.py 的应用级样式表里，这里只设置 objectName
         self.container = QFrame()
-        self.container.setStyleSheet(f"""
-            QFrame {{
-                background-color: {BG_COLOR};
-                border-radius: 16px;
-            }}
-        """)
+        self.container.setObjectName("calendarContainer")
         shadow = QGraphicsDropShadowEffect()
         shadow.setBlurRadius(30)
         shadow.setColor(QColor(0, 0, 0, 40))
@@ -63,71 +65,64 @@ class ModernCalendarWindow(QWidget):
         # 顶部标题栏
         header_layout = QHBoxLayout()
         self.date_title = QLabel("今日待办")
-        self.date_title.setStyleSheet(f"font-size: 18px; font-weight: bold; color: {TEXT_PRIMARY};")
+        self.date_title.setObjectName("dateTitle")
         
         close_btn = QPushButton("×")
         close_btn.setCursor(Qt.CursorShape.PointingHandCursor)
         close_btn.setFixedSize(24, 24)
         close_btn.clicked.connect(self.hide)
-        close_btn.setStyleSheet("""
-            QPushButton { color: #A0AEC0; border: none; font-size: 20px; font-weight: bold;}
-            QPushButton:hover { color: #E53E3E; }
-        """)
+        close_btn.setObjectName("closeButton")
         
         header_layout.addWidget(self.date_title)
         header_layout.addStretch()
         header_layout.addWidget(close_btn)
         right_panel.addLayout(header_layout)
 
+        # 搜索框：回车后弹出命中列表，点击跳转到对应日期
+        self.search_line = QLineEdit()
+        self.search_line.setPlaceholderText("🔍 搜索任务...")
+        self.search_line.setObjectName("searchLine")
+        self.search_line.returnPressed.connect(self.run_search)
+        right_panel.addWidget(self.search_line)
+
         # 工作时长显示
         self.work_time_label = QLabel("🔥 今日投入: 0h 0m")
-        self.work_time_label.setStyleSheet(f"color: #FF9966; font-size: 13px; font-weight: bold; margin-bottom: 5px;")
-        right_panel.addWidget(self.work_time_label)
-
-        # 任务列表
-        self.task_list = QListWidget()
-        self.task_list.setSelectionMode(QAbstractItemView.SelectionMode.NoSelection)
-        self.task_list.setStyleSheet(f"""
-            QListWidget {{ border: none; background: transparent; outline: none;}}
-            QListWidget::item {{ 
-                background-color: {CARD_BG}; 
-                border-radius: 8px; 
-                margin-bottom: 8px;
-                border: 1px solid transparent;
-            }}
-            QListWidget::item:hover {{ 
-                border: 1px solid {ACCENT_COLOR}; 
-            }}
-            QListWidget::item:selected {{
-                outline: none;
-                border: 1px solid {ACCENT_COLOR};
-                background-color: {CARD_BG}; /* 保持背景不变，或者稍微变色 */
-                color: {TEXT_PRIMARY};
-            }}
-        """)
+        self.work_time_label.setObjectName("workTimeLabel")
+
+        # 统计面板：所选日期所在周/月/年的合计与近 7 天日均
+        self.stats_label = QLabel()
+        self.stats_label.setObjectName("statsLabel")
+
+        work_row = QHBoxLayout()
+        work_row.addWidget(self.work_time_label)
+        work_row.addStretch()
+        work_row.addWidget(self.stats_label)
+        right_panel.addLayout(work_row)
+
+        # 任务列表 (模型/视图，行由委托自绘)
+        self.task_model = TaskListModel(self.data_manager, self)
+        self.task_list = TaskListView()
+        self.task_list.setModel(self.task_model)
+        self.task_list.toggled.connect(self.on_task_toggled)
+        self.task_list.delete_requested.connect(self.delete_task)
         right_panel.addWidget(self.task_list)
 
         # 输入框区域
         input_box = QFrame()
-        input_box.setStyleSheet(f"background-color: {CARD_BG}; border-radius: 20px;")
+        input_box.setObjectName("inputBox")
         input_layout = QHBoxLayout(input_box)
         input_layout.setContentsMargins(5, 5, 5, 5)
 
         self.input_line = QLineEdit()
         self.input_line.setPlaceholderText(" 添加新任务...")
-        self.input_line.setStyleSheet("border: none; background: transparent; font-size: 14px;")
+        self.input_line.setObjectName("inputLine")
         self.input_line.returnPressed.connect(self.add_task)
 
         self.add_btn = QPushButton("＋")
         self.add_btn.setFixedSize(32, 32)
         self.add_btn.setCursor(Qt.CursorShape.PointingHandCursor)
         self.add_btn.clicked.connect(self.add_task)
-        self.add_btn.setStyleSheet(f"""
-            QPushButton {{
-                background-color: {ACCENT_COLOR}; color: white; border-radius: 16px; font-size: 18px; font-weight: bold;
-            }}
-            QPushButton:hover {{ background-color: #5A67D8; }}
-        """)
+        self.add_btn.setObjectName("addButton")
         
         input_layout.addWidget(self.input_line)
         input_layout.addWidget(self.add_btn)
@@ -136,95 +131,26 @@ class ModernCalendarWindow(QWidget):
         # 清理按钮
         self.del_link = QPushButton("清理已完成")
         self.del_link.setCursor(Qt.CursorShape.PointingHandCursor)
-        self.del_link.setStyleSheet(f"""
-            QPushButton {{ color: {TEXT_SECONDARY}; border: none; text-align: right; font-size: 12px; }}
-            QPushButton:hover {{ color: {DANGER_COLOR}; text-decoration: underline; }}
-        """)
+        self.del_link.setObjectName("clearLink")
         self.del_link.clicked.connect(self.clear_completed_tasks)
         right_panel.addWidget(self.del_link, alignment=Qt.AlignmentFlag.AlignRight)
 
         content_layout.addLayout(right_panel, 3)
         self.drag_pos = None
 
+        # 翻页停下后在后台预取前后页的月份，并预先测量行高
+        self.prefetcher = MonthPrefetcher(self.data_manager, self.calendar, self.task_list, self)
+
     # --- 自定义导航栏构建逻辑 ---
     def setup_custom_header(self, parent_layout):
         header_layout = QHBoxLayout()
         header_layout.setContentsMargins(0, 0, 0, 10)
         
-        # --- 1. 样式表 (修复内容变成点的问题) ---
-        combo_style = f"""
-            /* 主体样式 */
-            QComboBox {{
-                border: none;
-                background-color: transparent;
-                color: {TEXT_PRIMARY};
-                font-family: "Microsoft YaHei UI";
-                font-size: 16px;     
-                font-weight: bold;
-                padding: 2px 10px;   
-                border-radius: 6px;
-                /* 稍微给个最小宽度，防止主体也被挤压 */
-                min-width: 60px; 
-            }}
-
-            QComboBox:hover {{ background-color: #EDF2F7; }}
-            QComboBox:on {{ background-color: #E2E8F0; }}
-
-            /* 隐藏下拉按钮 */
-            QComboBox::drop-down {{
-                border: none;
-                background: transparent;
-                width: 0px; 
-            }}
-            QComboBox::down-arrow {{ image: none; border: none; }}
-
-            /* 弹出的下拉列表 */
-            QComboBox QAbstractItemView {{
-                border: 1px solid #E2E8F0;
-                background-color: white;
-                border-radius: 6px;
-                outline: none;
-                padding: 4px;
-                
-                /* ⬇️ 【核心修复】强制给弹出菜单一个最小宽度，防止文字被压缩成点 */
-                min-width: 100px; 
-            }}
-
-            /* 列表项 */
-            QComboBox QAbstractItemView::item {{
-                height: 30px;
-                border-radius: 4px;
-                padding-left: 10px; /* 给文字留足空间 */
-                color: {TEXT_PRIMARY};
-                font-size: 14px;
-            }}
-
-            QComboBox QAbstractItemView::item:hover, 
-            QComboBox QAbstractItemView::item:selected {{
-                background-color: {ACCENT_COLOR}; 
-                color: white;
-            }}
-            
-            QComboBox QAbstractItemView QScrollBar:vertical {{
-                width: 4px;
-                background: transparent;
-            }}
-            QComboBox QAbstractItemView QScrollBar::handle:vertical {{
-                background: #CBD5E0;
-                border-radius: 2px;
-            }}
-        """
-        
-        btn_style = f"""
-            QPushButton {{
-                background-color: transparent; color: {TEXT_PRIMARY}; border: none; font-size: 16px; font-weight: bold;
-            }}
-            QPushButton:hover {{ color: {ACCENT_COLOR}; }}
-        """
+        # --- 1. 样式见 theme.py 中的 QComboBox[role="header"] / QPushButton[role="nav"] ---
 
         # --- 2. 年份下拉框 (修复年份范围) ---
         self.year_combo = QComboBox()
-        self.year_combo.setStyleSheet(combo_style)
+        self.year_combo.setProperty("role", "header")
         self.year_combo.setCursor(Qt.CursorShape.PointingHandCursor)
         
         # 获取当前年份
@@ -240,7 +166,7 @@ class ModernCalendarWindow(QWidget):
 
         # --- 3. 月份下拉框 ---
         self.month_combo = QComboBox()
-        self.month_combo.setStyleSheet(combo_style)
+        self.month_combo.setProperty("role", "header")
         self.month_combo.setCursor(Qt.CursorShape.PointingHandCursor)
         months = ["一月", "二月", "三月", "四月", "五月", "六月", 
                   "七月", "八月", "九月", "十月", "十一月", "十二月"]
@@ -252,13 +178,13 @@ class ModernCalendarWindow(QWidget):
         prev_btn = QPushButton("<")
         prev_btn.setFixedSize(30, 30)
         prev_btn.setCursor(Qt.CursorShape.PointingHandCursor)
-        prev_btn.setStyleSheet(btn_style)
+        prev_btn.setProperty("role", "nav")
         prev_btn.clicked.connect(self.calendar.showPreviousMonth)
 
         next_btn = QPushButton(">")
         next_btn.setFixedSize(30, 30)
         next_btn.setCursor(Qt.CursorShape.PointingHandCursor)
-        next_btn.setStyleSheet(btn_style)
+        next_btn.setProperty("role", "nav")
         next_btn.clicked.connect(self.calendar.showNextMonth)
 
         header_layout.addWidget(prev_btn)
@@ -294,12 +220,13 @@ class ModernCalendarWindow(QWidget):
         self.month_combo.blockSignals(False)
 
     def update_task_list(self):
+        if _perf.enabled:
+            start = time.perf_counter()
         date = self.calendar.selectedDate()
         date_str = date.toString(Qt.DateFormat.ISODate)
         display_str = date.toString("M月d日 dddd")
         
         self.date_title.setText(display_str)
-        self.task_list.clear()
         
         # 显示工作时长
         seconds = self.data_manager.get_work_time(date_str)
@@ -310,43 +237,63 @@ class ModernCalendarWindow(QWidget):
             self.work_time_label.show()
         else:
             self.work_time_label.hide()
+        self.update_work_stats(date_str)
             
-        tasks = self.data_manager.get_tasks(date_str)
-        
-        list_width = self.task_list.viewport().width()
-        text_available_width = list_width - 80 
-        if text_available_width < 100: text_available_width = 200
-
-        font = QFont("Microsoft YaHei UI", 15)
-        fm = QFontMetrics(font)
-
-        for index, t in enumerate(tasks):
-            item = QListWidgetItem(self.task_list)
-            text = t.get('text', '')
-            rect = fm.boundingRect(QRect(0, 0, text_available_width, 1000), 
-                                   Qt.TextFlag.TextWordWrap, text)
-            row_height = max(50, rect.height() + 25) 
-            item.setSizeHint(QSize(list_width - 10, row_height)) 
-            
-            # --- 回调函数修复：不接收 state 参数 ---
-            on_toggle = lambda i=index: self.on_task_toggled(i)
-            on_delete = lambda i=index: self.delete_task(i)
-            
-            widget = TaskItemWidget(t, on_toggle, on_delete)
-            self.task_list.setItemWidget(item, widget)
-            
+        self.task_model.set_date(date_str)
         self.calendar.update() 
-
-    def on_task_toggled(self, index):
+        if _perf.enabled:
+            _perf.record("task_list.update", time.perf_counter() - start, rows=self.task_model.rowCount())
+
+    def run_search(self):
+        query = self.search_line.text().strip()
+        if not query:
+            return
+        hits = self.data_manager.search(query, limit=12)
+
+        menu = QMenu(self)
+        if not hits:
+            menu.addAction("没有找到相关任务").setEnabled(False)
+        for hit in hits:
+            text = hit.text if len(hit.text) <= 28 else hit.text[:27] + "…"
+            mark = "✓ " if hit.completed else ""
+            action = menu.addAction(f"{hit.date_str}   {mark}{text}")
+            action.triggered.connect(lambda checked=False, d=hit.date_str: self.jump_to_date(d))
+        menu.popup(self.search_line.mapToGlobal(self.search_line.rect().bottomLeft()))
+
+    def jump_to_date(self, date_str):
+        date = QDate.fromString(date_str, Qt.DateFormat.ISODate)
+        self.calendar.setCurrentPage(date.year(), date.month())
+        self.calendar.setSelectedDate(date)
+
+    @staticmethod
+    def format_duration(seconds):
+        h, rem = divmod(int(seconds), 3600)
+        m = rem // 60
+        return f"{h}h {m}m" if h else f"{m}m"
+
+    def update_work_stats(self, date_str):
+        stats = self.data_manager.get_work_summary(date_str)
+        if not stats["year"]:
+            self.stats_label.hide()
+            return
+        fmt = self.format_duration
+        self.stats_label.setText(
+            f"本周 {fmt(stats['week'])} · 本月 {fmt(stats['month'])} · 今年 {fmt(stats['year'])}")
+        self.stats_label.setToolTip(
+            f"近 7 天日均 {fmt(stats['avg_7'])}\n近 30 天日均 {fmt(stats['avg_30'])}")
+        self.stats_label.show()
+
+    # 下面的修改由 TaskListModel 监听数据变更、只更新变化的行，这里只需刷新日历上的标记
+    def on_task_toggled(self, task_id):
         date_str = self.calendar.selectedDate().toString(Qt.DateFormat.ISODate)
-        self.data_manager.toggle_task_status(date_str, index)
-        self.update_task_list()
+        self.data_manager.toggle_task_status(date_str, task_id)
+        self.calendar.update()
 
-    def delete_task(self, index):
+    def delete_task(self, task_id):
         date_str = self.calendar.selectedDate().toString(Qt.DateFormat.ISODate)
-        success = self.data_manager.remove_task(date_str, index)
+        success = self.data_manager.remove_task(date_str, task_id)
         if success:
-            self.update_task_list()
+            self.calendar.update()
 
     def add_task(self):
         text = self.input_line.text().strip()
@@ -354,16 +301,12 @@ class ModernCalendarWindow(QWidget):
             date_str = self.calendar.selectedDate().toString(Qt.DateFormat.ISODate)
             self.data_manager.add_task(date_str, text)
             self.input_line.clear()
-            self.update_task_list()
+            self.calendar.update()
 
     def clear_completed_tasks(self):
         date_str = self.calendar.selectedDate().toString(Qt.DateFormat.ISODate)
-        tasks = self.data_manager.get_tasks(date_str)
-        task_list = tasks if isinstance(tasks, list) else []
-        for i in range(len(task_list) - 1, -1, -1):
-            if task_list[i].get('completed'):
-                self.data_manager.remove_task(date_str, i)
-        self.update_task_list()
+        self.data_manager.clear_completed_tasks(date_str)
+        self.calendar.update()
 
     def showEvent(self, event):
         # 每次显示窗口时，重置为今天
@@ -0,0 +1,132 @@
+# app/ui/perf_overlay.py
+# 性能浮层：悬浮球旁边的一小块半透明文字，每 0.5 秒刷新一次 app/perf.py 收集的数据
+# (悬浮球绘制耗时与实际帧率、日历格子绘制、任务列表刷新、写盘、事件循环延迟)。
+# 浮层打开时才开启性能计数，关闭后各热路径回到只判断一次 enabled 的状态。
+import time
+
+from PyQt6.QtCore import Qt, QTimer
+from PyQt6.QtWidgets import QLabel, QVBoxLayout, QWidget
+
+from app.perf import get_perf
+from app.ui.scheduler import get_scheduler
+
+# 事件循环延迟探针的间隔 (毫秒)：实际比预期晚醒多少就是这段时间里事件循环的延迟
+LAG_PROBE_MS = 100
+REFRESH_SECONDS = 0.5
+
+
+class PerfOverlay(QWidget):
+    def __init__(self, anchor):
+        super().__init__()
+        # 跟随的窗口 (悬浮球)
+        self.anchor = anchor
+        self.perf = get_perf()
+        self.setWindowFlags(Qt.WindowType.FramelessWindowHint |
+                            Qt.WindowType.WindowStaysOnTopHint |
+                            Qt.WindowType.Tool |
+                            Qt.WindowType.WindowTransparentForInput)
+        self.setAttribute(Qt.WidgetAttribute.WA_TranslucentBackground)
+        self.setAttribute(Qt.WidgetAttribute.WA_ShowWithoutActivating)
+
+        # 透明的顶层窗口不会画样式表背景，半透明底色和圆角画在里面的 QLabel 上
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+        self.label = QLabel()
+        self.label.setObjectName("perfOverlay")
+        layout.addWidget(self.label)
+
+        self._probe = QTimer(self)
+        self._probe.setTimerType(Qt.TimerType.PreciseTimer)
+        self._probe.setInterval(LAG_PROBE_MS)
+        self._probe.timeout.connect(self._on_probe)
+        self._expected = 0.0
+
+        # 上一次刷新时悬浮球已绘制的帧数，用来算实际帧率
+        # (按实际绘制次数算，呼吸、倒计时、光环等任何模式下的动画都算在内)
+        self._last_frames = 0
+        self._last_refresh = 0.0
+
+    def start(self):
+        self.perf.enabled = True
+        self._expected = time.monotonic() + LAG_PROBE_MS / 1000
+        self._probe.start()
+        self._last_frames = self._ball_frames()
+        self._last_refresh = time.monotonic()
+        get_scheduler().add_interval("perf.overlay", self.refresh, REFRESH_SECONDS)
+        self.refresh()
+        self.show()
+
+    def stop(self):
+        self._probe.stop()
+        get_scheduler().remove("perf.overlay")
+        self.perf.enabled = False
+        self.hide()
+
+    def _ball_frames(self):
+        metric = self.perf.metric("ball.paint")
+        return metric.count if metric else 0
+
+    def _on_probe(self):
+        now = time.monotonic()
+        self.perf.record("event_loop.lag", max(0.0, now - self._expected))
+        self._expected = now + LAG_PROBE_MS / 1000
+
+    def refresh(self):
+        now = time.monotonic()
+        frames = self._ball_frames()
+        elapsed = now - self._last_refresh
+        fps = (frames - self._last_frames) / elapsed if elapsed > 0 else 0.0
+        self._last_frames, self._last_refresh = frames, now
+
+        perf = self.perf
+        lines = []
+        ball = perf.metric("ball.paint")
+        if ball:
+            summary = ball.summary()
+            lines.append(f"ball paint  {summary['p50_ms']:6.2f} ms  p95 {summary['p95_ms']:.2f}  {fps:4.1f} fps")
+        else:
+            lines.append("ball paint       -")
+        calendar = perf.metric("calendar.paint")
+        lines.append(f"calendar    {calendar.last * 1000:6.2f} ms  {calendar.values.get('cells', 0)} cells"
+                     if calendar else "calendar         -")
+        task_list = perf.metric("task_list.update")
+        lines.append(f"task list   {task_list.last * 1000:6.2f} ms  {task_list.values.get('rows', 0)} rows"
+                     if task_list else "task list        -")
+        save = perf.metric("save_data")
+        lines.append(f"save        {save.last * 1000:6.2f} ms  {save.values.get('bytes', 0) / 1024:.1f} KB  x{save.count}"
+                     if save else "save             -")
+        lag = perf.metric("event_loop.lag")
+        if lag:
+            summary = lag.summary()
+            lines.append(f"loop lag    {summary['p50_ms']:6.2f} ms  p95 {summary['p95_ms']:.2f}  max {summary['max_ms']:.1f}")
+        else:
+            lines.append("loop lag         -")
+        lines.extend(self._cache_lines())
+        self.label.setText("\n".join(lines))
+        self.adjustSize()
+        self._follow_anchor()
+
+    def _cache_lines(self):
+        # 日历窗口打开过才有：翻页预取命中率、上一次日历绘制的格子缓存命中、行高测量缓存
+        window = getattr(self.anchor, "parent_window", None)
+        if window is None:
+            return ["prefetch         -"]
+        from app.ui.task_list import text_measure_cache
+        prefetch = window.prefetcher.stats()
+        cells = window.calendar.cell_cache_stats()
+        measure = text_measure_cache.stats()
+        painted = cells["last_paint_hits"] + cells["last_paint_misses"]
+        return [f"prefetch    {prefetch['hit_rate'] * 100:5.1f} %  {prefetch['hits']}/{prefetch['hits'] + prefetch['misses']}"
+                f"  {prefetch['months_loaded']} months  {prefetch['rows_measured']} rows",
+                f"cell cache  {cells['last_paint_hits']}/{painted} hit  size {cells['size']}",
+                f"row height  {measure['hit_rate'] * 100:5.1f} %  size {measure['size']}"]
+
+    def _follow_anchor(self):
+        # 放在悬浮球下方，超出屏幕时放到上方
+        geo = self.anchor.geometry()
+        x = geo.x() + (geo.width() - self.width()) // 2
+        y = geo.y() + geo.height() - 40
+        screen = self.anchor.screen()
+        if screen is not None and y + self.height() > screen.geometry().bottom():
+            y = geo.y() + 40 - self.height()
+        self.move(x, y)
@@ -0,0 +1,105 @@
+# app/ui/prefetch.py
+# 日历翻页预取：停在某一页之后，趁空闲在后台把前后一页用到的月份读进缓存
+# (占用位图、每日计数随月份一起建立)，顺便建好工作时长索引，
+# 再回到 GUI 线程预先测量这些日期的任务行高。之后翻页直接命中缓存。
+#
+# 日历一页会显示前后两个月的零头，所以第 m 月这一页用到 m-1、m、m+1 三个月；
+# 要让翻到 m-1 或 m+1 页也不用读盘，需要 m-2 ~ m+2 共 5 个月 (MONTH_CACHE_SIZE 为 6)。
+from PyQt6.QtCore import QObject, QTimer, pyqtSignal
+
+from app.config import PREFETCH_IDLE_MS
+
+
+def shift_month(year, month, delta):
+    index = year * 12 + (month - 1) + delta
+    return index // 12, index % 12 + 1
+
+
+class MonthPrefetcher(QObject):
+    # 后台线程读完月份 [(year, month), ...] 后发出 (跨线程，自动排队到 GUI 线程)
+    loaded = pyqtSignal(object)
+
+    def __init__(self, data_manager, calendar, task_list=None, parent=None):
+        super().__init__(parent)
+        self.data_manager = data_manager
+        self.calendar = calendar
+        self.task_list = task_list
+
+        # 翻页时每次重新计时，连续翻页只在停下来之后预取一次
+        self._idle = QTimer(self)
+        self._idle.setSingleShot(True)
+        self._idle.setInterval(PREFETCH_IDLE_MS)
+        self._idle.timeout.connect(self.prefetch)
+        self.loaded.connect(self.on_months_loaded)
+
+        # 统计：翻页时这一页用到的月份是否都已在缓存中
+        self.hits = 0
+        self.misses = 0
+        # 后台读入的月份数、预先测量的任务数
+        self.months_loaded = 0
+        self.rows_measured = 0
+        # 已经按当前列表宽度测量过的月份，同一个月不重复测量
+        self._measured = set()
+        self._measured_width = None
+
+        calendar.currentPageChanged.connect(self.on_page_changed)
+        self._idle.start()
+
+    def page_months(self, year, month):
+        return [shift_month(year, month, delta) for delta in (-1, 0, 1)]
+
+    def on_page_changed(self, year, month):
+        months = self.page_months(year, month)
+        if all(self.data_manager.is_month_cached(y, m) for y, m in months):
+            self.hits += 1
+        else:
+            self.misses += 1
+            # 没赶上预取 (例如直接从下拉框跳到很远的年份)：当前页同步读取
+            for y, m in months:
+                self.data_manager.load_month(y, m)
+        self._idle.start()
+
+    def prefetch(self):
+        year, month = self.calendar.yearShown(), self.calendar.monthShown()
+        months = [shift_month(year, month, delta) for delta in (-2, -1, 1, 2)]
+        missing = [(y, m) for y, m in months if not self.data_manager.is_month_cached(y, m)]
+        if not missing:
+            return
+
+        def done():
+            # 后台线程：月份已读入，顺便建好工作时长索引 (第一次统计时要扫描全部历史)
+            self.data_manager.build_work_index()
+            self.loaded.emit(missing)
+
+        self.months_loaded += len(missing)
+        self.data_manager.preload([f"{y:04d}-{m:02d}" for y, m in missing], callback=done)
+
+    def on_months_loaded(self, months):
+        # GUI 线程：当前这一页用到的月份刚读进来时重画日历，再预先测量行高
+        current = self.page_months(self.calendar.yearShown(), self.calendar.monthShown())
+        if any(month in current for month in months):
+            self.calendar.update()
+        self._warm_measurements(months)
+
+    def _warm_measurements(self, months):
+        # GUI 线程：按当前列表宽度把这些日期的任务行高算进共享的测量缓存；
+        # 列表宽度变了之后之前的测量不再有用，重新记录
+        if self.task_list is None:
+            return
+        width = self.task_list.viewport().width()
+        if width != self._measured_width:
+            self._measured.clear()
+            self._measured_width = width
+        months = [month for month in months if month not in self._measured]
+        self._measured.update(months)
+        texts = []
+        for year, month in months:
+            for tasks in self.data_manager.get_month_tasks(year, month).values():
+                texts.extend(task.text for task in tasks)
+        self.rows_measured += self.task_list.warm_measurements(texts)
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {"hits": self.hits, "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+                "months_loaded": self.months_loaded, "rows_measured": self.rows_measured}
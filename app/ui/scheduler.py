@@ -0,0 +1,243 @@
+# app/ui/scheduler.py
+# 统一的帧调度器：所有动画、周期任务和定时唤醒都挂在同一个单次 QTimer 上，
+# 每次只在最近的一个到期时间醒来，而不是每个控件各开一个定时器轮询
+import ctypes
+import datetime
+import sys
+import time
+
+from PyQt6.QtCore import QObject, QTimer, Qt
+
+from app.config import ANIMATION_FPS, IDLE_ANIMATION_FPS, IDLE_AFTER_SECONDS, FRAME_BUDGET_MS
+from app.perf import get_perf
+
+_perf = get_perf()
+
+# 挂钟时间的定时唤醒最多睡这么久就重新计算一次 (系统休眠、手动改时间后能自动校正)
+_MAX_DEADLINE_SLEEP = 3600.0
+# 细节等级上限 (对应 halo.DETAIL_STRIDES 的长度 - 1)
+_MAX_DETAIL = 2
+# 帧时间远低于预算多少帧之后再把细节调回来
+_RECOVER_FRAMES = 120
+# 至少累计这么多帧才判断是否超预算 (第一帧要烘焙图层，总是偏慢)
+_MIN_SAMPLES = 10
+
+
+# 空闲时长每帧都要判断，系统调用结果缓存这么久 (秒)
+_IDLE_SAMPLE_SECONDS = 1.0
+
+
+class LASTINPUTINFO(ctypes.Structure):
+    _fields_ = [("cbSize", ctypes.c_uint), ("dwTime", ctypes.c_uint)]
+
+
+# 上一次采样的 (monotonic 时间, 空闲秒数)
+_idle_sample = [-_IDLE_SAMPLE_SECONDS, 0.0]
+
+
+def system_idle_seconds():
+    # 整个会话多久没有键鼠输入；取不到时返回 0 (当作不空闲)
+    if sys.platform != "win32":
+        return 0.0
+    now = time.monotonic()
+    if now - _idle_sample[0] < _IDLE_SAMPLE_SECONDS:
+        return _idle_sample[1]
+
+    info = LASTINPUTINFO()
+    info.cbSize = ctypes.sizeof(info)
+    if ctypes.windll.user32.GetLastInputInfo(ctypes.byref(info)):
+        elapsed = (ctypes.windll.kernel32.GetTickCount() - info.dwTime) & 0xFFFFFFFF
+        idle = elapsed / 1000.0
+    else:
+        idle = 0.0
+    _idle_sample[0], _idle_sample[1] = now, idle
+    return idle
+
+
+def seconds_until_midnight():
+    now = datetime.datetime.now()
+    midnight = datetime.datetime.combine(now.date() + datetime.timedelta(days=1), datetime.time())
+    return (midnight - now).total_seconds()
+
+
+class _Job:
+    __slots__ = ("name", "callback", "interval", "due", "widget", "wall_deadline", "repeat_daily",
+                 "frame_ema", "samples", "detail", "calm_frames")
+
+    def __init__(self, name, callback, interval=None, widget=None):
+        self.name = name
+        self.callback = callback
+        self.interval = interval
+        self.due = time.monotonic() + (interval or 0.0)
+        # 动画绑定的控件：控件不可见时降帧
+        self.widget = widget
+        # 挂钟截止时间 (时间戳)，用于"下一个午夜"这类唤醒
+        self.wall_deadline = None
+        self.repeat_daily = False
+        # 帧时间的指数滑动平均 (秒) 与当前细节等级
+        self.frame_ema = 0.0
+        self.samples = 0
+        self.detail = 0
+        self.calm_frames = 0
+
+
+class FrameScheduler(QObject):
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._jobs = {}
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setTimerType(Qt.TimerType.PreciseTimer)
+        self._timer.timeout.connect(self._tick)
+
+        self.budget = FRAME_BUDGET_MS / 1000.0
+        self.idle_interval = 1.0 / IDLE_ANIMATION_FPS
+        # 统计：唤醒次数、执行回调次数
+        self.wakeups = 0
+        self.runs = 0
+
+    # --- 注册 ---
+    def add_animation(self, name, callback, fps=ANIMATION_FPS, widget=None):
+        # 按目标帧率重复执行；widget 被遮挡/最小化/隐藏或系统空闲时降到 IDLE_ANIMATION_FPS
+        job = self._jobs.get(name)
+        detail = job.detail if job is not None else 0
+        job = self._jobs[name] = _Job(name, callback, 1.0 / fps, widget)
+        job.detail = detail
+        self._reschedule()
+
+    def add_interval(self, name, callback, seconds):
+        # 固定周期、不降频的任务 (例如倒计时)
+        self._jobs[name] = _Job(name, callback, seconds)
+        self._reschedule()
+
+    def call_after(self, name, seconds, callback):
+        # 按单调时钟在 seconds 秒后执行一次 (例如专注结束的那一刻)
+        job = self._jobs[name] = _Job(name, callback)
+        job.due = time.monotonic() + max(0.0, seconds)
+        self._reschedule()
+
+    def call_at(self, name, timestamp, callback):
+        # 在挂钟时间 timestamp 执行一次
+        job = self._jobs[name] = _Job(name, callback)
+        job.wall_deadline = timestamp
+        job.due = time.monotonic() + min(max(0.0, timestamp - time.time()), _MAX_DEADLINE_SLEEP)
+        self._reschedule()
+
+    def call_at_midnight(self, name, callback):
+        # 每天 0 点执行一次
+        self.call_at(name, time.time() + seconds_until_midnight(), callback)
+        self._jobs[name].repeat_daily = True
+
+    def remove(self, name):
+        if self._jobs.pop(name, None) is not None:
+            self._reschedule()
+
+    def is_active(self, name):
+        return name in self._jobs
+
+    # --- 帧预算 ---
+    def report_frame(self, name, seconds):
+        # 由绘制方在 paintEvent 结束时报告耗时；持续超预算时降低细节，长期富余再调回来
+        job = self._jobs.get(name)
+        if job is None:
+            return
+        job.frame_ema = seconds if not job.samples else job.frame_ema * 0.9 + seconds * 0.1
+        job.samples += 1
+        if job.samples < _MIN_SAMPLES:
+            return
+        if job.frame_ema > self.budget and job.detail < _MAX_DETAIL:
+            job.detail += 1
+            job.samples = 0
+            job.calm_frames = 0
+        elif job.frame_ema < self.budget * 0.4 and job.detail > 0:
+            job.calm_frames += 1
+            if job.calm_frames >= _RECOVER_FRAMES:
+                job.detail -= 1
+                job.samples = 0
+                job.calm_frames = 0
+        else:
+            job.calm_frames = 0
+
+    def detail(self, name):
+        job = self._jobs.get(name)
+        return job.detail if job is not None else 0
+
+    def stats(self):
+        return {"wakeups": self.wakeups, "runs": self.runs,
+                "jobs": {name: {"interval": self._interval(job), "detail": job.detail,
+                                "frame_ms": job.frame_ema * 1000}
+                         for name, job in self._jobs.items()}}
+
+    def widget_hidden(self, widget):
+        # 控件被隐藏、所在窗口最小化或完全被遮挡
+        window = widget.window()
+        if not widget.isVisible() or window.isMinimized():
+            return True
+        handle = window.windowHandle()
+        return handle is not None and not handle.isExposed()
+
+    # --- 内部 ---
+    def _throttled(self, job):
+        widget = job.widget
+        if widget is None:
+            return False
+        return self.widget_hidden(widget) or system_idle_seconds() >= IDLE_AFTER_SECONDS
+
+    def _interval(self, job):
+        if job.interval is None:
+            return None
+        if job.widget is not None and self._throttled(job):
+            return max(job.interval, self.idle_interval)
+        return job.interval
+
+    def _tick(self):
+        self.wakeups += 1
+        now = time.monotonic()
+        for job in list(self._jobs.values()):
+            if job.due > now or self._jobs.get(job.name) is not job:
+                continue
+            if job.wall_deadline is not None:
+                remaining = job.wall_deadline - time.time()
+                if remaining > 0.001:
+                    # 还没到 (被 _MAX_DEADLINE_SLEEP 截断或时钟变化)，继续睡
+                    job.due = now + min(remaining, _MAX_DEADLINE_SLEEP)
+                    continue
+                if job.repeat_daily:
+                    job.wall_deadline = time.time() + seconds_until_midnight()
+                    job.due = now + min(job.wall_deadline - time.time(), _MAX_DEADLINE_SLEEP)
+                else:
+                    del self._jobs[job.name]
+            elif job.interval is None:
+                # call_after 的单次任务
+                del self._jobs[job.name]
+            else:
+                # 按节拍推进；落后太多 (例如系统休眠后) 就从现在重新开始，不补帧
+                interval = self._interval(job)
+                job.due += interval
+                if job.due <= now:
+                    job.due = now + interval
+            self.runs += 1
+            if _perf.enabled:
+                # 性能浮层据此算出各动画实际达到的帧率
+                _perf.count(f"frames.{job.name}")
+            job.callback()
+        self._reschedule()
+
+    def _reschedule(self):
+        if not self._jobs:
+            self._timer.stop()
+            return
+        due = min(job.due for job in self._jobs.values())
+        delay = max(0, int(round((due - time.monotonic()) * 1000)))
+        self._timer.start(delay)
+
+
+_scheduler = None
+
+
+def get_scheduler():
+    # 整个程序共用一个调度器 (第一次使用时创建，此时 QApplication 已经存在)
+    global _scheduler
+    if _scheduler is None:
+        _scheduler = FrameScheduler()
+    return _scheduler
@@ -0,0 +1,402 @@
+# app/ui/task_list.py
+# 任务列表：QListView + 模型 + 自绘委托
+# 每一行不再是一整棵 QWidget 树，只有滚动到可见区域的行才会被绘制
+from collections import OrderedDict
+
+from PyQt6.QtWidgets import QListView, QStyledItemDelegate, QStyle, QAbstractItemView
+from PyQt6.QtCore import (Qt, QAbstractListModel, QModelIndex, QRect, QSize, QEvent,
+                          QVariantAnimation, QEasingCurve, pyqtSignal)
+from PyQt6.QtGui import QColor, QPainter, QPen, QFont, QFontMetrics, QPainterPath
+from app.config import *
+from app.ui.components import paint_check_circle
+from app.ui.theme import get_theme
+
+TASK_ROLE = Qt.ItemDataRole.UserRole + 1
+
+# --- 行布局参数 (与原来 TaskItemWidget 的布局一致) ---
+ROW_SPACING = 8        # 行与行之间的间距
+MIN_ROW_HEIGHT = 50
+PAD_X = 10
+PAD_Y = 5
+CHECK_SIZE = 22
+CONTENT_SPACING = 12
+DELETE_WIDTH = 90      # 删除按钮完全滑出时的宽度
+RADIUS = 8
+
+
+class TextMeasureCache:
+    """自动换行文字高度的 LRU 缓存，键为 (文本, 可用宽度, 字体)，所有日期共用"""
+
+    def __init__(self, capacity=TEXT_MEASURE_CACHE_SIZE):
+        self.capacity = capacity
+        self._heights = OrderedDict()
+        self._metrics = {}
+        self.hits = 0
+        self.misses = 0
+
+    def height(self, font, text, width, font_key=None):
+        if font_key is None:
+            font_key = font.key()
+        key = (text, width, font_key)
+        height = self._heights.get(key)
+        if height is not None:
+            self.hits += 1
+            self._heights.move_to_end(key)
+            return height
+        self.misses += 1
+        fm = self._metrics.get(font_key)
+        if fm is None:
+            fm = self._metrics[font_key] = QFontMetrics(font)
+        height = fm.boundingRect(QRect(0, 0, width, 100000), Qt.TextFlag.TextWordWrap, text).height()
+        self._heights[key] = height
+        if len(self._heights) > self.capacity:
+            self._heights.popitem(last=False)
+        return height
+
+    def clear(self):
+        # 视口宽度、字体或主题变化时调用
+        self._heights.clear()
+        self._metrics.clear()
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {"size": len(self._heights), "hits": self.hits, "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0}
+
+
+# 所有任务列表共用一份测量缓存
+text_measure_cache = TextMeasureCache()
+
+
+class TaskListModel(QAbstractListModel):
+    # 一行被移动：task_id, 移动前的行号 (视图据此做移动动画)
+    rowMoving = pyqtSignal(int, int)
+
+    def __init__(self, data_manager, parent=None):
+        super().__init__(parent)
+        self.data_manager = data_manager
+        self.date_str = None
+        self.tasks = []
+        # 增删改只应用变化的行，不再整表重置
+        data_manager.add_listener(self.on_tasks_changed)
+
+    def set_date(self, date_str):
+        self.beginResetModel()
+        self.date_str = date_str
+        # 拷贝一份行列表，模型的行只在发出信号时才变化
+        self.tasks = list(self.data_manager.get_tasks(date_str))
+        self.endResetModel()
+
+    def refresh(self):
+        self.set_date(self.date_str)
+
+    def on_tasks_changed(self, date_str, changes):
+        if date_str != self.date_str:
+            return
+        root = QModelIndex()
+        # 管理器当前持有的 Task 对象：月份被缓存淘汰后重新读入时是新的对象，
+        # 模型里拷贝的旧对象不会再被修改
+        current = {t.id: t for t in self.data_manager.get_tasks(date_str)}
+        for change in changes:
+            row = change.row
+            if change.kind == "removed":
+                self.beginRemoveRows(root, row, row)
+                del self.tasks[row]
+                self.endRemoveRows()
+            elif change.kind == "inserted":
+                self.beginInsertRows(root, row, row)
+                self.tasks.insert(row, current[change.task_id])
+                self.endInsertRows()
+            elif change.kind == "moved":
+                self.rowMoving.emit(change.task_id, row)
+                # Qt 的目标行号是移动前的坐标，向下移动时要 +1
+                dest = change.dest + 1 if change.dest > row else change.dest
+                self.beginMoveRows(root, row, row, root, dest)
+                self.tasks.insert(change.dest, self.tasks.pop(row))
+                self.endMoveRows()
+            elif change.kind == "updated":
+                self.tasks[row] = current[change.task_id]
+                index = self.index(row)
+                self.dataChanged.emit(index, index)
+        # 其余行的内容没变，只把旧对象换成当前对象，之后的修改才能反映到模型上
+        for row, task in enumerate(self.tasks):
+            fresh = current.get(task.id)
+            if fresh is not None and fresh is not task:
+                self.tasks[row] = fresh
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.tasks)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid() or index.row() >= len(self.tasks):
+            return None
+        task = self.tasks[index.row()]
+        if role == TASK_ROLE:
+            return task
+        if role == Qt.ItemDataRole.DisplayRole:
+            return task.text
+        return None
+
+
+class TaskItemDelegate(QStyledItemDelegate):
+    def __init__(self, view):
+        super().__init__(view)
+        self.view = view
+
+        self.font_pending = QFont("Microsoft YaHei UI")
+        self.font_pending.setPixelSize(15)
+        self.font_pending.setWeight(QFont.Weight.Medium)
+        self.font_done = QFont("Microsoft YaHei UI")
+        self.font_done.setPixelSize(15)
+        self.font_done.setStrikeOut(True)
+        self.font_delete = QFont("Microsoft YaHei UI")
+        self.font_delete.setPixelSize(14)
+        self.font_delete.setBold(True)
+        # QFont.key() 本身也不便宜，测量时直接用缓存好的
+        self.measure_key = self.font_pending.key()
+
+    # --- 几何 (绘制与点击判断共用) ---
+    @staticmethod
+    def card_rect(option_rect):
+        return option_rect.adjusted(0, 0, -1, -ROW_SPACING)
+
+    @staticmethod
+    def check_rect(card):
+        return QRect(card.left() + PAD_X, card.center().y() - CHECK_SIZE // 2, CHECK_SIZE, CHECK_SIZE)
+
+    @staticmethod
+    def delete_rect(card, progress):
+        width = int(DELETE_WIDTH * progress)
+        return QRect(card.right() - width + 1, card.top(), width, card.height())
+
+    @staticmethod
+    def text_width(row_width):
+        return row_width - 2 * PAD_X - CHECK_SIZE - CONTENT_SPACING
+
+    def text_height(self, text, width):
+        return text_measure_cache.height(self.font_pending, text, width, self.measure_key)
+
+    def sizeHint(self, option, index):
+        # 布局时每一行都会调用，直接取模型里的任务对象，跳过 data() 的角色分发
+        task = index.model().tasks[index.row()]
+        row_width = self.view.viewport().width()
+        width = max(100, self.text_width(row_width))
+        height = max(MIN_ROW_HEIGHT, self.text_height(task.text, width) + 25)
+        return QSize(row_width, height + ROW_SPACING)
+
+    def paint(self, painter, option, index):
+        task = index.data(TASK_ROLE)
+        if task is None:
+            return
+        # 刚被移动的行从原来的位置滑到新位置
+        card = self.card_rect(option.rect).translated(0, self.view.move_offset(task.id, option.rect.y()))
+        hover = bool(option.state & QStyle.StateFlag.State_MouseOver)
+        progress = self.view.delete_progress(task.id)
+
+        painter.save()
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+
+        # 卡片背景，悬停时描边
+        theme = get_theme()
+        painter.setPen(QPen(theme.color("accent"), 1) if hover else Qt.PenStyle.NoPen)
+        painter.setBrush(theme.color("card_bg"))
+        painter.drawRoundedRect(card, RADIUS, RADIUS)
+
+        # 复选框
+        paint_check_circle(painter, self.check_rect(card), task.completed, hover)
+
+        # 文字 (自动换行)
+        text_rect = QRect(card.left() + PAD_X + CHECK_SIZE + CONTENT_SPACING, card.top() + PAD_Y,
+                          self.text_width(card.width()), card.height() - 2 * PAD_Y)
+        painter.setFont(self.font_done if task.completed else self.font_pending)
+        painter.setPen(theme.color("text_secondary" if task.completed else "text_primary"))
+        painter.drawText(text_rect, Qt.AlignmentFlag.AlignVCenter | Qt.TextFlag.TextWordWrap, task.text)
+
+        # 右侧滑出的删除按钮 (只有右边两个角是圆角)
+        if progress > 0:
+            del_rect = self.delete_rect(card, progress)
+            path = QPainterPath()
+            path.addRoundedRect(del_rect.toRectF(), RADIUS, RADIUS)
+            path.addRect(del_rect.adjusted(0, 0, -RADIUS, 0).toRectF())
+            path = path.simplified()
+            painter.setPen(Qt.PenStyle.NoPen)
+            painter.setBrush(theme.color("delete_hover" if self.view.delete_hovered(task.id) else "delete"))
+            painter.drawPath(path)
+            painter.setClipRect(del_rect)
+            painter.setFont(self.font_delete)
+            painter.setPen(QColor("white"))
+            painter.drawText(QRect(card.right() - DELETE_WIDTH + 1, card.top(), DELETE_WIDTH, card.height()),
+                             Qt.AlignmentFlag.AlignCenter, "🗑 删除")
+
+        painter.restore()
+
+
+class TaskListView(QListView):
+    toggled = pyqtSignal(int)
+    delete_requested = pyqtSignal(int)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.delegate = TaskItemDelegate(self)
+        self.setItemDelegate(self.delegate)
+
+        self.setMouseTracking(True)
+        self.setSelectionMode(QAbstractItemView.SelectionMode.NoSelection)
+        self.setVerticalScrollMode(QAbstractItemView.ScrollMode.ScrollPerPixel)
+        self.setHorizontalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOff)
+        self.setResizeMode(QListView.ResizeMode.Adjust)
+        self.setObjectName("taskList")
+        # 主题切换只需要重绘 (颜色在绘制时从主题取)
+        get_theme().changed.connect(self.viewport().update)
+
+        # 删除按钮滑出进度 task_id -> 0.0 ~ 1.0，以及对应的动画
+        self._progress = {}
+        self._anims = {}
+        self._hover_id = None
+        self._delete_hover_id = None
+        # 移动动画 task_id -> [移动前的 y, 进度 0.0 ~ 1.0]
+        self._moves = {}
+
+    def setModel(self, model):
+        super().setModel(model)
+        model.rowMoving.connect(self._on_row_moving)
+
+    def move_offset(self, task_id, y):
+        move = self._moves.get(task_id)
+        if move is None:
+            return 0
+        return int((move[0] - y) * (1.0 - move[1]))
+
+    def _on_row_moving(self, task_id, row):
+        old_y = self.visualRect(self.model().index(row)).y()
+        move = self._moves.get(task_id)
+        if move is not None:
+            # 上一次移动还没播完，从当前画出来的位置继续
+            old_y += self.move_offset(task_id, old_y)
+        self._moves[task_id] = [old_y, 0.0]
+
+        anim = QVariantAnimation(self)
+        anim.setStartValue(0.0)
+        anim.setEndValue(1.0)
+        anim.setDuration(250)
+        anim.setEasingCurve(QEasingCurve.Type.OutCubic)
+
+        def on_value(value, task_id=task_id, move=self._moves[task_id]):
+            move[1] = value
+            self.viewport().update()
+
+        def on_finished(task_id=task_id, move=self._moves[task_id]):
+            if self._moves.get(task_id) is move:
+                del self._moves[task_id]
+            self.viewport().update()
+
+        anim.valueChanged.connect(on_value)
+        anim.finished.connect(on_finished)
+        anim.start(QVariantAnimation.DeletionPolicy.DeleteWhenStopped)
+
+    def delete_progress(self, task_id):
+        return self._progress.get(task_id, 0.0)
+
+    def delete_hovered(self, task_id):
+        return self._delete_hover_id == task_id
+
+    def _task_at(self, pos):
+        index = self.indexAt(pos)
+        if not index.isValid():
+            return None, None
+        return index.data(TASK_ROLE), self.delegate.card_rect(self.visualRect(index))
+
+    def _animate(self, task_id, target):
+        anim = self._anims.pop(task_id, None)
+        if anim is not None:
+            anim.stop()
+        anim = QVariantAnimation(self)
+        anim.setStartValue(float(self._progress.get(task_id, 0.0)))
+        anim.setEndValue(float(target))
+        # 飞入 400ms OutCubic，飞出 300ms InCubic
+        if target > 0:
+            anim.setDuration(400)
+            anim.setEasingCurve(QEasingCurve.Type.OutCubic)
+        else:
+            anim.setDuration(300)
+            anim.setEasingCurve(QEasingCurve.Type.InCubic)
+
+        def on_value(value, task_id=task_id):
+            self._progress[task_id] = value
+            self.viewport().update()
+
+        def on_finished(task_id=task_id, anim=anim):
+            if self._anims.get(task_id) is anim:
+                del self._anims[task_id]
+            if not self._progress.get(task_id):
+                self._progress.pop(task_id, None)
+
+        anim.valueChanged.connect(on_value)
+        anim.finished.connect(on_finished)
+        self._anims[task_id] = anim
+        anim.start()
+
+    def _set_hover(self, task_id):
+        if task_id == self._hover_id:
+            return
+        if self._hover_id is not None:
+            self._animate(self._hover_id, 0.0)
+        self._hover_id = task_id
+        if task_id is not None:
+            self._animate(task_id, 1.0)
+
+    def mouseMoveEvent(self, event):
+        pos = event.position().toPoint()
+        task, card = self._task_at(pos)
+        self._set_hover(task.id if task else None)
+
+        delete_hover = None
+        clickable = False
+        if task is not None:
+            if self.delegate.check_rect(card).contains(pos):
+                clickable = True
+            elif self.delegate.delete_rect(card, self.delete_progress(task.id)).contains(pos):
+                clickable = True
+                delete_hover = task.id
+        if delete_hover != self._delete_hover_id:
+            self._delete_hover_id = delete_hover
+            self.viewport().update()
+        self.viewport().setCursor(Qt.CursorShape.PointingHandCursor if clickable else Qt.CursorShape.ArrowCursor)
+        super().mouseMoveEvent(event)
+
+    def warm_measurements(self, texts):
+        # 预先测量其它日期的行高 (翻页预取时调用)，返回测量的条数
+        width = max(100, self.delegate.text_width(self.viewport().width()))
+        for text in texts:
+            self.delegate.text_height(text, width)
+        return len(texts)
+
+    def invalidate_measurements(self):
+        # 字体或主题变化后重新测量所有行高
+        self.delegate.measure_key = self.delegate.font_pending.key()
+        text_measure_cache.clear()
+        self.scheduleDelayedItemsLayout()
+
+    def changeEvent(self, event):
+        if event.type() in (QEvent.Type.FontChange, QEvent.Type.StyleChange):
+            self.invalidate_measurements()
+        super().changeEvent(event)
+
+    def leaveEvent(self, event):
+        self._set_hover(None)
+        self._delete_hover_id = None
+        super().leaveEvent(event)
+
+    def mouseReleaseEvent(self, event):
+        if event.button() == Qt.MouseButton.LeftButton:
+            pos = event.position().toPoint()
+            task, card = self._task_at(pos)
+            if task is not None:
+                if self.delegate.check_rect(card).adjusted(-4, -4, 4, 4).contains(pos):
+                    self.toggled.emit(task.id)
+                    return
+                progress = self.delete_progress(task.id)
+                if progress > 0.3 and self.delegate.delete_rect(card, progress).contains(pos):
+                    self.delete_requested.emit(task.id)
+                    return
+        super().mouseReleaseEvent(event)
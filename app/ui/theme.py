@@ -0,0 +1,202 @@
+# app/ui/theme.py
+# 主题引擎：整个程序只有一份应用级样式表，由 config.THEMES 里的颜色生成。
+# 控件只设置 objectName 或 "role" 动态属性，不再各自 setStyleSheet；
+# 切换主题时重新生成这一份样式表，不重建任何控件。
+# 自绘部分 (任务列表、日历格子、悬浮球) 通过 color() 取色，并监听 changed 信号清掉各自的缓存。
+from PyQt6.QtCore import QObject, pyqtSignal
+from PyQt6.QtGui import QColor
+from PyQt6.QtWidgets import QApplication
+
+from app.config import THEMES, THEME
+
+_STYLESHEET = """
+/* ---------- 日历主窗口 ---------- */
+QFrame#calendarContainer {{ background-color: {bg}; border-radius: 16px; }}
+QLabel#dateTitle {{ font-size: 18px; font-weight: bold; color: {text_primary}; }}
+QPushButton#closeButton {{ color: {text_secondary}; border: none; font-size: 20px; font-weight: bold; background: transparent; }}
+QPushButton#closeButton:hover {{ color: {delete}; }}
+
+QLineEdit#searchLine {{
+    background-color: {card_bg}; border: 1px solid transparent; border-radius: 14px;
+    padding: 4px 12px; font-size: 13px; color: {text_primary};
+}}
+QLineEdit#searchLine:focus {{ border: 1px solid {accent}; }}
+
+QLabel#workTimeLabel {{ color: {work_text}; font-size: 13px; font-weight: bold; margin-bottom: 5px; }}
+QLabel#statsLabel {{ color: {text_secondary}; font-size: 12px; margin-bottom: 5px; }}
+
+QListView#taskList {{ border: none; background: transparent; outline: none; }}
+
+QFrame#inputBox {{ background-color: {card_bg}; border-radius: 20px; }}
+QLineEdit#inputLine {{ border: none; background: transparent; font-size: 14px; color: {text_primary}; }}
+QPushButton#addButton {{
+    background-color: {accent}; color: white; border-radius: 16px; font-size: 18px; font-weight: bold; border: none;
+}}
+QPushButton#addButton:hover {{ background-color: {accent_hover}; }}
+QPushButton#clearLink {{ color: {text_secondary}; border: none; text-align: right; font-size: 12px; background: transparent; }}
+QPushButton#clearLink:hover {{ color: {danger}; text-decoration: underline; }}
+
+/* ---------- 日历头部：年份/月份下拉框与翻页按钮 ---------- */
+QComboBox[role="header"] {{
+    border: none;
+    background-color: transparent;
+    color: {text_primary};
+    font-family: "Microsoft YaHei UI";
+    font-size: 16px;
+    font-weight: bold;
+    padding: 2px 10px;
+    border-radius: 6px;
+    /* 稍微给个最小宽度，防止主体也被挤压 */
+    min-width: 60px;
+}}
+QComboBox[role="header"]:hover {{ background-color: {hover_bg}; }}
+QComboBox[role="header"]:on {{ background-color: {border}; }}
+/* 隐藏下拉按钮 */
+QComboBox[role="header"]::drop-down {{ border: none; background: transparent; width: 0px; }}
+QComboBox[role="header"]::down-arrow {{ image: none; border: none; }}
+/* 弹出的下拉列表：强制给一个最小宽度，防止文字被压缩成点 */
+QComboBox[role="header"] QAbstractItemView {{
+    border: 1px solid {border};
+    background-color: {menu_bg};
+    border-radius: 6px;
+    outline: none;
+    padding: 4px;
+    min-width: 100px;
+}}
+QComboBox[role="header"] QAbstractItemView::item {{
+    height: 30px;
+    border-radius: 4px;
+    padding-left: 10px;
+    color: {text_primary};
+    font-size: 14px;
+}}
+QComboBox[role="header"] QAbstractItemView::item:hover,
+QComboBox[role="header"] QAbstractItemView::item:selected {{
+    background-color: {accent};
+    color: white;
+}}
+QComboBox[role="header"] QAbstractItemView QScrollBar:vertical {{ width: 4px; background: transparent; }}
+QComboBox[role="header"] QAbstractItemView QScrollBar::handle:vertical {{ background: {muted}; border-radius: 2px; }}
+
+QPushButton[role="nav"] {{
+    background-color: transparent; color: {text_primary}; border: none; font-size: 16px; font-weight: bold;
+}}
+QPushButton[role="nav"]:hover {{ color: {accent}; }}
+
+/* ---------- 日历控件 ---------- */
+QCalendarWidget QWidget {{ alternate-background-color: {bg}; background-color: {bg}; }}
+QCalendarWidget QToolButton::menu-indicator {{ image: none; }}
+QCalendarWidget QToolButton {{
+    color: {text_primary}; font-weight: bold; icon-size: 20px; border: none;
+    background-color: transparent; padding: 5px;
+}}
+QCalendarWidget QToolButton:hover {{ background-color: {card_bg}; border-radius: 5px; }}
+QCalendarWidget QMenu {{ color: white; background-color: {text_primary}; }}
+QCalendarWidget QSpinBox {{
+    color: {text_primary}; background: transparent; selection-background-color: {accent};
+}}
+QCalendarWidget QTableView QHeaderView::section {{
+    background-color: {bg}; color: {text_secondary}; border: none; font-weight: bold; padding-bottom: 5px;
+}}
+QCalendarWidget QAbstractItemView {{
+    font-size: 14px; color: {text_primary};
+    selection-background-color: transparent;
+    selection-color: white; outline: none; border: none;
+}}
+
+/* ---------- 菜单 (搜索结果、悬浮球右键菜单) ---------- */
+QMenu {{ background-color: {menu_bg}; border: 1px solid {border}; border-radius: 6px; padding: 4px; }}
+QMenu::item {{ padding: 6px 16px; margin: 2px; border-radius: 4px; color: {text_primary}; font-size: 13px; }}
+QMenu::item:selected {{ background-color: {accent}; color: white; }}
+QMenu::item:disabled {{ color: {text_secondary}; }}
+QMenu::separator {{ height: 1px; background: {border}; margin: 4px 10px; }}
+QMenu[role="context"]::item {{ padding: 6px 25px; color: {menu_text}; font-family: "Microsoft YaHei UI"; }}
+QMenu[role="context"]::item:selected {{ color: white; }}
+
+/* ---------- 自定义专注时长对话框 ---------- */
+QFrame#dialogContainer {{ background-color: {bg}; border-radius: 16px; border: 1px solid {border}; }}
+QLabel#dialogTitle {{ font-size: 16px; font-weight: bold; color: {text_primary}; border: none; }}
+QLabel#dialogUnit {{ color: {text_secondary}; font-size: 16px; font-weight: bold; border: none; }}
+QSpinBox#durationSpin {{
+    background-color: {card_bg};
+    border-radius: 12px;
+    height: 50px;
+    font-size: 32px;
+    font-family: Arial;
+    font-weight: bold;
+    color: {accent};
+    selection-background-color: {accent};
+}}
+QSpinBox#durationSpin:focus {{ background-color: {bg}; border: 2px solid {accent}; }}
+QPushButton[role="secondary"] {{
+    background-color: transparent;
+    color: {text_secondary};
+    border: 1px solid {border};
+    border-radius: 10px;
+    padding: 8px;
+    font-weight: bold;
+}}
+QPushButton[role="secondary"]:hover {{ background-color: {card_bg}; color: {text_primary}; }}
+QPushButton[role="primary"] {{
+    background-color: {accent};
+    color: white;
+    border-radius: 10px;
+    padding: 8px;
+    font-weight: bold;
+    border: none;
+}}
+QPushButton[role="primary"]:hover {{ background-color: {accent_hover}; }}
+
+/* ---------- 性能浮层 (不随主题变化) ---------- */
+QLabel#perfOverlay {{
+    background-color: rgba(20, 20, 28, 200);
+    color: #E6E6E6;
+    font-family: Consolas, "Courier New", monospace;
+    font-size: 11px;
+    padding: 6px 10px;
+    border-radius: 6px;
+}}
+"""
+
+
+class ThemeManager(QObject):
+    # 主题切换后发出 (参数为主题名)，自绘控件据此清缓存并重绘
+    changed = pyqtSignal(str)
+
+    def __init__(self, name=THEME):
+        super().__init__()
+        self.name = name if name in THEMES else "light"
+        self.colors = dict(THEMES[self.name])
+        self._qcolors = {}
+        self.stylesheet = _STYLESHEET.format(**self.colors)
+
+    def color(self, key):
+        # 自绘代码每帧都会取色，QColor 只在主题切换后构造一次
+        qcolor = self._qcolors.get(key)
+        if qcolor is None:
+            qcolor = self._qcolors[key] = QColor(self.colors[key])
+        return qcolor
+
+    def apply(self, app=None):
+        # 启动时调用一次：整个程序只解析这一份样式表
+        (app or QApplication.instance()).setStyleSheet(self.stylesheet)
+
+    def set_theme(self, name):
+        if name == self.name or name not in THEMES:
+            return
+        self.name = name
+        self.colors = dict(THEMES[name])
+        self._qcolors.clear()
+        self.stylesheet = _STYLESHEET.format(**self.colors)
+        self.apply()
+        self.changed.emit(name)
+
+
+_theme = None
+
+
+def get_theme():
+    global _theme
+    if _theme is None:
+        _theme = ThemeManager()
+    return _theme
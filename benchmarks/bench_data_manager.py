@@ -0,0 +1,268 @@
+# benchmarks/bench_data_manager.py
+# TaskManager 随历史数据增长的表现：在 1 万 / 10 万 / 100 万任务的合成历史上
+# 计时打开 (含旧格式升级/迁移)、保存、增删改、日历一页 42 格的 has_tasks 和清理已完成
+#
+# 用法:
+#   python benchmarks/bench_data_manager.py                                # 1 万、10 万，三种后端
+#   python benchmarks/bench_data_manager.py --scales 10000,100000,1000000 --backends sqlite
+#   python benchmarks/bench_data_manager.py --output base.json             # 保存结果作为基线
+#   python benchmarks/bench_data_manager.py --compare base.json            # 与基线对比，有退化时返回 1
+#   python benchmarks/bench_data_manager.py --runs 3 --output base.json    # 整体跑 3 遍取中位数，基线更稳定
+#
+# 对比看的是中位数 (p50_ms)：亚毫秒级的操作受计时噪声影响大，平均值容易被个别慢样本拉高，
+# 绝对差小于 --floor-ms 的变化也不算退化
+#
+# 只用到数据层，不需要显示器 (QDate 来自 QtCore，不创建 QApplication)
+import argparse
+import datetime
+import json
+import os
+import platform
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PyQt6.QtCore import QDate
+
+from app.data_manager import TaskManager
+
+WORDS = ["写周报", "回复邮件", "整理文档", "code review", "开会", "买菜", "跑步 5km",
+         "fix bug #", "准备演示", "读论文", "更新依赖", "打电话给", "预约", "备份数据"]
+
+
+def generate_history(path, scale, days, legacy_ratio, seed):
+    # 写一份旧版 tasks.json：没有任务 id、没有版本号，legacy_ratio 比例的日期直接是任务列表
+    rng = random.Random(seed)
+    days = max(1, min(days, scale))
+    today = datetime.date.today()
+    per_day, extra = divmod(scale, days)
+    raw = {}
+    for i in range(days):
+        date_str = (today - datetime.timedelta(days=days - 1 - i)).isoformat()
+        count = per_day + (1 if i < extra else 0)
+        tasks = [{"text": f"{rng.choice(WORDS)} {rng.randrange(10000)}", "completed": rng.random() < 0.6}
+                 for _ in range(count)]
+        if rng.random() < legacy_ratio:
+            raw[date_str] = tasks
+        else:
+            raw[date_str] = {"tasks": tasks, "work_seconds": rng.randrange(0, 8 * 3600)}
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(raw, f, ensure_ascii=False)
+    return sorted(raw)
+
+
+def summarize(samples):
+    samples = sorted(samples)
+    ms = [s * 1000 for s in samples]
+    return {"n": len(ms), "mean_ms": statistics.fmean(ms), "p50_ms": ms[len(ms) // 2],
+            "p95_ms": ms[min(len(ms) - 1, int(len(ms) * 0.95))], "max_ms": ms[-1]}
+
+
+def timed(samples, func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    samples.append(time.perf_counter() - start)
+    return result
+
+
+def calendar_page(year, month):
+    # 和 QCalendarWidget 一样：从包含 1 号的那一周的周一开始，共 42 格
+    first = QDate(year, month, 1)
+    start = first.addDays(-(first.dayOfWeek() - 1))
+    return [start.addDays(i) for i in range(42)]
+
+
+def open_manager(backend):
+    # TaskManager 的数据目录在 ~/.calendar_app_data，HOME 已指向临时目录
+    return TaskManager(backend=backend)
+
+
+def bench_backend(backend, scale, args, rng):
+    results = {}
+    root = tempfile.mkdtemp(prefix="bench_dm_")
+    os.environ["HOME"] = os.environ["USERPROFILE"] = root
+    try:
+        data_dir = os.path.join(root, ".calendar_app_data")
+        os.makedirs(data_dir)
+        dates = generate_history(os.path.join(data_dir, "tasks.json"), scale, args.days,
+                                 args.legacy_ratio, args.seed)
+        today = datetime.date.today()
+        month_key = today.strftime("%Y-%m")
+
+        # 第一次打开：旧格式规范化 + 分配 id (json)，或者一次性迁移 (sharded / sqlite)
+        samples = []
+        manager = timed(samples, open_manager, backend)
+        manager.flush()
+        manager.close()
+        results["open_legacy"] = summarize(samples)
+
+        # 之后的冷启动：打开存储并读入当前月份 (界面启动时要显示的数据)
+        samples = []
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            manager = open_manager(backend)
+            manager.load_month(today.year, today.month)
+            samples.append(time.perf_counter() - start)
+            manager.close()
+        results["load_data"] = summarize(samples)
+
+        manager = open_manager(backend)
+        recent = dates[-min(len(dates), 365):]
+
+        # 增删改：随机落在最近一年里，包含月份缓存未命中
+        added = []
+        samples = []
+        for i in range(args.ops):
+            date_str = rng.choice(recent)
+            added.append((date_str, timed(samples, manager.add_task, date_str, f"bench task {i}")))
+        results["add_task"] = summarize(samples)
+
+        samples = []
+        for date_str, task_id in added:
+            timed(samples, manager.toggle_task_status, date_str, task_id)
+        results["toggle_task_status"] = summarize(samples)
+
+        samples = []
+        for date_str, task_id in added[::2]:
+            timed(samples, manager.remove_task, date_str, task_id)
+        results["remove_task"] = summarize(samples)
+
+        samples = []
+        for date_str in rng.sample(recent, min(len(recent), args.ops)):
+            timed(samples, manager.clear_completed_tasks, date_str)
+        results["clear_completed_tasks"] = summarize(samples)
+
+        # 写盘：save_data 请求一次完整落盘，flush 等写线程完成
+        samples = []
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            manager.save_data()
+            manager.flush()
+            samples.append(time.perf_counter() - start)
+        results["save_data"] = summarize(samples)
+
+        # 日历一页 42 格：每页先冷 (月份不在缓存)，再立即重画一次 (热)
+        months = sorted({d[:7] for d in dates} - {month_key})
+        cold, warm = [], []
+        for key in rng.sample(months, min(len(months), args.pages)):
+            cells = calendar_page(int(key[:4]), int(key[5:7]))
+            for samples in (cold, warm):
+                start = time.perf_counter()
+                for cell in cells:
+                    manager.has_tasks(cell)
+                samples.append(time.perf_counter() - start)
+        if cold:
+            results["has_tasks_page_cold"] = summarize(cold)
+            results["has_tasks_page_warm"] = summarize(warm)
+
+        manager.close()
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+    return results
+
+
+def print_results(results):
+    print(f"{'':28}{'n':>6}{'mean ms':>11}{'p50 ms':>11}{'p95 ms':>11}{'max ms':>11}")
+    for group, ops in results.items():
+        print(group)
+        for op, s in ops.items():
+            print(f"  {op:26}{s['n']:>6}{s['mean_ms']:>11.3f}{s['p50_ms']:>11.3f}"
+                  f"{s['p95_ms']:>11.3f}{s['max_ms']:>11.3f}")
+
+
+def merge_runs(runs):
+    # 多次完整运行的结果逐项取中位数
+    merged = {}
+    for group, ops in runs[0].items():
+        merged[group] = {}
+        for op, first in ops.items():
+            samples = [run[group][op] for run in runs if op in run.get(group, {})]
+            merged[group][op] = {key: statistics.median(s[key] for s in samples) for key in first}
+            merged[group][op]["n"] = sum(s["n"] for s in samples)
+    return merged
+
+
+def compare(results, baseline, threshold, floor_ms):
+    # 按中位数 p50_ms 对比；比基线慢 threshold 以上且绝对差超过 floor_ms 算退化
+    regressions = []
+    print(f"\n{'':28}{'base p50':>11}{'now p50':>11}{'ratio':>8}")
+    for group, ops in results.items():
+        base_ops = baseline.get(group)
+        if base_ops is None:
+            continue
+        print(group)
+        for op, s in ops.items():
+            base = base_ops.get(op)
+            if base is None:
+                continue
+            ratio = s["p50_ms"] / base["p50_ms"] if base["p50_ms"] else float("inf")
+            worse = ratio > 1 + threshold and s["p50_ms"] - base["p50_ms"] > floor_ms
+            mark = "  REGRESSION" if worse else ""
+            print(f"  {op:26}{base['p50_ms']:>11.3f}{s['p50_ms']:>11.3f}{ratio:>7.2f}x{mark}")
+            if worse:
+                regressions.append(f"{group} {op}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="TaskManager 在大规模历史数据上的基准测试")
+    parser.add_argument("--scales", default="10000,100000", help="任务总数，逗号分隔 (例如 10000,100000,1000000)")
+    parser.add_argument("--backends", default="json,sharded,sqlite")
+    parser.add_argument("--days", type=int, default=3650, help="历史跨越的天数")
+    parser.add_argument("--legacy-ratio", type=float, default=0.3, help="旧列表格式日期的比例")
+    parser.add_argument("--ops", type=int, default=200, help="每种增删改操作的次数")
+    parser.add_argument("--pages", type=int, default=24, help="has_tasks 测试的日历页数")
+    parser.add_argument("--repeat", type=int, default=3, help="打开/保存的重复次数")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--runs", type=int, default=1, help="整体重复运行的次数，结果逐项取中位数")
+    parser.add_argument("--output", help="把结果写成 JSON (可作为之后 --compare 的基线)")
+    parser.add_argument("--compare", help="与基线 JSON 对比")
+    parser.add_argument("--threshold", type=float, default=0.25, help="慢多少算退化 (0.25 = 25%%)")
+    parser.add_argument("--floor-ms", type=float, default=0.5, help="小于这个绝对差的变化忽略")
+    args = parser.parse_args()
+
+    home = os.environ.get("HOME"), os.environ.get("USERPROFILE")
+    runs = []
+    try:
+        for run in range(args.runs):
+            results = {}
+            for scale in (int(s) for s in args.scales.split(",")):
+                for backend in args.backends.split(","):
+                    rng = random.Random(args.seed)
+                    print(f"running {backend} / {scale} tasks ({run + 1}/{args.runs}) ...", file=sys.stderr, flush=True)
+                    results[f"{backend}/{scale}"] = bench_backend(backend, scale, args, rng)
+            runs.append(results)
+    finally:
+        for key, value in zip(("HOME", "USERPROFILE"), home):
+            if value is None:
+                os.environ.pop(key, None)
+            else:
+                os.environ[key] = value
+
+    results = merge_runs(runs) if len(runs) > 1 else runs[0]
+    print_results(results)
+    report = {"meta": {"python": platform.python_version(), "platform": platform.platform(),
+                       "date": datetime.datetime.now().isoformat(timespec="seconds"),
+                       "args": vars(args)},
+              "results": results}
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            baseline = json.load(f)["results"]
+        regressions = compare(results, baseline, args.threshold, args.floor_ms)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s): " + ", ".join(regressions))
+            sys.exit(1)
+        print("\nno regressions")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+# benchmarks/bench_halo.py
+# WORK 模式火焰光环每帧 CPU 开销：原来的逐点 QPainterPath 实现 vs 查表 + QPolygonF
+#
+# 用法: python benchmarks/bench_halo.py [--frames 2000]
+# 不需要显示器 (默认使用 Qt 的 offscreen 平台)
+import argparse
+import math
+import os
+import random
+import sys
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PyQt6.QtCore import Qt, QPointF
+from PyQt6.QtGui import QGuiApplication, QImage, QPainter, QPainterPath, QColor, QBrush
+
+from app.ui.halo import HaloGeometry
+
+HALOS = [("#FF4500", 9, 70, 0.2), ("#FF8C00", 4, 100, 0.15)]
+CENTER = QPointF(100, 100)
+BASE_RADIUS = 40
+
+
+def legacy_path(anim_step, pulse_base, max_stretch, noise_speed_factor):
+    # 优化前 BallBody.paintEvent 里 draw_fire_halo 的几何部分 (原样保留做对照)
+    path = QPainterPath()
+    for angle in range(0, 360, 1):
+        rad = math.radians(angle)
+        noise = math.sin(angle * 0.1 + anim_step * noise_speed_factor) * \
+                math.cos(angle * 0.3 - anim_step * noise_speed_factor * 0.8)
+        micro_jitter = random.uniform(-1.5, 1.5)
+        noise_stretch = (noise + 1) / 2 * 8
+        current_radius = BASE_RADIUS + (pulse_base * max_stretch * 0.6) + noise_stretch + micro_jitter
+        px = CENTER.x() + current_radius * math.cos(rad)
+        py = CENTER.y() + current_radius * math.sin(rad)
+        if angle == 0:
+            path.moveTo(px, py)
+        else:
+            path.lineTo(px, py)
+    path.closeSubpath()
+    return path
+
+
+def run_legacy(frames, painter):
+    for step in range(frames):
+        pulse = 0.3 + 0.7 * (step % 100) / 100
+        for color_hex, max_stretch, alpha_base, speed in HALOS:
+            path = legacy_path(step, pulse, max_stretch, speed)
+            if painter is not None:
+                color = QColor(color_hex)
+                color.setAlpha(max(20, int(alpha_base - pulse * 20)))
+                painter.setBrush(QBrush(color))
+                painter.drawPath(path)
+
+
+def run_table(frames, painter):
+    halos = [(color_hex, alpha_base, HaloGeometry(max_stretch, speed))
+             for color_hex, max_stretch, alpha_base, speed in HALOS]
+    for step in range(frames):
+        pulse = 0.3 + 0.7 * (step % 100) / 100
+        for color_hex, alpha_base, halo in halos:
+            polygon = halo.polygon(CENTER.x(), CENTER.y(), BASE_RADIUS, pulse, step)
+            if painter is not None:
+                color = QColor(color_hex)
+                color.setAlpha(max(20, int(alpha_base - pulse * 20)))
+                painter.setBrush(QBrush(color))
+                painter.drawPolygon(polygon)
+
+
+def measure(func, frames, paint):
+    image = QImage(200, 200, QImage.Format.Format_ARGB32_Premultiplied)
+    image.fill(Qt.GlobalColor.transparent)
+    painter = None
+    if paint:
+        painter = QPainter(image)
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        painter.setPen(Qt.PenStyle.NoPen)
+    func(10, painter)  # 预热
+    start = time.process_time()
+    func(frames, painter)
+    elapsed = time.process_time() - start
+    if painter is not None:
+        painter.end()
+    return elapsed / frames * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="火焰光环每帧 CPU 开销对比")
+    parser.add_argument("--frames", type=int, default=2000)
+    args = parser.parse_args()
+
+    app = QGuiApplication(sys.argv)
+    print(f"{'':18}{'legacy':>12}{'table':>12}{'speedup':>10}   (CPU ms / frame, 2 halos)")
+    for label, paint in (("geometry only", False), ("geometry + fill", True)):
+        legacy = measure(run_legacy, args.frames, paint)
+        table = measure(run_table, args.frames, paint)
+        print(f"{label:18}{legacy:12.3f}{table:12.3f}{legacy / table:9.1f}x")
+    del app
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,301 @@
+# benchmarks/bench_render.py
+# 离屏绘制耗时：悬浮球 (NORMAL / FOCUS / WORK)、不同任务密度的日历月份、
+# 以及 10 ~ 1000 个任务的一天 (update_task_list + 整窗绘制)。
+# 每个场景绘制 N 帧到 QImage，报告 p50/p95/p99 帧时间和每帧的 Python 内存分配。
+#
+# 用法:
+#   python benchmarks/bench_render.py [--frames 300] [--output render.json]
+#   python benchmarks/bench_render.py --save-frames ref/     # 保存每个场景最后一帧作为参考图
+#   python benchmarks/bench_render.py --diff ref/            # 与参考图逐像素对比，不一致时返回 1
+#
+# 参考图和对比要在同一天运行 (NORMAL 模式显示当天日期、任务按今天生成)；
+# WORK 模式每帧固定随机种子并改为同步绘制光环，保证同一帧号画出来完全一样。
+import argparse
+import datetime
+import json
+import os
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PyQt6.QtCore import Qt, QDate
+from PyQt6.QtGui import QImage
+from PyQt6.QtWidgets import QApplication
+
+from app.sessions import ActiveSession
+
+
+class Scenario:
+    """一个绘制场景：prepare(帧号) 在计时之外准备状态，render(图像) 是被计时的一帧"""
+
+    def __init__(self, name, widget, render, prepare=None):
+        self.name = name
+        self.widget = widget
+        self.render = render
+        self.prepare = prepare or (lambda frame: None)
+
+    def new_image(self):
+        dpr = self.widget.devicePixelRatioF()
+        size = self.widget.size()
+        image = QImage(round(size.width() * dpr), round(size.height() * dpr),
+                       QImage.Format.Format_ARGB32_Premultiplied)
+        image.setDevicePixelRatio(dpr)
+        return image
+
+
+def percentile(sorted_values, q):
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * q))]
+
+
+def run_scenario(scenario, frames, warmup):
+    image = scenario.new_image()
+
+    def frame(i):
+        scenario.prepare(i)
+        image.fill(Qt.GlobalColor.transparent)
+        start = time.perf_counter()
+        scenario.render(image)
+        return time.perf_counter() - start
+
+    for i in range(warmup):
+        frame(i)
+    times = sorted(frame(warmup + i) * 1000 for i in range(frames))
+
+    # 分配单独跑一遍 (tracemalloc 本身会拖慢绘制)：每帧的峰值增量与残留增量
+    allocs = []
+    retained = []
+    tracemalloc.start()
+    for i in range(min(frames, 100)):
+        scenario.prepare(warmup + frames + i)
+        image.fill(Qt.GlobalColor.transparent)
+        before, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        scenario.render(image)
+        after, peak = tracemalloc.get_traced_memory()
+        allocs.append(peak - before)
+        retained.append(after - before)
+    tracemalloc.stop()
+
+    # 最后一帧 (固定帧号) 用于像素对比
+    scenario.prepare(0)
+    image.fill(Qt.GlobalColor.transparent)
+    scenario.render(image)
+
+    stats = {"frames": frames, "mean_ms": statistics.fmean(times), "p50_ms": percentile(times, 0.5),
+             "p95_ms": percentile(times, 0.95), "p99_ms": percentile(times, 0.99),
+             "alloc_kb": statistics.fmean(allocs) / 1024, "retained_kb": statistics.fmean(retained) / 1024}
+    return stats, image
+
+
+# --- 场景 ---
+def ball_scenarios():
+    # halo 模块导入时用 random 生成微抖动表，先固定种子，不同进程画出来才一样
+    random.seed(0)
+    from app.ui.ball_body import BallBody
+
+    scenarios = []
+    for mode in ("NORMAL", "FOCUS", "WORK"):
+        body = BallBody()
+        body.show()
+        if mode == "FOCUS":
+            body.start_focus(25)
+        elif mode == "WORK":
+            body.start_work()
+            # 同步绘制光环，帧内容只取决于随机种子
+            if body.halo_renderer is not None:
+                body.halo_renderer.close()
+                body.halo_renderer = None
+        body.scheduler.remove("ball.clock")
+        body.scheduler.remove("ball.halo")
+
+        def prepare(frame, body=body, mode=mode):
+            # 固定显示的时间，像素对比时不受运行时刻影响
+            if mode == "FOCUS":
+                body.session = ActiveSession("FOCUS", 25 * 60, time.time() - 300)
+            elif mode == "WORK":
+                body.session = ActiveSession("WORK", None, time.time() - 125)
+                # 强度是逐帧平滑插值的，也要重置，否则画面取决于之前跑过多少帧
+                random.seed(frame)
+                body.anim_step = frame
+                body.current_intensity = 0.5 + (frame % 50) / 100
+                body.target_intensity = 0.8
+                body.update_animation()
+
+        scenarios.append(Scenario(f"ball/{mode.lower()}", body, body.render, prepare))
+    return scenarios
+
+
+def populate(manager, densities, tasks_per_day, rng):
+    # 最近 12 个月，每个密度一个月份：density 比例的日期各有 tasks_per_day 个任务
+    today = datetime.date.today()
+    months = []
+    with manager.batch():
+        for i, density in enumerate(densities):
+            year, month = divmod(today.year * 12 + today.month - 1 - i, 12)
+            month += 1
+            months.append((density, year, month))
+            day = datetime.date(year, month, 1)
+            while day.month == month:
+                if rng.random() < density:
+                    for n in range(tasks_per_day):
+                        task_id = manager.add_task(day.isoformat(), f"任务 {n} {rng.randrange(1000)}")
+                        if rng.random() < 0.5:
+                            manager.toggle_task_status(day.isoformat(), task_id)
+                day += datetime.timedelta(days=1)
+    return months
+
+
+def calendar_scenarios(manager, months):
+    from app.ui.components import CleanCalendar
+
+    scenarios = []
+    for density, year, month in months:
+        calendar = CleanCalendar(manager)
+        calendar.resize(400, 340)
+        calendar.setSelectedDate(QDate(year, month, 15))
+        calendar.setCurrentPage(year, month)
+        calendar.show()
+        scenarios.append(Scenario(f"calendar/density_{density:g}", calendar, calendar.render))
+    return scenarios
+
+
+def task_list_scenarios(manager, counts, rng):
+    from app.ui.main_window import ModernCalendarWindow
+
+    window = ModernCalendarWindow(manager)
+    window.show()
+    scenarios = []
+    for i, count in enumerate(counts):
+        date = QDate.currentDate().addDays(-400 - i)
+        date_str = date.toString(Qt.DateFormat.ISODate)
+        with manager.batch():
+            for n in range(count):
+                length = rng.choice((6, 20, 60))
+                manager.add_task(date_str, f"{n} " + "很长的任务描述 " * (length // 8) + "x" * (length % 8))
+
+        def prepare(frame, date=date):
+            if window.calendar.selectedDate() != date:
+                window.calendar.blockSignals(True)
+                window.calendar.setSelectedDate(date)
+                window.calendar.blockSignals(False)
+
+        def render(image):
+            window.update_task_list()
+            window.render(image)
+
+        scenarios.append(Scenario(f"task_list/{count}", window, render, prepare))
+    return scenarios
+
+
+# --- 像素对比 ---
+def pixel_diff(image, reference):
+    # 返回 (不同的像素数, 最大通道差)；尺寸不同视为全部不同
+    a = image.convertToFormat(QImage.Format.Format_ARGB32)
+    b = reference.convertToFormat(QImage.Format.Format_ARGB32)
+    if a.size() != b.size():
+        return a.width() * a.height(), 255
+    bytes_a = a.constBits().asstring(a.sizeInBytes())
+    bytes_b = b.constBits().asstring(b.sizeInBytes())
+    if bytes_a == bytes_b:
+        return 0, 0
+    differing = 0
+    max_delta = 0
+    for i in range(0, len(bytes_a), 4):
+        if bytes_a[i:i + 4] != bytes_b[i:i + 4]:
+            differing += 1
+            max_delta = max(max_delta, *(abs(x - y) for x, y in zip(bytes_a[i:i + 4], bytes_b[i:i + 4])))
+    return differing, max_delta
+
+
+def file_name(scenario_name):
+    return scenario_name.replace("/", "__") + ".png"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="悬浮球 / 日历 / 任务列表的离屏绘制耗时")
+    parser.add_argument("--frames", type=int, default=300)
+    parser.add_argument("--warmup", type=int, default=10)
+    parser.add_argument("--densities", default="0,0.3,1", help="日历月份里有任务的日期比例")
+    parser.add_argument("--tasks-per-day", type=int, default=3)
+    parser.add_argument("--counts", default="10,100,1000", help="任务列表场景的任务数")
+    parser.add_argument("--only", help="只运行名称以此开头的场景 (ball / calendar / task_list)")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", help="把结果写成 JSON")
+    parser.add_argument("--save-frames", help="把每个场景的固定帧保存为 PNG (参考图)")
+    parser.add_argument("--diff", help="与该目录下的参考图逐像素对比")
+    parser.add_argument("--tolerance", type=int, default=0, help="允许的最大通道差")
+    args = parser.parse_args()
+
+    # 任务数据写进临时目录，不碰真实的 ~/.calendar_app_data
+    root = tempfile.mkdtemp(prefix="bench_render_")
+    os.environ["HOME"] = os.environ["USERPROFILE"] = root
+    app = QApplication(sys.argv)
+    from app.ui.theme import get_theme
+    from app.data_manager import TaskManager
+    get_theme().apply(app)
+
+    rng = random.Random(args.seed)
+    manager = TaskManager()
+    months = populate(manager, [float(d) for d in args.densities.split(",")], args.tasks_per_day, rng)
+
+    def wanted(group):
+        return not args.only or args.only.startswith(group) or group.startswith(args.only)
+
+    scenarios = []
+    if wanted("ball"):
+        scenarios += ball_scenarios()
+    if wanted("calendar"):
+        scenarios += calendar_scenarios(manager, months)
+    if wanted("task_list"):
+        scenarios += task_list_scenarios(manager, [int(c) for c in args.counts.split(",")], rng)
+    scenarios = [s for s in scenarios if not args.only or s.name.startswith(args.only)]
+    app.processEvents()
+
+    results = {}
+    failures = []
+    print(f"{'':24}{'mean ms':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'alloc KB':>10}{'kept KB':>9}")
+    for scenario in scenarios:
+        stats, image = run_scenario(scenario, args.frames, args.warmup)
+        line = (f"{scenario.name:24}{stats['mean_ms']:>9.3f}{stats['p50_ms']:>9.3f}{stats['p95_ms']:>9.3f}"
+                f"{stats['p99_ms']:>9.3f}{stats['alloc_kb']:>10.1f}{stats['retained_kb']:>9.1f}")
+        if args.save_frames:
+            os.makedirs(args.save_frames, exist_ok=True)
+            image.save(os.path.join(args.save_frames, file_name(scenario.name)))
+        if args.diff:
+            reference = QImage(os.path.join(args.diff, file_name(scenario.name)))
+            if reference.isNull():
+                line += "   (no reference)"
+            else:
+                differing, max_delta = pixel_diff(image, reference)
+                stats["diff_pixels"] = differing
+                stats["diff_max_delta"] = max_delta
+                if differing and max_delta > args.tolerance:
+                    failures.append(scenario.name)
+                    line += f"   DIFF {differing} px (max delta {max_delta})"
+                else:
+                    line += "   identical" if not differing else f"   within tolerance ({differing} px)"
+        print(line, flush=True)
+        results[scenario.name] = stats
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"meta": {"date": datetime.datetime.now().isoformat(timespec="seconds"),
+                                "platform": os.environ.get("QT_QPA_PLATFORM"), "args": vars(args)},
+                       "results": results}, f, indent=2)
+
+    manager.close()
+    shutil.rmtree(root, ignore_errors=True)
+    if failures:
+        print(f"\npixel diff failed: {', '.join(failures)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,31 +1,61 @@
 # main.py
 import sys
 import os
+import datetime
+import time
+
+# 启动分析要在导入 Qt 之前开始计时
+from app.startup import get_profile
+profile = get_profile()
+profile.enabled = "--startup-profile" in sys.argv
+
 from PyQt6.QtWidgets import QApplication
 from PyQt6.QtGui import QFont
+from PyQt6.QtCore import QTimer
 
 # 引入我们拆分好的模块
+# 日历主窗口 (app.ui.main_window) 不在这里导入，第一次点击悬浮球时才加载
 from app.data_manager import TaskManager
-from app.ui.main_window import ModernCalendarWindow
 from app.ui.floating_ball import LiveDateBall
+from app.ui.theme import get_theme
+profile.mark("imports")
 
 if __name__ == "__main__":
     # 高分屏适配
     os.environ["QT_AUTO_SCREEN_SCALE_FACTOR"] = "1"
     app = QApplication(sys.argv)
-    
+
     # 设置全局字体
     font = QFont("Microsoft YaHei UI", 10)
     app.setFont(font)
-    
-    # 1. 初始化数据管理器
+    # 全局样式表 (主题)，所有控件共用这一份
+    get_theme().apply(app)
+    profile.mark("QApplication + theme")
+
+    # 1. 初始化数据管理器 (只打开存储，不读取任务)
     manager = TaskManager()
-    
-    # 2. 初始化主窗口 (默认隐藏)
-    calendar_win = ModernCalendarWindow(manager)
-    
-    # 3. 初始化悬浮球
-    ball = LiveDateBall(calendar_win)
+    # 退出前把写线程里还没落盘的修改写完
+    app.aboutToQuit.connect(manager.close)
+    profile.mark("data manager")
+
+    # 2. 先显示悬浮球；日历窗口在第一次点击时才创建
+    ball = LiveDateBall(manager)
     ball.show()
-    
-    sys.exit(app.exec())
\ No newline at end of file
+    profile.mark("floating ball")
+
+    # 3. 当前月份在后台读进缓存，打开日历时数据已经就绪；
+    #    读完后回到 GUI 线程通知悬浮球 (日历窗口已经打开时重画)
+    today = datetime.date.today()
+    preload_start = time.perf_counter()
+
+    def preloaded():
+        profile.record("preload current month", preload_start)
+        ball.months_loaded.emit([(today.year, today.month)])
+
+    manager.preload([today.strftime("%Y-%m")], callback=preloaded)
+
+    # 事件循环跑起来 (悬浮球已经画出) 之后打印各阶段耗时
+    if profile.enabled:
+        QTimer.singleShot(0, lambda: (profile.mark("first event loop pass"), profile.report()))
+
+    sys.exit(app.exec())
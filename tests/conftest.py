@@ -0,0 +1,36 @@
+# tests/conftest.py
+import os
+
+import pytest
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from app.data_manager import TaskManager
+
+
+@pytest.fixture(params=["json", "sharded", "sqlite"])
+def backend(request):
+    return request.param
+
+
+@pytest.fixture
+def make_manager(tmp_path, monkeypatch):
+    # TaskManager 的数据目录在 ~/.calendar_app_data，指向临时目录
+    monkeypatch.setenv("HOME", str(tmp_path))
+    monkeypatch.setenv("USERPROFILE", str(tmp_path))
+    managers = []
+
+    def make(backend="sharded", **options):
+        manager = TaskManager(backend=backend, **options)
+        managers.append(manager)
+        return manager
+
+    yield make
+    for manager in managers:
+        manager.close()
+
+
+@pytest.fixture(scope="session")
+def qapp():
+    from PyQt6.QtWidgets import QApplication
+    return QApplication.instance() or QApplication([])
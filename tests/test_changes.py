@@ -0,0 +1,94 @@
+# tests/test_changes.py
+import random
+
+import pytest
+
+from app.changes import diff_tasks, snapshot
+from app.models import Task
+from app.storage.ops import sort_tasks
+
+
+def make_tasks(ids, completed=()):
+    return [Task(f"task {i}", i in completed, i) for i in ids]
+
+
+def apply_changes(before, changes):
+    # 和 TaskListModel.on_tasks_changed 一样逐条应用到旧顺序上
+    rows = [task_id for task_id, _ in before]
+    updated = []
+    for change in changes:
+        if change.kind == "removed":
+            assert rows[change.row] == change.task_id
+            del rows[change.row]
+        elif change.kind == "inserted":
+            rows.insert(change.row, change.task_id)
+        elif change.kind == "moved":
+            assert rows[change.row] == change.task_id
+            rows.insert(change.dest, rows.pop(change.row))
+        elif change.kind == "updated":
+            updated.append(change)
+    # 内容变化的行号是结构变更之后的最终行号
+    for change in updated:
+        assert rows[change.row] == change.task_id
+    return rows
+
+
+def check(before_tasks, after_tasks):
+    before = snapshot(before_tasks)
+    changes = diff_tasks(before, after_tasks)
+    assert apply_changes(before, changes) == [t.id for t in after_tasks]
+    return changes
+
+
+@pytest.mark.parametrize("old, new", [
+    ([], []),
+    ([1, 2, 3], []),
+    ([], [1, 2, 3]),
+    ([1, 2, 3], [1, 2, 3]),
+    ([1, 2, 3], [3, 2, 1]),
+    ([1, 2, 3, 4], [2, 5, 4, 1]),
+    ([1, 2, 3], [4, 5, 6]),
+])
+def test_changes_rebuild_new_order(old, new):
+    check(make_tasks(old), make_tasks(new))
+
+
+def test_empty_lists_have_no_changes():
+    assert check([], []) == []
+
+
+def test_all_removed_and_all_new():
+    assert [c.kind for c in check(make_tasks([1, 2, 3]), [])] == ["removed"] * 3
+    assert [c.kind for c in check([], make_tasks([1, 2, 3]))] == ["inserted"] * 3
+
+
+def test_toggle_moves_task_to_completed_section():
+    tasks = make_tasks([1, 2, 3, 4], completed={4})
+    before = snapshot(tasks)
+    tasks[0].completed = True
+    sort_tasks(tasks)
+    changes = diff_tasks(before, tasks)
+    assert apply_changes(before, changes) == [2, 3, 1, 4]
+    assert sorted(c.kind for c in changes) == ["moved", "updated"]
+
+
+def test_toggle_back_moves_task_up():
+    tasks = make_tasks([1, 2, 3, 4], completed={3, 4})
+    before = snapshot(tasks)
+    tasks[3].completed = False
+    sort_tasks(tasks)
+    changes = diff_tasks(before, tasks)
+    assert apply_changes(before, changes) == [t.id for t in tasks]
+    assert [c.task_id for c in changes if c.kind == "updated"] == [4]
+
+
+def test_random_edits():
+    rng = random.Random(1)
+    for _ in range(500):
+        old = rng.sample(range(20), rng.randrange(0, 12))
+        kept = [i for i in old if rng.random() < 0.7]
+        new = kept + rng.sample([i for i in range(20, 30)], rng.randrange(0, 4))
+        rng.shuffle(new)
+        before = make_tasks(old, completed=set(rng.sample(old, len(old) // 2)))
+        after = make_tasks(new, completed=set(rng.sample(new, len(new) // 2)))
+        check(before, after)
@@ -0,0 +1,126 @@
+# tests/test_data_manager.py
+import sys
+
+from PyQt6.QtCore import QDate
+
+
+def month_keys(count):
+    return [f"{2020 + i // 12:04d}-{i % 12 + 1:02d}" for i in range(count)]
+
+
+def test_month_index_is_consistent_while_preloading(make_manager):
+    # 后台预取不停地读入/淘汰月份，界面线程同时读位图和计数，不能读到建了一半的索引
+    manager = make_manager(cache_months=2)
+    keys = month_keys(12)
+    with manager.batch():
+        for i, key in enumerate(keys):
+            manager.add_task(f"{key}-{i + 1:02d}", "a")
+            manager.toggle_task_status(f"{key}-{i + 1:02d}", manager.add_task(f"{key}-{i + 1:02d}", "b"))
+    manager.flush()
+
+    # 缩短线程切换间隔，让两个线程尽量交错执行
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    try:
+        for _ in range(20):
+            thread = manager.preload(keys)
+            while thread.is_alive():
+                for i, key in enumerate(keys):
+                    year, month = int(key[:4]), int(key[5:7])
+                    assert manager.month_occupancy(year, month) == 1 << i
+                    assert manager.get_day_counts(year, month, i + 1) == (1, 1)
+                    assert manager.has_tasks(QDate(year, month, i + 1))
+            thread.join()
+    finally:
+        sys.setswitchinterval(interval)
+
+
+DAY = "2024-05-01"
+
+
+def texts(manager, date_str=DAY):
+    return [task.text for task in manager.get_tasks(date_str)]
+
+
+def test_ids_are_stable_across_reorder_and_reopen(make_manager, backend):
+    manager = make_manager(backend)
+    ids = [manager.add_task(DAY, text) for text in ("a", "b", "c")]
+    assert len(set(ids)) == 3
+    manager.toggle_task_status(DAY, ids[0])
+    assert [t.id for t in manager.get_tasks(DAY)] == [ids[1], ids[2], ids[0]]
+    manager.flush()
+    manager.close()
+
+    reopened = make_manager(backend)
+    assert {t.id: t.text for t in reopened.get_tasks(DAY)} == dict(zip(ids, "abc"))
+    assert reopened.add_task(DAY, "d") > max(ids)
+
+
+def test_nested_batches_commit_once_at_outer_exit(make_manager, backend):
+    manager = make_manager(backend)
+    calls = []
+    manager.add_listener(lambda date_str, changes: calls.append(changes))
+    with manager.batch():
+        manager.add_task(DAY, "a")
+        with manager.batch():
+            manager.add_task(DAY, "b")
+        # 内层退出时还没有生效
+        assert texts(manager) == []
+    assert texts(manager) == ["a", "b"]
+    assert len(calls) == 1
+
+
+def test_batch_is_discarded_on_exception(make_manager, backend):
+    manager = make_manager(backend)
+    keep = manager.add_task(DAY, "keep")
+    try:
+        with manager.batch():
+            manager.add_task(DAY, "lost")
+            manager.remove_task(DAY, keep)
+            with manager.batch():
+                manager.toggle_task_status(DAY, keep)
+                raise RuntimeError("boom")
+    except RuntimeError:
+        pass
+    assert texts(manager) == ["keep"]
+    assert not manager.get_tasks(DAY)[0].completed
+    assert manager.locate_task(keep) == DAY
+
+    # 放弃之后可以继续正常使用
+    with manager.batch():
+        manager.add_task(DAY, "next")
+    assert texts(manager) == ["keep", "next"]
+
+    manager.flush()
+    manager.close()
+    assert texts(make_manager(backend)) == ["keep", "next"]
+
+
+def test_ids_find_the_right_task_after_reordering(make_manager, backend):
+    manager = make_manager(backend)
+    a, b, c = (manager.add_task(DAY, text) for text in ("a", "b", "c"))
+    manager.toggle_task_status(DAY, a)
+    manager.toggle_task_status(DAY, b)
+    # 已完成的排到后面: c, b, a；按 id 操作不受行号变化影响
+    assert texts(manager) == ["c", "b", "a"]
+    manager.toggle_task_status(DAY, a)
+    assert texts(manager) == ["c", "a", "b"]
+    assert [t.completed for t in manager.get_tasks(DAY)] == [False, False, True]
+
+    assert manager.remove_task(DAY, b)
+    assert not manager.remove_task(DAY, b)
+    assert texts(manager) == ["c", "a"]
+    assert manager.locate_task(b) is None
+    assert manager.locate_task(a) == DAY
+
+    with manager.batch():
+        manager.toggle_task_status(DAY, c)
+        manager.remove_task(DAY, a)
+        d = manager.add_task(DAY, "d")
+    assert texts(manager) == ["d", "c"]
+    assert manager.locate_task(a) is None
+    assert manager.locate_task(d) == DAY
+
+    manager.clear_completed_tasks(DAY)
+    assert texts(manager) == ["d"]
+    assert manager.locate_task(c) is None
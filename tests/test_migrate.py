@@ -0,0 +1,51 @@
+# tests/test_migrate.py
+import json
+
+import pytest
+
+from app.storage import JsonStorage, migrate_json_to_shards, migrate_json_to_sqlite
+
+# 旧版 tasks.json：没有 id、没有版本号，混有直接是任务列表的日期
+LEGACY = {
+    "2024-01-05": [{"text": "写周报", "completed": False}],
+    "2024-02-10": {"tasks": [{"text": "买菜", "completed": True}, {"text": "开会", "completed": False}],
+                   "work_seconds": 3600},
+}
+
+
+@pytest.fixture
+def legacy_file(tmp_path):
+    path = tmp_path / "tasks.json"
+    path.write_text(json.dumps(LEGACY, ensure_ascii=False), encoding="utf-8")
+    return path
+
+
+def texts(storage):
+    return {date_str: [task.text for task in day.tasks] for date_str, day in storage.iter_days()}
+
+
+@pytest.mark.parametrize("migrate, target", [
+    (lambda src, tmp: migrate_json_to_sqlite(str(src), str(tmp / "tasks.db")), "sqlite"),
+    (lambda src, tmp: migrate_json_to_shards(str(src), str(tmp / "tasks"), background=False), "sharded"),
+])
+def test_migration_leaves_source_untouched(tmp_path, legacy_file, migrate, target):
+    before = legacy_file.read_bytes()
+    storage = migrate(legacy_file, tmp_path)
+    try:
+        assert texts(storage) == {"2024-01-05": ["写周报"], "2024-02-10": ["买菜", "开会"]}
+        ids = [task.id for _, day in storage.iter_days() for task in day.tasks]
+        assert None not in ids and len(set(ids)) == len(ids)
+    finally:
+        storage.close()
+    assert legacy_file.read_bytes() == before
+    assert not (tmp_path / "tasks.json.journal").exists()
+
+
+def test_read_only_storage_refuses_writes(legacy_file):
+    before = legacy_file.read_bytes()
+    storage = JsonStorage(str(legacy_file), read_only=True)
+    storage.save()
+    with pytest.raises(IOError):
+        storage.apply({"op": "add"}, {})
+    storage.close()
+    assert legacy_file.read_bytes() == before
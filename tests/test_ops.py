@@ -0,0 +1,56 @@
+# tests/test_ops.py
+import random
+
+from app.models import DayRecord
+from app.storage.ops import apply_record
+
+DAY = "2024-05-01"
+
+
+def check_lookup(day):
+    # 查找表和任务列表始终一致
+    assert day.by_id == {task.id: task for task in day.tasks}
+
+
+def test_lookup_follows_adds_removes_and_toggles():
+    days = {}
+    rng = random.Random(3)
+    next_id = 1
+    for _ in range(300):
+        day = days.get(DAY)
+        ids = [task.id for task in day.tasks] if day else []
+        op = rng.choice(("add", "add", "remove", "toggle", "batch"))
+        if op == "add":
+            record = {"op": "add", "date": DAY, "id": next_id, "text": str(next_id)}
+            next_id += 1
+        elif op == "batch":
+            record = {"op": "batch", "records": [
+                {"op": rng.choice(("remove", "toggle")), "date": DAY, "id": rng.choice(ids or [0])}
+                for _ in range(3)] + [{"op": "add", "date": DAY, "id": next_id, "text": "b"}]}
+            next_id += 1
+        else:
+            record = {"op": op, "date": DAY, "id": rng.choice(ids or [0])}
+        apply_record(lambda date_str: days, record)
+        if DAY in days:
+            days[DAY].find_task(None)
+            check_lookup(days[DAY])
+
+
+def test_removed_task_is_not_toggled_later_in_the_same_batch():
+    days = {DAY: DayRecord()}
+    apply_record(lambda date_str: days, {"op": "add", "date": DAY, "id": 1, "text": "a"})
+    changed = apply_record(lambda date_str: days, {"op": "batch", "records": [
+        {"op": "remove", "date": DAY, "id": 1}, {"op": "toggle", "date": DAY, "id": 1}]})
+    assert changed[DAY].tasks == []
+    assert days[DAY].find_task(1) is None
+
+
+def test_legacy_index_records_still_apply():
+    days = {}
+    apply_record(lambda date_str: days, {"op": "add", "date": DAY, "id": 1, "text": "a"})
+    apply_record(lambda date_str: days, {"op": "add", "date": DAY, "id": 2, "text": "b"})
+    apply_record(lambda date_str: days, {"op": "toggle", "date": DAY, "index": 0})
+    assert [(t.id, t.completed) for t in days[DAY].tasks] == [(2, False), (1, True)]
+    apply_record(lambda date_str: days, {"op": "remove", "date": DAY, "index": 1})
+    assert [t.id for t in days[DAY].tasks] == [2]
+    assert days[DAY].find_task(1) is None
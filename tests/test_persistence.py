@@ -0,0 +1,32 @@
+# tests/test_persistence.py
+from app.persistence import PersistenceWorker
+
+
+class FlakyStorage:
+    """前两次写入抛出非 IO 的异常，之后正常"""
+
+    def __init__(self, failures):
+        self.failures = list(failures)
+        self.persisted = []
+
+    def persist(self, records, snapshot=False):
+        if self.failures:
+            raise self.failures.pop(0)
+        self.persisted.extend(records)
+
+
+def test_writer_survives_non_io_errors():
+    storage = FlakyStorage([TypeError("not serializable"), ValueError("bad value")])
+    worker = PersistenceWorker(storage, debounce=0.01)
+    try:
+        worker.submit({"seq": 1})
+        assert worker.flush(timeout=5)
+        assert storage.persisted == [{"seq": 1}]
+        assert isinstance(worker.last_error, ValueError)
+
+        # 线程还活着，之后的修改照常落盘
+        worker.submit({"seq": 2})
+        assert worker.flush(timeout=5)
+        assert storage.persisted == [{"seq": 1}, {"seq": 2}]
+    finally:
+        worker.close()
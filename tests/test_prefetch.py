@@ -0,0 +1,86 @@
+# tests/test_prefetch.py
+import threading
+import time
+
+import pytest
+
+
+@pytest.fixture
+def prefetcher(qapp, make_manager):
+    from app.ui.components import CleanCalendar
+    from app.ui.prefetch import MonthPrefetcher
+
+    manager = make_manager()
+    calendar = CleanCalendar(manager)
+    calendar.setCurrentPage(2024, 5)
+    prefetcher = MonthPrefetcher(manager, calendar)
+    # 只看手动发出的信号，不让空闲预取插进来
+    prefetcher._idle.stop()
+    calendar.repaints = 0
+
+    def update():
+        calendar.repaints += 1
+
+    calendar.update = update
+    return prefetcher
+
+
+def emit_from_thread(qapp, prefetcher, months):
+    # 从后台线程发出，和 preload() 的回调一样
+    thread = threading.Thread(target=prefetcher.loaded.emit, args=(months,))
+    thread.start()
+    thread.join()
+    deadline = time.monotonic() + 1
+    while time.monotonic() < deadline:
+        qapp.processEvents()
+
+
+def test_calendar_repaints_when_current_page_is_loaded(qapp, prefetcher):
+    emit_from_thread(qapp, prefetcher, [(2024, 6), (2024, 7)])
+    assert prefetcher.calendar.repaints == 1
+
+
+def test_calendar_ignores_months_off_the_page(qapp, prefetcher):
+    emit_from_thread(qapp, prefetcher, [(2024, 7), (2024, 8)])
+    assert prefetcher.calendar.repaints == 0
+
+
+class FakeTaskList:
+    """只记录预先测量了哪些文本"""
+
+    def __init__(self):
+        self.viewport_width = 300
+        self.measured = []
+
+    def viewport(self):
+        return self
+
+    def width(self):
+        return self.viewport_width
+
+    def warm_measurements(self, texts):
+        self.measured.extend(texts)
+        return len(texts)
+
+
+def test_months_are_measured_once(qapp, prefetcher):
+    manager = prefetcher.data_manager
+    manager.add_task("2024-06-03", "六月")
+    manager.add_task("2024-07-03", "七月")
+    task_list = prefetcher.task_list = FakeTaskList()
+
+    prefetcher.on_months_loaded([(2024, 6)])
+    prefetcher.on_months_loaded([(2024, 6), (2024, 7)])
+    assert task_list.measured == ["六月", "七月"]
+
+    # 所有月份都已缓存时空闲预取什么都不做
+    for month in (3, 4):
+        manager.load_month(2024, month)
+    prefetcher.prefetch()
+    assert prefetcher.months_loaded == 0
+    assert task_list.measured == ["六月", "七月"]
+
+    # 列表宽度变化后重新测量
+    task_list.viewport_width = 400
+    prefetcher.on_months_loaded([(2024, 6)])
+    assert task_list.measured == ["六月", "七月", "六月"]
@@ -0,0 +1,44 @@
+# tests/test_search.py
+from app.models import DayRecord, Task
+from app.search import SearchIndex
+
+
+def make_index(texts):
+    index = SearchIndex()
+    day = DayRecord([Task(text, False, i + 1) for i, text in enumerate(texts)])
+    index.update_day("2024-05-01", day)
+    return index
+
+
+def hit_texts(index, query):
+    return {hit.text for hit in index.search(query)}
+
+
+def test_single_character_matches_inside_longer_text():
+    index = make_index(["写周报", "买菜", "开会", "会", "读论文"])
+    assert hit_texts(index, "周") == {"写周报"}
+    assert hit_texts(index, "买") == {"买菜"}
+    assert hit_texts(index, "会") == {"开会", "会"}
+    assert hit_texts(index, "x") == set()
+
+
+def test_two_character_query():
+    index = make_index(["写周报", "周末买菜", "报名"])
+    assert hit_texts(index, "周报") == {"写周报"}
+    assert hit_texts(index, "买菜") == {"周末买菜"}
+
+
+def test_longer_query_prefers_full_match():
+    index = make_index(["code review 周五", "review 文档", "整理文档"])
+    hits = index.search("code review")
+    assert hits[0].text == "code review 周五"
+    assert hit_texts(index, "整理文档") >= {"整理文档"}
+    assert index.search("整理文档")[0].text == "整理文档"
+
+
+def test_removed_task_is_no_longer_found():
+    index = make_index(["写周报", "买菜"])
+    index.update_day("2024-05-01", DayRecord([Task("买菜", False, 2)]))
+    assert hit_texts(index, "周") == set()
+    assert "周" not in index.postings
+    assert hit_texts(index, "买") == {"买菜"}
@@ -0,0 +1,138 @@
+# tests/test_sessions.py
+import datetime
+import json
+import random
+
+import pytest
+
+from app.models import Session
+from app.sessions import ActiveSession, SessionCheckpoint, SessionIndex, recover_session, split_at_midnight
+
+
+def local(day, hour=0, minute=0):
+    # 本地时间的时间戳，和 split_at_midnight 用的时区一致
+    return datetime.datetime.combine(day, datetime.time(hour, minute)).timestamp()
+
+
+DAY = datetime.date(2024, 5, 1)
+
+
+def test_session_within_one_day_is_not_split():
+    start, end = local(DAY, 9), local(DAY, 10, 30)
+    assert split_at_midnight(start, end) == [("2024-05-01", start, end)]
+
+
+def test_session_across_midnight_is_split_at_midnight():
+    start, end = local(DAY, 23), local(DAY + datetime.timedelta(days=1), 1)
+    midnight = local(DAY + datetime.timedelta(days=1))
+    assert split_at_midnight(start, end) == [("2024-05-01", start, midnight), ("2024-05-02", midnight, end)]
+
+
+def test_multi_day_session_covers_every_day_once():
+    start, end = local(DAY, 20), local(DAY + datetime.timedelta(days=3), 2)
+    fragments = split_at_midnight(start, end)
+    assert [date_str for date_str, _, _ in fragments] == ["2024-05-01", "2024-05-02", "2024-05-03", "2024-05-04"]
+    # 首尾相接，总长度不变
+    assert fragments[0][1] == start and fragments[-1][2] == end
+    for (_, _, stop), (_, begin, _) in zip(fragments, fragments[1:]):
+        assert stop == begin
+    assert sum(stop - begin for _, begin, stop in fragments) == end - start
+
+
+def test_empty_or_reversed_span_has_no_fragments():
+    assert split_at_midnight(local(DAY, 9), local(DAY, 9)) == []
+    assert split_at_midnight(local(DAY, 10), local(DAY, 9)) == []
+
+
+def test_overlapping_excludes_sessions_that_only_touch_the_range():
+    index = SessionIndex()
+    index.build([("2024-05-01", Session(100, 200, "WORK")), ("2024-05-01", Session(300, 400, "FOCUS"))])
+    index.add("2024-05-01", Session(150, 350, "WORK"))
+    assert [(s.start, s.end) for _, s in index.overlapping(200, 300)] == [(150, 350)]
+    assert [(s.start, s.end) for _, s in index.overlapping(0, 1000)] == [(100, 200), (150, 350), (300, 400)]
+    assert index.overlapping(400, 500) == []
+
+
+def test_overlapping_matches_brute_force():
+    rng = random.Random(5)
+    start = local(DAY)
+    sessions = []
+    for _ in range(300):
+        begin = start + rng.uniform(0, 30 * 86400)
+        end = begin + rng.uniform(60, 3 * 86400)
+        sessions.extend((date_str, Session(a, b, "WORK")) for date_str, a, b in split_at_midnight(begin, end))
+    index = SessionIndex()
+    index.build(sessions[:200])
+    for date_str, session in sessions[200:]:
+        index.add(date_str, session)
+
+    for _ in range(200):
+        lo = start + rng.uniform(-86400, 31 * 86400)
+        hi = lo + rng.uniform(0, 5 * 86400)
+        expected = sorted((s.start, s.end) for _, s in sessions if s.start < hi and s.end > lo)
+        assert sorted((s.start, s.end) for _, s in index.overlapping(lo, hi)) == expected
+
+
+# --- 断点恢复 ---
+NOW = 1_700_000_000.0
+GRACE = 120
+
+
+def test_checkpoint_round_trip(tmp_path):
+    checkpoint = SessionCheckpoint(str(tmp_path / "active_session.json"))
+    checkpoint.save(ActiveSession("FOCUS", 25 * 60, NOW - 60))
+    state = checkpoint.load()
+    assert state["mode"] == "FOCUS" and state["start"] == NOW - 60 and state["duration"] == 25 * 60
+    checkpoint.clear()
+    assert checkpoint.load() is None
+
+
+@pytest.mark.parametrize("content", [
+    "",
+    "{\"mode\": \"WORK\", \"start\": 17",
+    "[1, 2, 3]",
+    json.dumps({"mode": "SLEEP", "start": NOW}),
+    json.dumps({"mode": "WORK"}),
+    json.dumps({"mode": "WORK", "start": "yesterday"}),
+    json.dumps({"mode": "WORK", "start": NOW, "checkpoint": None}),
+    json.dumps({"mode": "FOCUS", "start": NOW}),
+    json.dumps({"mode": "FOCUS", "start": NOW, "duration": -5}),
+])
+def test_corrupt_checkpoint_is_ignored(tmp_path, content):
+    path = tmp_path / "active_session.json"
+    path.write_text(content, encoding="utf-8")
+    assert SessionCheckpoint(str(path)).load() is None
+
+
+def test_focus_before_deadline_resumes():
+    state = {"mode": "FOCUS", "start": NOW - 600, "duration": 1500, "checkpoint": NOW - 300}
+    action, session = recover_session(state, GRACE, now=NOW)
+    assert action == "resume"
+    assert session.mode == "FOCUS" and session.start == NOW - 600 and session.duration == 1500
+
+
+def test_focus_past_deadline_is_credited_up_to_deadline():
+    # 截止之后才重新启动：最后一次断点在截止之后也只记到截止时间
+    state = {"mode": "FOCUS", "start": NOW - 3600, "duration": 1500, "checkpoint": NOW - 600}
+    assert recover_session(state, GRACE, now=NOW) == ("credit", (NOW - 3600, NOW - 3600 + 1500, "FOCUS"))
+    # 截止之前就崩溃了：只记到最后一次断点
+    state["checkpoint"] = NOW - 3000
+    assert recover_session(state, GRACE, now=NOW) == ("credit", (NOW - 3600, NOW - 3000, "FOCUS"))
+
+
+def test_work_within_grace_resumes():
+    state = {"mode": "WORK", "start": NOW - 3600, "duration": None, "checkpoint": NOW - 60}
+    action, session = recover_session(state, GRACE, now=NOW)
+    assert action == "resume" and session.start == NOW - 3600 and session.duration is None
+
+
+def test_stale_work_checkpoint_is_credited_up_to_last_checkpoint():
+    state = {"mode": "WORK", "start": NOW - 7200, "duration": None, "checkpoint": NOW - 3600}
+    assert recover_session(state, GRACE, now=NOW) == ("credit", (NOW - 7200, NOW - 3600, "WORK"))
+
+
+def test_checkpoint_from_the_future_is_clamped():
+    # 系统时间被往回调过：断点时间不会超过现在
+    state = {"mode": "WORK", "start": NOW - 7200, "duration": None, "checkpoint": NOW + 3600}
+    action, session = recover_session(state, GRACE, now=NOW)
+    assert action == "resume"
@@ -0,0 +1,124 @@
+# tests/test_storage.py
+import os
+
+from app.models import DayRecord, Task
+from app.storage import JsonStorage, ShardedStorage, json_backend, sharded_backend
+
+WORK = {"2024-01-05": 1800, "2024-01-20": 600, "2024-03-02": 7200}
+
+
+def make_shards(directory):
+    storage = ShardedStorage(str(directory), background=False)
+    days = [(date_str, DayRecord([Task(f"task {date_str}")], seconds)) for date_str, seconds in WORK.items()]
+    days.append(("2024-02-14", DayRecord([Task("no work")])))
+    storage.import_days(days)
+    storage.close()
+
+
+def test_work_times_come_from_manifest(tmp_path):
+    make_shards(tmp_path)
+    storage = ShardedStorage(str(tmp_path), background=False)
+    assert dict(storage.iter_work_times()) == WORK
+    assert storage.shard_loads == 0
+
+
+def test_work_times_follow_unsaved_changes(tmp_path):
+    make_shards(tmp_path)
+    storage = ShardedStorage(str(tmp_path), background=True, debounce=60)
+    shard = storage.load_month("2024-02")
+    shard["2024-02-14"].work_seconds = 300
+    storage.apply({"op": "work"}, {"2024-02-14": shard["2024-02-14"]})
+    assert dict(storage.iter_work_times()) == dict(WORK, **{"2024-02-14": 300})
+    storage.close()
+
+
+def test_missing_work_file_is_rebuilt_once(tmp_path):
+    # 旧版本的分片目录没有 work.json
+    make_shards(tmp_path)
+    (tmp_path / "work.json").unlink()
+
+    storage = ShardedStorage(str(tmp_path), background=False)
+    assert dict(storage.iter_work_times()) == WORK
+    assert storage.shard_loads == 3
+
+    storage = ShardedStorage(str(tmp_path), background=False)
+    assert dict(storage.iter_work_times()) == WORK
+    assert storage.shard_loads == 0
+
+
+def test_task_change_does_not_rewrite_work_file(tmp_path, monkeypatch):
+    make_shards(tmp_path)
+    storage = ShardedStorage(str(tmp_path), background=False)
+    written = []
+    real_write = sharded_backend.atomic_write
+    monkeypatch.setattr(sharded_backend, "atomic_write",
+                        lambda path, text: (written.append(os.path.basename(path)), real_write(path, text)))
+
+    shard = storage.load_month("2024-01")
+    shard["2024-01-05"].tasks[0].completed = True
+    storage.apply({"op": "toggle"}, {"2024-01-05": shard["2024-01-05"]})
+    assert sorted(written) == ["2024-01.json", "manifest.json"]
+
+    written.clear()
+    shard["2024-01-05"].work_seconds += 60
+    storage.apply({"op": "work"}, {"2024-01-05": shard["2024-01-05"]})
+    assert sorted(written) == ["2024-01.json", "manifest.json", "work.json"]
+    assert dict(ShardedStorage(str(tmp_path), background=False).iter_work_times())["2024-01-05"] == 1860
+
+
+# --- JSON 后端：日志回放与合并 ---
+def day_state(storage):
+    return {date_str: [(t.id, t.text, t.completed) for t in day.tasks] for date_str, day in storage.iter_days()}
+
+
+def test_journal_is_replayed_on_top_of_snapshot(make_manager):
+    manager = make_manager("json")
+    first = manager.add_task("2024-05-01", "a")
+    manager.save_data()
+    manager.flush()
+    # 快照之后的修改只在日志里
+    manager.toggle_task_status("2024-05-01", first)
+    manager.add_task("2024-05-02", "b")
+    manager.flush()
+    manager.close()
+
+    path = manager.filename
+    assert "\"b\"" not in open(path, encoding="utf-8").read()
+    storage = JsonStorage(path, background=False)
+    assert day_state(storage) == {"2024-05-01": [(first, "a", True)], "2024-05-02": [(first + 1, "b", False)]}
+
+
+def test_truncated_last_journal_line_is_dropped(make_manager):
+    manager = make_manager("json")
+    manager.add_task("2024-05-01", "a")
+    manager.flush()
+    manager.close()
+    expected = day_state(JsonStorage(manager.filename, background=False, read_only=True))
+
+    # 崩溃时最后一行只写了一半
+    with open(manager.filename + ".journal", "a", encoding="utf-8") as f:
+        f.write('{"op":"add","date":"2024-05-01","id":99,"te')
+    storage = JsonStorage(manager.filename, background=False, read_only=True)
+    assert day_state(storage) == expected
+
+
+def test_journal_is_compacted_past_threshold(make_manager):
+    manager = make_manager("json")
+    with manager.batch():
+        ids = [manager.add_task(f"2024-05-{i % 28 + 1:02d}", f"task {i}") for i in range(50)]
+    manager.flush()
+    # 每次切换一条日志，攒过 256 KB 之后合并进快照、清空日志
+    toggles = 0
+    while toggles < 20 or os.path.getsize(manager.filename + ".journal") > 0:
+        manager.toggle_task_status(f"2024-05-{toggles % 50 % 28 + 1:02d}", ids[toggles % 50])
+        toggles += 1
+        if toggles % 100 == 0:
+            manager.flush()
+        assert toggles < 20000
+    manager.flush()
+    assert toggles * 60 > json_backend.JOURNAL_COMPACT_BYTES
+    before = day_state(manager.storage)
+    manager.close()
+
+    assert os.path.getsize(manager.filename + ".journal") == 0
+    assert day_state(JsonStorage(manager.filename, background=False, read_only=True)) == before
@@ -0,0 +1,29 @@
+# tests/test_task_list.py
+DAY = "2024-05-01"
+
+
+def rows(model):
+    return [(task.text, task.completed) for task in model.tasks]
+
+
+def test_model_follows_month_reloaded_after_eviction(qapp, make_manager, backend):
+    from app.ui.task_list import TaskListModel
+
+    manager = make_manager(backend, cache_months=2)
+    ids = [manager.add_task(DAY, f"t{i}") for i in range(3)]
+    manager.flush()
+    model = TaskListModel(manager)
+    model.set_date(DAY)
+
+    # 翻几页日历，把这一天的月份挤出缓存，之后再读是新的 Task 对象
+    for month in range(6, 10):
+        manager.load_month(2024, month)
+    assert not manager.is_month_cached(2024, 5)
+
+    manager.toggle_task_status(DAY, ids[0])
+    expected = [(task.text, task.completed) for task in manager.get_tasks(DAY)]
+    assert expected == [("t1", False), ("t2", False), ("t0", True)]
+    assert rows(model) == expected
+
+    manager.toggle_task_status(DAY, ids[1])
+    assert rows(model) == [(task.text, task.completed) for task in manager.get_tasks(DAY)]